@@ -34,6 +34,82 @@ class Config:
         self.MAX_RETRY_TIMES = spider_config.get('max_retry_times', 3)
         self.REQUEST_TIMEOUT = spider_config.get('request_timeout', 30)
         
+        # 请求重试配置（最大重试次数为 max_retry_times）
+        retry_config = spider_config.get('retry', {})
+        self.RETRY_BASE_DELAY = retry_config.get('base_delay', 1)
+        self.RETRY_MAX_DELAY = retry_config.get('max_delay', 30)
+        self.RETRY_BUDGET_PER_CRAWL = retry_config.get('budget_per_crawl', 10)
+        self.SPIDER_RUNTIME = spider_config.get('runtime', 'threads')
+        self.SPIDER_ASYNC_MAX_CONCURRENCY = spider_config.get('async_max_concurrency', 100)
+        self.SPIDER_MAX_WORKERS = spider_config.get('max_workers', 8)
+        self.SPIDER_PLATFORM_CONCURRENCY = spider_config.get('platform_concurrency', {})
+        self.SPIDER_DEFAULT_PLATFORM_CONCURRENCY = spider_config.get('default_platform_concurrency', 2)
+        self.SCHEDULER_FLUSH_INTERVAL = spider_config.get('schedule_flush_interval', 5)
+        self.SCHEDULER_RESYNC_INTERVAL = spider_config.get('schedule_resync_interval', 600)
+        self.SEEN_POSTS_PER_USER = spider_config.get('seen_posts_per_user', 200)
+        self.INGEST_BATCH_SIZE = spider_config.get('ingest_batch_size', 100)
+        
+        # HTTP会话池配置
+        session_pool_config = spider_config.get('session_pool', {})
+        self.SESSION_POOL_CONNECTIONS = session_pool_config.get('pool_connections', 10)
+        self.SESSION_POOL_MAXSIZE = session_pool_config.get('pool_maxsize', 10)
+        self.SESSION_POOL_MAX_IDLE = session_pool_config.get('max_idle_sessions', 4)
+        self.SESSION_POOL_MAX_AGE = session_pool_config.get('max_session_age', 3600)
+        self.SESSION_POOL_KEEPALIVE_TIMEOUT = session_pool_config.get('keepalive_timeout', 60)
+        
+        # 访问令牌缓存配置
+        token_cache_config = spider_config.get('token_cache', {})
+        self.TOKEN_CACHE_FILE = token_cache_config.get('file', 'data/token_cache.json')
+        self.TOKEN_CACHE_TTL_HOURS = token_cache_config.get('ttl_hours', 12)
+        
+        # 条件请求验证器缓存（ETag / Last-Modified）
+        self.VALIDATOR_CACHE_MAX_ENTRIES = spider_config.get('validator_cache_max_entries', 2000)
+        
+        # 请求限速配置（令牌桶，rate为每秒请求数，burst为桶容量）
+        rate_limit_config = spider_config.get('rate_limit', {})
+        self.RATE_LIMIT_ENABLED = rate_limit_config.get('enabled', True)
+        self.RATE_LIMIT_DEFAULT = rate_limit_config.get('default', {'rate': 1, 'burst': 3})
+        self.RATE_LIMIT_PLATFORMS = rate_limit_config.get('platforms', {})
+        self.RATE_LIMIT_HOSTS = rate_limit_config.get('hosts', {})
+        
+        # 平台熔断配置
+        circuit_config = spider_config.get('circuit_breaker', {})
+        self.CIRCUIT_BREAKER_ENABLED = circuit_config.get('enabled', True)
+        self.CIRCUIT_BREAKER_FAILURE_THRESHOLD = circuit_config.get('failure_threshold', 5)
+        self.CIRCUIT_BREAKER_COOLDOWN = circuit_config.get('cooldown', 60)
+        self.CIRCUIT_BREAKER_MAX_COOLDOWN = circuit_config.get('max_cooldown', 1800)
+        self.CIRCUIT_BREAKER_HALF_OPEN_CALLS = circuit_config.get('half_open_max_calls', 1)
+        
+        # API端点选择配置
+        endpoint_config = spider_config.get('endpoint_selection', {})
+        self.ENDPOINT_SCORE_ALPHA = endpoint_config.get('score_alpha', 0.3)
+        self.ENDPOINT_SCORE_HALF_LIFE = endpoint_config.get('score_half_life', 1800)
+        self.ENDPOINT_FAILURE_THRESHOLD = endpoint_config.get('failure_threshold', 3)
+        self.ENDPOINT_COOLDOWN = endpoint_config.get('cooldown', 300)
+        self.ENDPOINT_MAX_COOLDOWN = endpoint_config.get('max_cooldown', 3600)
+        
+        # 历史回溯配置
+        backfill_config = spider_config.get('backfill', {})
+        self.BACKFILL_MAX_WORKERS = backfill_config.get('max_workers', 2)
+        self.BACKFILL_PAGE_SIZE = backfill_config.get('page_size', 20)
+        self.BACKFILL_MAX_PAGES = backfill_config.get('max_pages', 500)
+        
+        # 自适应调度配置
+        adaptive_config = spider_config.get('adaptive', {})
+        self.ADAPTIVE_PHASE_MULTIPLIERS = adaptive_config.get('phase_multipliers', {})
+        self.ADAPTIVE_MIN_INTERVAL = adaptive_config.get('min_interval', 30)
+        self.ADAPTIVE_MAX_INTERVAL = adaptive_config.get('max_interval', 7200)
+        self.ADAPTIVE_HISTORY_DAYS = adaptive_config.get('history_days', 14)
+        self.ADAPTIVE_MIN_SAMPLES = adaptive_config.get('min_samples', 5)
+        self.ADAPTIVE_REFERENCE_POSTS_PER_HOUR = adaptive_config.get('reference_posts_per_hour', 1.0)
+        self.ADAPTIVE_ACTIVITY_FACTOR_RANGE = adaptive_config.get('activity_factor_range', [0.5, 4.0])
+        self.ADAPTIVE_RATE_REFRESH_MINUTES = adaptive_config.get('rate_refresh_minutes', 60)
+        
+        # 交易日历配置
+        calendar_config = spider_config.get('trading_calendar', {})
+        self.TRADING_HOLIDAYS = calendar_config.get('holidays', [])
+        self.TRADING_SESSIONS = calendar_config.get('sessions', {})
+        
         # 图片缓存配置
         image_config = config_data.get('image_cache', {})
         self.IMAGE_CACHE_ENABLED = image_config.get('enabled', True)
@@ -42,6 +118,14 @@ class Config:
         self.IMAGE_CACHE_MAX_SIZE_MB = image_config.get('max_size_mb', 500)
         self.IMAGE_CACHE_ALLOWED_FORMATS = image_config.get('allowed_formats', ['jpg', 'jpeg', 'png', 'gif', 'webp'])
         self.IMAGE_CACHE_MAX_FILE_SIZE_MB = image_config.get('max_file_size_mb', 10)
+        self.IMAGE_CACHE_INDEX_PATH = image_config.get('index_path', 'data/image_cache_index.db')
+        self.IMAGE_CACHE_EVICTION_POLICY = image_config.get('eviction_policy', 'lru')
+        self.IMAGE_CACHE_JANITOR_INTERVAL = image_config.get('janitor_interval_seconds', 60)
+        self.IMAGE_CACHE_PREFETCH_WORKERS = image_config.get('prefetch_workers', 8)
+        self.IMAGE_CACHE_PER_HOST_LIMIT = image_config.get('per_host_limit', 4)
+        self.IMAGE_PIPELINE_WORKERS = image_config.get('pipeline_workers', 2)
+        self.IMAGE_PIPELINE_NOTIFY_WAIT = image_config.get('notify_wait_seconds', 30)
+        self.IMAGE_PIPELINE_MAX_COMPLETED = image_config.get('pipeline_max_completed', 500)
         
         # 日志配置
         log_config = config_data.get('logging', {})
@@ -0,0 +1,12 @@
+-- 为 post_data 增加 (platform, user_id, post_id) 唯一索引
+-- 爬虫入库使用 IN 批量查重和 INSERT IGNORE 批量写入，依赖该索引
+
+-- 删除重复的帖子记录（保留最早入库的一条）
+DELETE p1 FROM post_data p1
+JOIN post_data p2
+    ON p1.platform = p2.platform
+    AND p1.user_id = p2.user_id
+    AND p1.post_id = p2.post_id
+    AND p1.id > p2.id;
+
+ALTER TABLE post_data ADD UNIQUE KEY uk_platform_user_post (platform, user_id, post_id);
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Table, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -29,7 +29,7 @@ class SpiderConfig(Base):
     # 新增定时配置字段
     schedule_enabled = Column(Boolean, default=True, comment='是否启用定时执行')
     schedule_interval = Column(Integer, default=300, comment='执行间隔（秒）')
-    schedule_type = Column(String(20), default='interval', comment='调度类型：interval(间隔), cron(定时)')
+    schedule_type = Column(String(20), default='interval', comment='调度类型：interval(间隔), cron(定时), adaptive(自适应)')
     cron_expression = Column(String(100), comment='Cron表达式（当schedule_type为cron时使用）')
     last_run_time = Column(DateTime, comment='上次执行时间')
     next_run_time = Column(DateTime, comment='下次执行时间')
@@ -76,6 +76,32 @@ class PostData(Base):
     is_sent = Column(Boolean, default=False, comment='是否已推送')
     created_at = Column(DateTime, default=func.now())
     
+    # 批量去重查询和 INSERT IGNORE 依赖该唯一索引
+    __table_args__ = (
+        UniqueConstraint('platform', 'user_id', 'post_id', name='uk_platform_user_post'),
+    )
+    
+class BackfillJob(Base):
+    """历史回溯任务表"""
+    __tablename__ = 'backfill_job'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    spider_config_id = Column(Integer, nullable=False, comment='爬虫配置ID')
+    platform = Column(String(50), nullable=False, comment='平台名称')
+    user_id = Column(String(100), nullable=False, comment='用户ID')
+    status = Column(String(20), default='pending', comment='状态：pending, running, paused, completed, failed, cancelled')
+    next_page = Column(Integer, default=1, comment='下一个要获取的页码（断点）')
+    max_pages = Column(Integer, comment='最多获取的页数')
+    page_size = Column(Integer, comment='每页帖子数')
+    max_id = Column(String(100), comment='回溯起点：创建任务时已入库的最新帖子ID，只保存比它旧的帖子')
+    pages_fetched = Column(Integer, default=0, comment='已获取页数')
+    posts_fetched = Column(Integer, default=0, comment='已获取帖子数')
+    posts_saved = Column(Integer, default=0, comment='新增入库帖子数')
+    last_error = Column(Text, comment='最近一次错误')
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime, comment='结束时间')
+    
 class SystemLog(Base):
     """系统日志表"""
     __tablename__ = 'system_log'
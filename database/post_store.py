@@ -0,0 +1,72 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy import desc, insert
+from .models import PostData
+
+# 单条 IN 查询的最大参数数量
+LOOKUP_CHUNK_SIZE = 500
+
+def find_existing_post_ids(session, platform: str, user_id: str, post_ids: Iterable[str]) -> Set[str]:
+    """批量查询已入库的帖子ID（按块使用 IN 查询）"""
+    post_ids = list(post_ids)
+    existing = set()
+    for start in range(0, len(post_ids), LOOKUP_CHUNK_SIZE):
+        chunk = post_ids[start:start + LOOKUP_CHUNK_SIZE]
+        rows = session.query(PostData.post_id).filter(
+            PostData.platform == platform,
+            PostData.user_id == user_id,
+            PostData.post_id.in_(chunk)
+        ).all()
+        existing.update(str(post_id) for (post_id,) in rows)
+    return existing
+
+def find_latest_post_id(session, platform: str, user_id: str) -> Optional[str]:
+    """已入库的最新帖子ID（增量爬取的高水位），没有帖子时返回None"""
+    # 帖子按页面从上到下的顺序写入；页面没有发帖时间的平台同一页使用相同的抓取时间，
+    # 发帖时间相同时id越小越靠前
+    latest = session.query(PostData.post_id).filter(
+        PostData.platform == platform,
+        PostData.user_id == user_id
+    ).order_by(desc(PostData.post_time), PostData.id).first()
+    return latest[0] if latest else None
+
+def save_new_posts(session, platform: str, user_id: str, parsed_posts: Iterable[Dict[str, Any]],
+                   content_processor: Optional[Callable[[str], str]] = None,
+                   is_sent: bool = False) -> List[Dict[str, Any]]:
+    """批量保存新帖子，返回实际写入的行数据（调用方负责提交事务）
+
+    一次 IN 查询过滤已存在的帖子，新帖子用一条多行 INSERT 写入；
+    依赖 (platform, user_id, post_id) 唯一索引忽略并发写入产生的重复行。
+    is_sent 为True时写入的帖子不会再触发通知（用于历史回溯）。
+    """
+    candidates = {}
+    for parsed_post in parsed_posts:
+        if not parsed_post or not parsed_post.get('post_id'):
+            continue
+        # 同一批次内重复的帖子只保留第一条
+        candidates.setdefault(str(parsed_post['post_id']), parsed_post)
+
+    if not candidates:
+        return []
+
+    existing = find_existing_post_ids(session, platform, user_id, candidates.keys())
+
+    rows = []
+    for post_id, parsed_post in candidates.items():
+        if post_id in existing:
+            continue
+        content = parsed_post.get('content', '')
+        rows.append({
+            'platform': platform,
+            'user_id': user_id,
+            'post_id': post_id,
+            'content': content,
+            'processed_content': content_processor(content) if content_processor else None,
+            'post_time': parsed_post.get('post_time'),
+            'is_sent': is_sent
+        })
+
+    if rows:
+        statement = insert(PostData).prefix_with('IGNORE', dialect='mysql').prefix_with('OR IGNORE', dialect='sqlite')
+        session.execute(statement, rows)
+
+    return rows
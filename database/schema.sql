@@ -37,10 +37,32 @@ CREATE TABLE IF NOT EXISTS post_data (
     is_sent BOOLEAN DEFAULT FALSE COMMENT '是否已推送',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     UNIQUE KEY uk_platform_post (platform, post_id),
+    UNIQUE KEY uk_platform_user_post (platform, user_id, post_id),
     INDEX idx_is_sent (is_sent),
     INDEX idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+-- 历史回溯任务表
+CREATE TABLE IF NOT EXISTS backfill_job (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    spider_config_id INT NOT NULL COMMENT '爬虫配置ID',
+    platform VARCHAR(50) NOT NULL COMMENT '平台名称',
+    user_id VARCHAR(100) NOT NULL COMMENT '用户ID',
+    status VARCHAR(20) DEFAULT 'pending' COMMENT '状态：pending, running, paused, completed, failed, cancelled',
+    next_page INT DEFAULT 1 COMMENT '下一个要获取的页码（断点）',
+    max_pages INT COMMENT '最多获取的页数',
+    page_size INT COMMENT '每页帖子数',
+    max_id VARCHAR(100) COMMENT '回溯起点：创建任务时已入库的最新帖子ID，只保存比它旧的帖子',
+    pages_fetched INT DEFAULT 0 COMMENT '已获取页数',
+    posts_fetched INT DEFAULT 0 COMMENT '已获取帖子数',
+    posts_saved INT DEFAULT 0 COMMENT '新增入库帖子数',
+    last_error TEXT COMMENT '最近一次错误',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    finished_at DATETIME COMMENT '结束时间',
+    INDEX idx_spider_config_id (spider_config_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
 -- 系统日志表
 CREATE TABLE IF NOT EXISTS system_log (
     id INT AUTO_INCREMENT PRIMARY KEY,
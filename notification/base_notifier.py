@@ -5,6 +5,9 @@ from loguru import logger
 class BaseNotifier(ABC):
     """推送基类"""
     
+    # 是否需要帖子图片已缓存到本地（如以内嵌附件发送图片），为True时发送前会等待图片处理完成
+    needs_local_images = False
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
     
@@ -15,6 +15,9 @@ from config import config
 class EmailNotifier(BaseNotifier):
     """邮件推送"""
     
+    # 缓存到本地的图片作为内嵌附件发送
+    needs_local_images = True
+    
     def send_message(self, title: str, content: str, **kwargs) -> bool:
         """发送邮件"""
         try:
@@ -0,0 +1,264 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+import asyncio
+import json
+import random
+import aiohttp
+from loguru import logger
+from config import config
+from .base_spider import BaseSpider, SpiderCoreMixin
+from .rate_limiter import rate_limiter
+from .circuit_breaker import circuit_breakers
+from .session_pool import credential_key
+
+class AsyncHTTPError(Exception):
+    """异步请求返回错误状态码"""
+
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"HTTP {status_code}: {url}")
+        self.status_code = status_code
+        self.url = url
+
+class AsyncResponse:
+    """异步请求的响应（响应体已完整读取），接口与 requests.Response 保持一致"""
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str, encoding: Optional[str] = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.encoding = encoding or 'utf-8'
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+class AsyncBaseSpider(SpiderCoreMixin, ABC):
+    """异步爬虫基类"""
+
+    def __init__(self, platform: str, session: aiohttp.ClientSession = None):
+        self.platform = platform
+        # 请求头随每次请求发送，因此可与其他爬虫实例共享同一个会话
+        self.headers = {
+            'User-Agent': config.USER_AGENT
+        }
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._owns_session = session is None
+        self.reset_retry_budget()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """懒加载的 aiohttp 会话（必须在事件循环中访问）"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT)
+            )
+            self._owns_session = True
+        return self._session
+
+    @abstractmethod
+    async def authenticate(self, auth_config: Dict[str, Any]) -> bool:
+        """认证登录"""
+        pass
+
+    @abstractmethod
+    async def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子，since_id 含义与 BaseSpider.get_user_posts 相同"""
+        pass
+
+    @abstractmethod
+    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
+        """解析帖子数据"""
+        pass
+
+    async def get_user_posts_page(self, user_id: str, page: int, page_size: int = 20,
+                                  raise_errors: bool = False) -> List[Any]:
+        """获取第page页（第1页最新）的原始帖子，分页钩子，语义与 BaseSpider.get_user_posts_page 相同"""
+        if self.supports_paging:
+            raise NotImplementedError(f"{type(self).__name__} 声明支持分页但未实现 get_user_posts_page")
+        return []
+
+    async def iter_user_posts(self, user_id: str, since_id: str = None, max_id: str = None,
+                              page_size: int = 20, max_pages: int = 1) -> AsyncIterator[Dict[str, Any]]:
+        """按从新到旧的顺序逐条产出解析后的帖子，语义与 BaseSpider.iter_user_posts 相同"""
+        window = self._post_window(since_id, max_id)
+        self.begin_crawl(user_id)
+
+        for page in range(1, max_pages + 1):
+            if self.supports_paging:
+                raw_posts = await self.get_user_posts_page(user_id, page, page_size)
+            elif page == 1:
+                raw_posts = await self.get_user_posts(user_id, page_size, window.since_id)
+            else:
+                return
+
+            if not raw_posts:
+                return
+
+            for post in self._window_posts(raw_posts, window):
+                yield post
+            if window.reached_since:
+                return
+
+    async def fetch(self, url: str, method: str = 'GET', headers: Dict[str, str] = None, **kwargs) -> AsyncResponse:
+        """经平台熔断检查和限速后发起HTTP请求并读取完整响应，不检查状态码"""
+        circuit_breakers.before_request(self.platform)
+        await rate_limiter.acquire_async(self.platform, url)
+        request_headers = {**self.headers, **(headers or {})}
+        try:
+            async with self.session.request(method, url, headers=request_headers, **kwargs) as response:
+                content = await response.read()
+                result = AsyncResponse(
+                    status_code=response.status,
+                    headers=response.headers,
+                    content=content,
+                    url=str(response.url),
+                    encoding=response.get_encoding() if content else None
+                )
+            success = result.status_code < 500 and not self.is_blocked(result)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            circuit_breakers.record(self.platform, False)
+            raise
+        except BaseException:
+            # 任务取消等其他异常不代表平台故障，只归还半开探测名额，避免熔断器一直停在半开状态
+            circuit_breakers.release(self.platform)
+            raise
+        circuit_breakers.record(self.platform, success)
+        return result
+
+    async def backoff(self, attempt: int, reason: str, retry_after: float = None) -> bool:
+        """非阻塞的退避等待，语义与 BaseSpider.backoff 相同"""
+        delay = self._backoff_delay(attempt, reason, retry_after)
+        if delay is None:
+            return False
+        await asyncio.sleep(delay)
+        return True
+
+    async def request_with_retry(self, url: str, method: str = 'GET', idempotent: bool = None, **kwargs) -> AsyncResponse:
+        """发起HTTP请求，连接异常和可重试的响应按统一策略重试，语义与 BaseSpider.request_with_retry 相同"""
+        idempotent = self._is_idempotent(method, idempotent)
+        attempt = 0
+        while True:
+            try:
+                response = await self.fetch(url, method=method, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent or not await self.backoff(attempt, f"请求异常: {url}, 错误: {str(e) or type(e).__name__}"):
+                    raise
+            else:
+                retry = self._response_retry(url, response) if idempotent else None
+                if retry is None or not await self.backoff(attempt, *retry):
+                    return response
+            attempt += 1
+
+    async def make_conditional_request(self, url: str, **kwargs) -> Optional[AsyncResponse]:
+        """带条件请求头的GET请求，语义与 BaseSpider.make_conditional_request 相同"""
+        headers = self._conditional_headers(url, kwargs.pop('headers', None))
+        return self._accept_conditional_response(url, await self.make_request(url, headers=headers, **kwargs))
+
+    async def make_request(self, url: str, method: str = 'GET', **kwargs) -> AsyncResponse:
+        """发起HTTP请求（带重试），状态码异常时抛出异常"""
+        try:
+            response = await self.request_with_retry(url, method=method, **kwargs)
+            if response.status_code >= 400:
+                raise AsyncHTTPError(response.status_code, url)
+            return response
+        except Exception as e:
+            logger.error(f"请求失败: {url}, 错误: {str(e)}")
+            raise
+
+    async def sleep(self, min_seconds: float, max_seconds: float = None):
+        """非阻塞的随机等待"""
+        seconds = random.uniform(min_seconds, max_seconds) if max_seconds else min_seconds
+        await asyncio.sleep(seconds)
+
+    async def close(self):
+        """关闭自行创建的会话，共享会话由会话池负责关闭"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+class SyncSpiderAdapter(AsyncBaseSpider):
+    """将同步爬虫包装为异步接口，阻塞调用在线程池中执行
+
+    用于尚未提供原生异步实现的平台。
+    """
+
+    def __init__(self, spider: BaseSpider):
+        super().__init__(spider.platform)
+        self.spider = spider
+
+    async def authenticate(self, auth_config: Dict[str, Any]) -> bool:
+        return await asyncio.to_thread(self.spider.authenticate, auth_config)
+
+    async def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.spider.get_user_posts, user_id, limit, since_id)
+
+    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
+        return self.spider.parse_post(raw_post)
+
+    @property
+    def content_unchanged(self) -> bool:
+        return self.spider.content_unchanged
+
+    def confirm_content(self):
+        self.spider.confirm_content()
+
+    async def iter_user_posts(self, user_id: str, since_id: str = None, max_id: str = None,
+                              page_size: int = 20, max_pages: int = 1) -> AsyncIterator[Dict[str, Any]]:
+        """在线程池中逐条推进同步爬虫的生成器，保持按需获取"""
+        posts = self.spider.iter_user_posts(user_id, since_id, max_id, page_size, max_pages)
+        done = object()
+        try:
+            while True:
+                post = await asyncio.to_thread(next, posts, done)
+                if post is done:
+                    return
+                yield post
+        finally:
+            await asyncio.to_thread(posts.close)
+
+class AsyncSessionPool:
+    """按 (平台, 认证配置) 共享的 aiohttp 会话池
+
+    aiohttp 会话本身支持并发请求并在内部维护 keep-alive 连接池，
+    因此每个平台的每种认证配置只保留一个会话，使用相同认证的任务共享其连接和 cookie；
+    不同账号的登录 cookie 各自保存在独立的 cookie jar 中。必须在同一个事件循环中使用。
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 10, keepalive_timeout: int = 60):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        # {(platform, credential_key): session}
+        self._sessions: Dict[Tuple[str, str], aiohttp.ClientSession] = {}
+
+    def get(self, platform: str, auth_config: Optional[Dict[str, Any]] = None) -> aiohttp.ClientSession:
+        key = (platform, credential_key(auth_config))
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=config.REQUEST_TIMEOUT)
+            )
+            self._sessions[key] = session
+        return session
+
+    async def close_all(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+
+    def get_status(self) -> Dict:
+        return {
+            f'{platform}:{key}' if key else platform: {'closed': session.closed}
+            for (platform, key), session in self._sessions.items()
+        }
@@ -0,0 +1,49 @@
+from typing import List, Dict, Any
+from loguru import logger
+from .async_base_spider import AsyncBaseSpider
+from .base_spider import PageFetchError, take_newer_than
+from .weibo_spider import WeiboParserMixin, WEIBO_HEADERS, WEIBO_PROFILE_URL
+
+class AsyncWeiboSpider(WeiboParserMixin, AsyncBaseSpider):
+    """新浪微博异步爬虫"""
+    
+    supports_paging = True
+    
+    def __init__(self, session=None):
+        super().__init__('weibo', session)
+    
+    async def authenticate(self, auth_config: Dict[str, Any]) -> bool:
+        """微博认证"""
+        try:
+            self.headers.update(WEIBO_HEADERS)
+            
+            cookies = auth_config.get('cookies', {})
+            if cookies:
+                self.session.cookie_jar.update_cookies(cookies)
+            
+            response = await self.make_request(WEIBO_PROFILE_URL)
+            return response.status_code == 200
+            
+        except Exception as e:
+            logger.error(f"微博认证失败: {str(e)}")
+            return False
+    
+    async def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子（接口不支持按ID增量获取，返回前过滤掉不比since_id新的帖子）"""
+        items = await self.get_user_posts_page(user_id, 1)
+        return take_newer_than(items, since_id, lambda item: item.get('id'))
+    
+    async def get_user_posts_page(self, user_id: str, page: int, page_size: int = 20,
+                                  raise_errors: bool = False) -> List[Any]:
+        """获取第page页的原始微博（每页条数由接口决定）"""
+        try:
+            response = await self.make_request(self.api_url, params=self._page_params(user_id, page))
+            if page == 1 and self.is_content_unchanged(response.content):
+                return []
+            return self._extract_posts(response.json())
+            
+        except Exception as e:
+            logger.error(f"获取微博用户帖子失败: {str(e)}")
+            if raise_errors:
+                raise PageFetchError(f"获取微博用户 {user_id} 第 {page} 页失败: {str(e)}") from e
+            return []
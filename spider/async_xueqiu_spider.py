@@ -0,0 +1,213 @@
+from typing import List, Dict, Any
+import json
+import time
+from loguru import logger
+from yarl import URL
+from .async_base_spider import AsyncBaseSpider
+from .base_spider import PageFetchError, take_newer_than
+from .xueqiu_spider import (
+    XueqiuParserMixin, XUEQIU_HEADERS, XUEQIU_TOKEN_COOKIE, XUEQIU_TOKEN_INVALID_STATUS,
+    xueqiu_endpoint_selector
+)
+from .token_cache import token_cache
+from .circuit_breaker import CircuitOpenError
+from .retry_policy import parse_retry_after
+
+XUEQIU_URL = URL('https://xueqiu.com/')
+
+class AsyncXueqiuSpider(XueqiuParserMixin, AsyncBaseSpider):
+    """雪球异步爬虫，请求流程与 XueqiuSpider 一致，等待使用非阻塞的 asyncio.sleep"""
+    
+    supports_paging = True
+    
+    def __init__(self, session=None):
+        super().__init__('xueqiu', session)
+        self.headers.update(XUEQIU_HEADERS)
+        self._token_invalid = False
+        self._retry_after = None
+    
+    async def authenticate(self, auth_config: Dict[str, Any]) -> bool:
+        """雪球认证方法 - 雪球通常不需要登录即可获取公开数据"""
+        logger.info("雪球爬虫认证成功（无需登录）")
+        return True
+    
+    async def get_initial_cookies(self, user_id) -> bool:
+        """获取初始cookies，模拟真实访问流程"""
+        try:
+            await self.request_with_retry('https://xueqiu.com/')
+            
+            user_url = f'https://xueqiu.com/u/{user_id}'
+            self.headers['Referer'] = 'https://xueqiu.com/'
+            response = await self.request_with_retry(user_url)
+            
+            if response.status_code == 200:
+                self.headers['Referer'] = user_url
+                return True
+            
+            logger.warning(f"用户页面访问失败: {response.status_code}")
+            return False
+            
+        except Exception as e:
+            logger.error(f"获取初始cookies失败: {e}")
+            return False
+    
+    def _session_cookies(self) -> Dict[str, str]:
+        cookies = self.session.cookie_jar.filter_cookies(XUEQIU_URL)
+        return {name: morsel.value for name, morsel in cookies.items()}
+    
+    async def ensure_token(self, user_id) -> bool:
+        """确保会话持有有效令牌：优先使用共享缓存，缓存为空时才预热页面重新获取"""
+        cookies = token_cache.get(self.platform)
+        if cookies:
+            self.session.cookie_jar.update_cookies(
+                {cookie['name']: cookie['value'] for cookie in cookies},
+                response_url=XUEQIU_URL
+            )
+            self.headers['Referer'] = f'https://xueqiu.com/u/{user_id}'
+            return True
+        
+        if not await self.get_initial_cookies(user_id):
+            return False
+        
+        session_cookies = self._session_cookies()
+        token = session_cookies.get(XUEQIU_TOKEN_COOKIE)
+        if token:
+            token_cache.put(self.platform, token, [
+                {'name': name, 'value': value, 'domain': 'xueqiu.com', 'path': '/'}
+                for name, value in session_cookies.items()
+            ])
+        else:
+            logger.warning("预热后未获取到雪球访问令牌")
+        return True
+    
+    def _invalidate_token(self):
+        """作废当前会话使用的令牌，下次获取时重新预热"""
+        self._token_invalid = True
+        token_cache.invalidate(self.platform, self._session_cookies().get(XUEQIU_TOKEN_COOKIE))
+    
+    async def get_user_posts(self, user_id, limit=20, since_id=None) -> List[Dict[str, Any]]:
+        """获取用户发帖，只返回比since_id新的帖子"""
+        statuses = await self._fetch_timeline(user_id, limit, page=1)
+        return take_newer_than(statuses, since_id, lambda status: status.get('id'))
+    
+    async def get_user_posts_page(self, user_id, page, page_size=20, raise_errors=False) -> List[Dict[str, Any]]:
+        """获取时间线第page页的原始动态"""
+        return await self._fetch_timeline(user_id, page_size, page, raise_errors)
+    
+    async def _fetch_timeline(self, user_id, limit, page=1, raise_errors=False) -> List[Dict[str, Any]]:
+        """获取时间线指定页，所有端点失败或令牌失效时按统一的退避策略重试"""
+        attempt = 0
+        
+        while True:
+            self._retry_after = None
+            
+            try:
+                # 令牌有效时直接请求API，仅在令牌失效后重新获取cookies
+                if await self.ensure_token(user_id):
+                    self._token_invalid = False
+                    for endpoint in xueqiu_endpoint_selector.ordered():
+                        result = await self._try_api_endpoint(endpoint, user_id, limit, page)
+                        if result:
+                            logger.success(f"成功获取用户 {user_id} 的 {len(result)} 条动态")
+                            return result
+                        if result is not None and (page > 1 or self.content_unchanged):
+                            return result
+                        
+                        if self._token_invalid:
+                            break
+                
+            except CircuitOpenError as e:
+                # 平台熔断期间不再重试，也不回退到HTML解析
+                logger.warning(f"{e}，跳过用户 {user_id}")
+                if raise_errors:
+                    raise PageFetchError(str(e)) from e
+                return []
+            except Exception as e:
+                logger.error(f"第 {attempt + 1} 次尝试异常: {e}")
+            
+            if not await self.backoff(attempt, f"第 {attempt + 1} 次API尝试失败", self._retry_after):
+                break
+            attempt += 1
+        
+        if raise_errors:
+            raise PageFetchError(f"获取用户 {user_id} 时间线第 {page} 页失败")
+        
+        if page > 1:
+            return []
+        
+        logger.info("所有API尝试均失败，切换到HTML解析模式")
+        return await self._fallback_to_html_parsing(user_id, limit)
+    
+    async def _try_api_endpoint(self, endpoint, user_id, limit, page=1):
+        """尝试特定API端点，结果计入端点得分，请求失败时返回None"""
+        started = time.monotonic()
+        succeeded = False
+        # 只有网络异常、5xx和无效响应体计入端点得分；熔断拒绝的请求未发出，
+        # 令牌失效、WAF拦截和限流与端点本身无关，均不计入
+        attempted = True
+        try:
+            params = {
+                'user_id': user_id,
+                'page': page,
+                'count': limit,
+                '_': int(time.time() * 1000)
+            }
+            
+            # 端点失败时由 _fetch_timeline 换用其他端点并统一退避，这里不单独重试
+            response = await self.fetch(endpoint, params=params)
+            
+            if response.status_code in XUEQIU_TOKEN_INVALID_STATUS:
+                logger.warning(f"API返回 {response.status_code}，访问令牌可能已失效")
+                attempted = False
+                self._invalidate_token()
+                return None
+            
+            if self.should_retry(response):
+                logger.warning(f"API返回 {response.status_code}")
+                attempted = response.status_code >= 500
+                self._retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                return None
+            
+            if response.status_code == 200:
+                if self._is_waf_blocked(response.text):
+                    logger.warning("检测到WAF拦截")
+                    attempted = False
+                    self._invalidate_token()
+                    return None
+                
+                if page == 1 and self.is_content_unchanged(response.content):
+                    succeeded = True
+                    return []
+                
+                try:
+                    statuses = response.json().get('statuses', [])
+                    succeeded = True
+                    return statuses
+                except json.JSONDecodeError as e:
+                    logger.error(f"JSON解析失败: {e}")
+            
+            return None
+            
+        except CircuitOpenError:
+            attempted = False
+            raise
+        except Exception as e:
+            logger.error(f"API请求异常: {e}")
+            return None
+        finally:
+            if attempted:
+                xueqiu_endpoint_selector.record(endpoint, succeeded, time.monotonic() - started)
+    
+    async def _fallback_to_html_parsing(self, user_id, limit):
+        """回退到HTML解析"""
+        try:
+            response = await self.make_conditional_request(f'https://xueqiu.com/u/{user_id}')
+            if response is None or self.is_content_unchanged(response.content):
+                logger.info("用户页面未变化，跳过HTML解析")
+                return []
+            
+            return self._parse_html_content(response.text, limit)
+            
+        except Exception as e:
+            logger.error(f"HTML解析失败: {e}")
+            return []
@@ -1,18 +1,205 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
 import requests
+import time
 from loguru import logger
 from config import config
+from .rate_limiter import rate_limiter
+from .circuit_breaker import circuit_breakers
+from .validator_cache import validator_cache
+from .content_fingerprint import content_fingerprints
+from .retry_policy import IDEMPOTENT_METHODS, DEFAULT_RETRYABLE_STATUSES, RetryBudget, parse_retry_after, retry_policy
 
-class BaseSpider(ABC):
+class PageFetchError(Exception):
+    """按页获取帖子失败（重试后仍失败或平台熔断中），与到达时间线末尾的空页区分"""
+    pass
+
+class PostWindow:
+    """帖子ID区间过滤器，帖子按从新到旧的顺序依次检查
+
+    since_id 为下界（不含）：数字ID按大小比较，跳过不比它新的帖子（置顶的旧帖不会提前结束过滤）；
+    非数字ID无法比较新旧，遇到 since_id 本身即结束。
+    max_id 为上界（不含），用于向旧帖方向翻页或断点续传：数字ID跳过不比它旧的帖子，
+    非数字ID跳过 max_id 及其之前的所有帖子。
+    """
+
+    YIELD = 'yield'
+    SKIP = 'skip'
+    STOP = 'stop'
+
+    def __init__(self, since_id: Optional[str] = None, max_id: Optional[str] = None):
+        self.since_id = str(since_id) if since_id else None
+        self.max_id = str(max_id) if max_id else None
+        # 是否已遇到不比since_id新的帖子（之后的分页都是旧帖）
+        self.reached_since = False
+        self._passed_max = self.max_id is None
+
+    def check(self, post_id: Any) -> str:
+        post_id = str(post_id or '')
+
+        if self.since_id:
+            if self.since_id.isdigit() and post_id.isdigit():
+                if int(post_id) <= int(self.since_id):
+                    self.reached_since = True
+                    return self.SKIP
+            elif post_id == self.since_id:
+                self.reached_since = True
+                return self.STOP
+
+        if not self._passed_max:
+            if self.max_id.isdigit() and post_id.isdigit():
+                if int(post_id) >= int(self.max_id):
+                    return self.SKIP
+            else:
+                self._passed_max = post_id == self.max_id
+                return self.SKIP
+
+        return self.YIELD
+
+def take_newer_than(items: Iterable[Any], since_id: Optional[str], get_id: Callable[[Any], Any]) -> List[Any]:
+    """按高水位（已入库的最新帖子ID）过滤帖子，items按从新到旧排列"""
+    window = PostWindow(since_id)
+    newer = []
+    for item in items:
+        action = window.check(get_id(item))
+        if action == PostWindow.STOP:
+            break
+        if action == PostWindow.YIELD:
+            newer.append(item)
+    return newer
+
+class SpiderCoreMixin:
+    """同步与异步爬虫基类共用的逻辑：爬取状态、响应指纹、页面验证器、重试判断和帖子过滤
+
+    只包含不涉及网络I/O的部分，发起请求和等待由各自的基类实现。
+    """
+    
+    # 支持按页获取的平台重写 get_user_posts_page 并设为True
+    supports_paging = False
+    # get_user_posts 返回的是否已是解析后的帖子
+    posts_are_parsed = False
+    # 帖子是否严格按发帖时间从新到旧排列；存在置顶或按回复时间排序的平台设为False，
+    # 此时 since_id 不能作为停止条件，已入库的帖子由调用方逐条过滤
+    timeline_ordered = True
+    
+    # 本次增量爬取的首页响应是否与上次成功爬取时完全相同
+    content_unchanged = False
+    _crawl_user_id = None
+    _pending_fingerprint = None
+    # 本次爬取获取到的页面验证器 [(url, etag, last_modified)]，入库后才写入验证器缓存
+    _pending_validators = None
+    
+    # 可重试的响应状态码，子类按平台特点重写；更复杂的条件重写 should_retry
+    retryable_statuses = DEFAULT_RETRYABLE_STATUSES
+    
+    def _post_window(self, since_id: Optional[str], max_id: Optional[str]) -> PostWindow:
+        """按平台时间线是否有序创建 iter_user_posts 的帖子过滤器"""
+        return PostWindow(since_id if self.timeline_ordered else None, max_id)
+    
+    def _window_posts(self, raw_posts: List[Any], window: PostWindow) -> Iterator[Dict[str, Any]]:
+        """逐条解析一页原始帖子并按 window 过滤，遇到STOP即结束（此时 window.reached_since 为True）"""
+        for raw_post in raw_posts:
+            post = raw_post if self.posts_are_parsed and not self.supports_paging else self.parse_post(raw_post)
+            if not post:
+                continue
+            action = window.check(post.get('post_id'))
+            if action == PostWindow.STOP:
+                return
+            if action == PostWindow.YIELD:
+                yield post
+    
+    def begin_crawl(self, user_id: str):
+        """开始一次增量爬取：重置重试预算，并对首页响应做指纹比较"""
+        self.reset_retry_budget()
+        self.content_unchanged = False
+        self._crawl_user_id = user_id
+        self._pending_fingerprint = None
+        self._pending_validators = []
+    
+    def is_content_unchanged(self, content: bytes) -> bool:
+        """增量爬取时比较首页原始响应与上次成功爬取时是否相同，相同时调用方可跳过解析直接返回空结果"""
+        if self._crawl_user_id is None:
+            return False
+        self._pending_fingerprint, self.content_unchanged = content_fingerprints.check(
+            self.platform, self._crawl_user_id, content
+        )
+        if self.content_unchanged:
+            logger.debug(f"响应内容未变化，跳过解析: {self.platform} - {self._crawl_user_id}")
+        return self.content_unchanged
+    
+    def confirm_content(self):
+        """本次爬取结果入库后保存首页响应指纹和页面验证器"""
+        if self._crawl_user_id is not None and self._pending_fingerprint:
+            content_fingerprints.put(self.platform, self._crawl_user_id, self._pending_fingerprint)
+        for url, etag, last_modified in self._pending_validators or []:
+            validator_cache.store(url, etag, last_modified)
+        self._pending_validators = []
+    
+    def is_blocked(self, response) -> bool:
+        """响应是否为平台拦截页（如WAF），子类按需重写，拦截计入熔断失败"""
+        return False
+    
+    def should_retry(self, response) -> bool:
+        """响应是否为可重试的临时错误"""
+        return response.status_code in self.retryable_statuses
+    
+    def reset_retry_budget(self):
+        """开始一次新的爬取，重置本次爬取可用的重试次数"""
+        self.retry_budget = RetryBudget(config.RETRY_BUDGET_PER_CRAWL)
+    
+    def _backoff_delay(self, attempt: int, reason: str, retry_after: float = None) -> Optional[float]:
+        """第attempt次（从0开始）失败后应等待的秒数，超出重试次数或本次爬取的重试预算时返回None"""
+        delay = retry_policy.next_delay(attempt, retry_after)
+        if delay is None:
+            return None
+        if not self.retry_budget.consume():
+            logger.warning(f"{self.platform} 本次爬取的重试预算已用完: {reason}")
+            return None
+        logger.warning(f"{reason}，{delay:.1f} 秒后第 {attempt + 1} 次重试")
+        return delay
+    
+    @staticmethod
+    def _is_idempotent(method: str, idempotent: Optional[bool]) -> bool:
+        """默认只重试幂等的请求方法，确认重复发送无副作用的请求可传入 idempotent=True"""
+        return method.upper() in IDEMPOTENT_METHODS if idempotent is None else idempotent
+    
+    def _response_retry(self, url: str, response) -> Optional[Tuple[str, Optional[float]]]:
+        """响应可重试时返回退避参数 (原因, Retry-After秒数)，否则返回None"""
+        if not self.should_retry(response):
+            return None
+        return f"请求返回 {response.status_code}: {url}", parse_retry_after(response.headers.get('Retry-After'))
+    
+    def _conditional_headers(self, url: str, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        """附加 If-None-Match / If-Modified-Since 请求头，调用方传入的同名请求头优先"""
+        return {**validator_cache.conditional_headers(url), **(headers or {})}
+    
+    def _accept_conditional_response(self, url: str, response):
+        """处理条件请求的响应：304时返回None，否则记录页面验证器并返回响应"""
+        if response.status_code == 304:
+            validator_cache.record(self.platform, hit=True)
+            logger.debug(f"页面未变化: {url}")
+            return None
+        
+        validator_cache.record(self.platform, hit=False)
+        validators = (url, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        if self._pending_validators is not None:
+            # 增量爬取中先暂存，入库成功后由 confirm_content 保存，入库失败时下次仍会获取完整页面
+            self._pending_validators.append(validators)
+        else:
+            validator_cache.store(*validators)
+        return response
+
+class BaseSpider(SpiderCoreMixin, ABC):
     """爬虫基类"""
     
-    def __init__(self, platform: str):
+    def __init__(self, platform: str, session: requests.Session = None):
         self.platform = platform
-        self.session = requests.Session()
+        # 可传入会话池中的长连接会话，未传入时新建
+        self.session = session or requests.Session()
         self.session.headers.update({
             'User-Agent': config.USER_AGENT
         })
+        self.reset_retry_budget()
     
     @abstractmethod
     def authenticate(self, auth_config: Dict[str, Any]) -> bool:
@@ -20,8 +207,11 @@ class BaseSpider(ABC):
         pass
     
     @abstractmethod
-    def get_user_posts(self, user_id: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """获取用户帖子"""
+    def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子
+
+        since_id 为已入库的最新帖子ID，平台支持时只请求更新的帖子，否则在返回前过滤掉旧帖子。
+        """
         pass
     
     @abstractmethod
@@ -29,17 +219,103 @@ class BaseSpider(ABC):
         """解析帖子数据"""
         pass
     
+    def get_user_posts_page(self, user_id: str, page: int, page_size: int = 20,
+                            raise_errors: bool = False) -> List[Any]:
+        """获取第page页（第1页最新）的原始帖子
+
+        分页钩子：支持分页的平台重写本方法并将 supports_paging 设为True，iter_user_posts
+        和历史回溯据此逐页向旧帖方向获取。获取失败时默认返回空列表；raise_errors 为True时
+        抛出 PageFetchError（用于历史回溯）。不支持分页的平台没有可翻的页，返回空列表。
+        """
+        if self.supports_paging:
+            raise NotImplementedError(f"{type(self).__name__} 声明支持分页但未实现 get_user_posts_page")
+        return []
+    
+    def iter_user_posts(self, user_id: str, since_id: str = None, max_id: str = None,
+                        page_size: int = 20, max_pages: int = 1) -> Iterator[Dict[str, Any]]:
+        """按从新到旧的顺序逐条产出解析后的帖子，调用方可随时停止迭代
+        
+        since_id/max_id 含义见 PostWindow。支持分页的平台逐页向旧帖方向获取，
+        遇到 since_id 或空页即停止；不支持分页的平台只获取一页。
+        timeline_ordered 为False的平台忽略 since_id，产出页面上的全部帖子。
+        """
+        window = self._post_window(since_id, max_id)
+        self.begin_crawl(user_id)
+        
+        for page in range(1, max_pages + 1):
+            if self.supports_paging:
+                raw_posts = self.get_user_posts_page(user_id, page, page_size)
+            elif page == 1:
+                raw_posts = self.get_user_posts(user_id, page_size, window.since_id)
+            else:
+                return
+            
+            if not raw_posts:
+                return
+            
+            yield from self._window_posts(raw_posts, window)
+            if window.reached_since:
+                return
+    
+    def fetch(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
+        """经平台熔断检查和限速后发起HTTP请求，不检查状态码
+        
+        平台熔断中时抛出 CircuitOpenError；连接异常、5xx和拦截页计为平台失败。
+        """
+        circuit_breakers.before_request(self.platform)
+        rate_limiter.acquire(self.platform, url)
+        kwargs.setdefault('timeout', config.REQUEST_TIMEOUT)
+        try:
+            response = self.session.request(method=method, url=url, **kwargs)
+            success = response.status_code < 500 and not self.is_blocked(response)
+        except requests.RequestException:
+            circuit_breakers.record(self.platform, False)
+            raise
+        except BaseException:
+            # 其他异常不代表平台故障，只归还半开探测名额，避免熔断器一直停在半开状态
+            circuit_breakers.release(self.platform)
+            raise
+        circuit_breakers.record(self.platform, success)
+        return response
+    
+    def backoff(self, attempt: int, reason: str, retry_after: float = None) -> bool:
+        """第attempt次（从0开始）失败后按重试策略等待，超出重试次数或本次爬取的重试预算时返回False"""
+        delay = self._backoff_delay(attempt, reason, retry_after)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+    
+    def request_with_retry(self, url: str, method: str = 'GET', idempotent: bool = None, **kwargs) -> requests.Response:
+        """发起HTTP请求，连接异常和可重试的响应按统一策略重试，返回最后一次的响应
+        
+        默认只重试幂等的请求方法，确认重复发送无副作用的请求可传入 idempotent=True。
+        """
+        idempotent = self._is_idempotent(method, idempotent)
+        attempt = 0
+        while True:
+            try:
+                response = self.fetch(url, method=method, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or not self.backoff(attempt, f"请求异常: {url}, 错误: {str(e)}"):
+                    raise
+            else:
+                retry = self._response_retry(url, response) if idempotent else None
+                if retry is None or not self.backoff(attempt, *retry):
+                    return response
+            attempt += 1
+    
+    def make_conditional_request(self, url: str, **kwargs) -> Optional[requests.Response]:
+        """带 If-None-Match / If-Modified-Since 的GET请求，页面自上次获取后未变化（304）时返回None"""
+        headers = self._conditional_headers(url, kwargs.pop('headers', None))
+        return self._accept_conditional_response(url, self.make_request(url, headers=headers, **kwargs))
+    
     def make_request(self, url: str, method: str = 'GET', **kwargs) -> requests.Response:
-        """发起HTTP请求"""
+        """发起HTTP请求（带重试），状态码异常时抛出异常"""
         try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                timeout=config.REQUEST_TIMEOUT,
-                **kwargs
-            )
+            response = self.request_with_retry(url, method=method, **kwargs)
             response.raise_for_status()
             return response
         except Exception as e:
             logger.error(f"请求失败: {url}, 错误: {str(e)}")
-            raise
\ No newline at end of file
+            raise
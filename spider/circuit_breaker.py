@@ -0,0 +1,193 @@
+from typing import Dict, Optional
+from loguru import logger
+from config import config
+import threading
+import time
+
+class CircuitOpenError(Exception):
+    """平台熔断中，请求未发出"""
+
+    def __init__(self, platform: str, retry_after: float):
+        super().__init__(f"{platform} 熔断中，{int(retry_after)} 秒后重试")
+        self.platform = platform
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """单个平台的熔断器
+
+    closed: 正常放行，连续失败（5xx、连接异常、WAF拦截）达到阈值后熔断；
+    open: 冷却期内直接拒绝请求，冷却结束后进入 half_open；
+    half_open: 只放行少量探测请求，成功则恢复 closed，失败则重新熔断且冷却时间加倍。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, platform: str, failure_threshold: int = 5, cooldown: float = 60,
+                 max_cooldown: float = 1800, half_open_max_calls: int = 1):
+        self.platform = platform
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        # 连续熔断次数，决定下一次的冷却时间
+        self.trip_count = 0
+        self.open_until = 0.0
+        self.half_open_calls = 0
+        self.rejected_count = 0
+        self.opened_at: Optional[float] = None
+
+    def _refresh(self, now: float):
+        """冷却结束后从 open 进入 half_open（调用方需持有锁）"""
+        if self.state == self.OPEN and now >= self.open_until:
+            self.state = self.HALF_OPEN
+            self.half_open_calls = 0
+            logger.info(f"{self.platform} 熔断冷却结束，进入半开状态")
+
+    def _trip(self, now: float):
+        """进入 open 状态（调用方需持有锁）"""
+        cooldown = min(self.cooldown * (2 ** self.trip_count), self.max_cooldown)
+        self.trip_count += 1
+        self.state = self.OPEN
+        self.open_until = now + cooldown
+        self.opened_at = now
+        self.half_open_calls = 0
+        logger.warning(f"{self.platform} 连续失败 {self.consecutive_failures} 次，熔断 {int(cooldown)} 秒")
+
+    def allow_request(self) -> bool:
+        """判断是否放行请求，half_open 状态下放行的请求计为探测请求"""
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and self.half_open_calls < self.half_open_max_calls:
+                self.half_open_calls += 1
+                return True
+            self.rejected_count += 1
+            return False
+
+    def release(self):
+        """请求因非平台原因中断（如任务取消、响应处理出错），归还占用的半开探测名额，不计成败"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.half_open_calls > 0:
+                self.half_open_calls -= 1
+
+    def is_open(self) -> bool:
+        """是否处于冷却期（半开状态不算，以便调度器放行探测任务）"""
+        with self._lock:
+            self._refresh(time.time())
+            return self.state == self.OPEN
+
+    def retry_after(self) -> float:
+        with self._lock:
+            return max(0.0, self.open_until - time.time()) if self.state == self.OPEN else 0.0
+
+    def record_success(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                # 熔断前发出、熔断后才返回的请求不代表平台已恢复，恢复只能由半开探测请求确认
+                return
+            if self.state == self.HALF_OPEN:
+                logger.info(f"{self.platform} 探测请求成功，熔断恢复")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.trip_count = 0
+            self.half_open_calls = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            now = time.time()
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN:
+                self._trip(now)
+            elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._trip(now)
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            now = time.time()
+            self._refresh(now)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'trip_count': self.trip_count,
+                'retry_after': max(0, int(self.open_until - now)) if self.state == self.OPEN else 0,
+                'rejected': self.rejected_count
+            }
+
+class CircuitBreakerRegistry:
+    """按平台懒加载的熔断器集合，所有爬虫实例和调度器共享"""
+
+    def __init__(self, enabled: bool = True, failure_threshold: int = 5, cooldown: float = 60,
+                 max_cooldown: float = 1800, half_open_max_calls: int = 1):
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, platform: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(platform)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    platform,
+                    failure_threshold=self.failure_threshold,
+                    cooldown=self.cooldown,
+                    max_cooldown=self.max_cooldown,
+                    half_open_max_calls=self.half_open_max_calls
+                )
+                self._breakers[platform] = breaker
+            return breaker
+
+    def before_request(self, platform: str):
+        """请求前检查熔断状态，熔断中抛出 CircuitOpenError"""
+        if not self.enabled:
+            return
+        breaker = self.get(platform)
+        if not breaker.allow_request():
+            raise CircuitOpenError(platform, breaker.retry_after())
+
+    def record(self, platform: str, success: bool):
+        if not self.enabled:
+            return
+        breaker = self.get(platform)
+        if success:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    def release(self, platform: str):
+        if not self.enabled:
+            return
+        self.get(platform).release()
+
+    def is_open(self, platform: str) -> bool:
+        if not self.enabled:
+            return False
+        with self._lock:
+            breaker = self._breakers.get(platform)
+        return breaker.is_open() if breaker else False
+
+    def get_status(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {platform: breaker.get_status() for platform, breaker in breakers.items()}
+
+# 创建全局熔断器实例
+circuit_breakers = CircuitBreakerRegistry(
+    enabled=config.CIRCUIT_BREAKER_ENABLED,
+    failure_threshold=config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    cooldown=config.CIRCUIT_BREAKER_COOLDOWN,
+    max_cooldown=config.CIRCUIT_BREAKER_MAX_COOLDOWN,
+    half_open_max_calls=config.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+)
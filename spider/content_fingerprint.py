@@ -0,0 +1,39 @@
+from typing import Dict, Tuple
+import hashlib
+import threading
+
+class ContentFingerprints:
+    """按 (platform, user_id) 记录上次成功爬取时首页原始响应的指纹
+
+    不活跃的账号连续多次轮询返回完全相同的JSON/HTML，指纹一致时可直接跳过解析、去重和图片处理。
+    指纹只在本次爬取结果入库后更新，爬取失败时下次仍会完整处理。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def fingerprint(content: bytes) -> str:
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def check(self, platform: str, user_id: str, content: bytes) -> Tuple[str, bool]:
+        """计算响应指纹，返回 (指纹, 是否与上次相同)"""
+        fingerprint = self.fingerprint(content)
+        with self._lock:
+            return fingerprint, self._fingerprints.get((platform, user_id)) == fingerprint
+
+    def put(self, platform: str, user_id: str, fingerprint: str):
+        with self._lock:
+            self._fingerprints[(platform, user_id)] = fingerprint
+
+    def discard(self, platform: str, user_id: str):
+        with self._lock:
+            self._fingerprints.pop((platform, user_id), None)
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {'accounts': len(self._fingerprints)}
+
+# 创建全局响应指纹实例
+content_fingerprints = ContentFingerprints()
@@ -3,12 +3,18 @@ import json
 from datetime import datetime
 from loguru import logger
 from .base_spider import BaseSpider
+from .html_selectors import EASTMONEY_POST_ITEMS, EASTMONEY_TITLE, EASTMONEY_TITLE_LINK, first, outer_html, parse_html, text_of
+import requests
 
 class EastmoneySpider(BaseSpider):
     """东财爬虫"""
     
-    def __init__(self):
-        super().__init__('eastmoney')
+    posts_are_parsed = True
+    # 列表含置顶帖且按回复时间排序
+    timeline_ordered = False
+    
+    def __init__(self, session: requests.Session = None):
+        super().__init__('eastmoney', session)
         self.base_url = 'https://guba.eastmoney.com'
         self.api_url = 'https://guba.eastmoney.com/list'
     
@@ -26,22 +32,26 @@ class EastmoneySpider(BaseSpider):
             logger.error(f"东财认证失败: {str(e)}")
             return False
     
-    def get_user_posts(self, user_id: str) -> List[Dict[str, Any]]:
-        """获取用户帖子"""
+    def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子（列表不按发帖时间排序，忽略since_id，返回页面上的全部帖子）"""
         try:
             url = f"{self.base_url}/list,{user_id}.html"
-            response = self.make_request(url)
+            response = self.make_conditional_request(url)
+            if response is None or self.is_content_unchanged(response.content):
+                # 页面自上次获取后未变化，没有新帖子
+                return []
             
-            # 这里需要解析HTML页面
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # 使用lxml和预编译的XPath解析HTML页面
+            document = parse_html(response.text)
             
             posts = []
+            # 页面没有发帖时间，同一页的帖子使用相同的抓取时间，按页面顺序入库
             # 根据东财页面结构解析帖子
-            post_items = soup.find_all('div', class_='articleh')
+            post_items = EASTMONEY_POST_ITEMS(document)
             
+            fetched_at = datetime.now()
             for item in post_items:
-                post = self.parse_post(item)
+                post = self.parse_post(item, fetched_at)
                 if post:
                     posts.append(post)
             
@@ -51,24 +61,24 @@ class EastmoneySpider(BaseSpider):
             logger.error(f"获取东财用户帖子失败: {str(e)}")
             return []
     
-    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
+    def parse_post(self, raw_post: Any, fetched_at: datetime = None) -> Dict[str, Any]:
         """解析帖子数据"""
         try:
             # 解析HTML元素
-            title_elem = raw_post.find('span', class_='l3')
-            time_elem = raw_post.find('span', class_='l5')
+            title_elem = first(EASTMONEY_TITLE(raw_post))
             
-            if not title_elem:
+            if title_elem is None:
                 return None
             
+            href = first(EASTMONEY_TITLE_LINK(title_elem)) or ''
             return {
                 'platform': self.platform,
-                'post_id': title_elem.find('a').get('href', '').split('/')[-1].replace('.html', ''),
+                'post_id': href.split('/')[-1].replace('.html', ''),
                 'user_id': '',  # 需要从页面中提取
                 'username': '',
-                'content': title_elem.get_text().strip(),
-                'post_time': datetime.now(),  # 需要解析时间格式
-                'raw_data': str(raw_post)
+                'content': text_of(title_elem),
+                'post_time': fetched_at or datetime.now(),  # 需要解析时间格式
+                'raw_data': outer_html(raw_post)
             }
         except Exception as e:
             logger.error(f"解析东财帖子失败: {str(e)}")
@@ -0,0 +1,107 @@
+from typing import Dict, List
+from loguru import logger
+import math
+import threading
+import time
+
+class EndpointSelector:
+    """按历史表现排序的候选API端点
+
+    每个端点维护成功率和延迟的指数加权平均，成功率随时间向中性值衰减，
+    使长期未使用的端点逐步恢复被尝试的机会。连续失败达到阈值的端点进入冷却期，
+    冷却期内不再探测，冷却时间随再次失败成倍增长。
+    """
+
+    NEUTRAL_SCORE = 0.5
+
+    def __init__(self, endpoints: List[str], alpha: float = 0.3, half_life: float = 1800,
+                 failure_threshold: int = 3, cooldown: float = 300, max_cooldown: float = 3600):
+        self.endpoints = list(endpoints)
+        self.alpha = alpha
+        self.half_life = half_life
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+        self._stats = {
+            endpoint: {
+                'score': self.NEUTRAL_SCORE,
+                'latency': 0.0,
+                'updated_at': None,
+                'consecutive_failures': 0,
+                'cooldown_until': 0.0,
+                'attempts': 0,
+                'successes': 0
+            }
+            for endpoint in self.endpoints
+        }
+
+    def _decayed_score(self, stats: Dict, now: float) -> float:
+        if stats['updated_at'] is None or self.half_life <= 0:
+            return stats['score']
+        decay = math.pow(0.5, (now - stats['updated_at']) / self.half_life)
+        return self.NEUTRAL_SCORE + (stats['score'] - self.NEUTRAL_SCORE) * decay
+
+    def _utility(self, stats: Dict, now: float) -> float:
+        # 成功率越高、延迟越低越优先
+        return self._decayed_score(stats, now) / (1 + stats['latency'])
+
+    def ordered(self) -> List[str]:
+        """返回本次应尝试的端点（按得分从高到低），全部冷却时只返回最早恢复的一个"""
+        now = time.time()
+        with self._lock:
+            available = [e for e in self.endpoints if self._stats[e]['cooldown_until'] <= now]
+            if not available:
+                return [min(self.endpoints, key=lambda e: self._stats[e]['cooldown_until'])]
+            return sorted(available, key=lambda e: self._utility(self._stats[e], now), reverse=True)
+
+    def record(self, endpoint: str, success: bool, latency: float):
+        """记录一次请求结果"""
+        now = time.time()
+        with self._lock:
+            stats = self._stats.get(endpoint)
+            if stats is None:
+                return
+
+            score = self._decayed_score(stats, now)
+            stats['score'] = score + self.alpha * ((1.0 if success else 0.0) - score)
+            stats['latency'] = latency if stats['attempts'] == 0 else (
+                stats['latency'] + self.alpha * (latency - stats['latency'])
+            )
+            stats['updated_at'] = now
+            stats['attempts'] += 1
+
+            if success:
+                stats['successes'] += 1
+                stats['consecutive_failures'] = 0
+                stats['cooldown_until'] = 0.0
+                return
+
+            stats['consecutive_failures'] += 1
+            overflow = stats['consecutive_failures'] - self.failure_threshold
+            if overflow >= 0:
+                cooldown = min(self.cooldown * (2 ** overflow), self.max_cooldown)
+                stats['cooldown_until'] = now + cooldown
+                logger.warning(f"端点连续失败 {stats['consecutive_failures']} 次，暂停探测 {int(cooldown)} 秒: {endpoint}")
+
+    def get_status(self) -> List[Dict]:
+        """获取各端点当前得分，按尝试顺序排列"""
+        now = time.time()
+        order = self.ordered()
+        with self._lock:
+            return [
+                {
+                    'endpoint': endpoint,
+                    'rank': order.index(endpoint) + 1 if endpoint in order else None,
+                    'score': round(self._decayed_score(stats, now), 4),
+                    'latency_ms': round(stats['latency'] * 1000, 1),
+                    'attempts': stats['attempts'],
+                    'successes': stats['successes'],
+                    'consecutive_failures': stats['consecutive_failures'],
+                    'cooldown_remaining': max(0, int(stats['cooldown_until'] - now))
+                }
+                for endpoint, stats in sorted(
+                    self._stats.items(),
+                    key=lambda item: order.index(item[0]) if item[0] in order else len(order)
+                )
+            ]
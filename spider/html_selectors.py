@@ -0,0 +1,30 @@
+from typing import Optional
+from lxml import etree, html as lxml_html
+
+def has_class(name: str) -> str:
+    """XPath条件：元素的class属性包含指定类名（与CSS的 .name 语义相同）"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def parse_html(text: str):
+    """使用lxml解析HTML文档，返回根元素"""
+    return lxml_html.document_fromstring(text)
+
+def first(elements) -> Optional[etree._Element]:
+    return elements[0] if elements else None
+
+def text_of(element) -> str:
+    """元素及其子元素的文本（去除首尾空白）"""
+    return element.text_content().strip() if element is not None else ''
+
+def outer_html(element) -> str:
+    return etree.tostring(element, encoding='unicode', method='html')
+
+# 预编译的选择器，模块加载时编译一次，解析每个页面时直接复用
+
+# 东财股吧列表页
+EASTMONEY_POST_ITEMS = etree.XPath(f"//div[{has_class('articleh')}]")
+EASTMONEY_TITLE = etree.XPath(f".//span[{has_class('l3')}]")
+EASTMONEY_TITLE_LINK = etree.XPath(".//a/@href")
+
+# 淘股吧用户页
+TAOGUBA_POST_ITEMS = etree.XPath(f"//div[{has_class('post-item')}]")
@@ -0,0 +1,131 @@
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from loguru import logger
+from config import config
+import asyncio
+import threading
+import time
+
+class TokenBucket:
+    """令牌桶：按 rate（每秒）补充令牌，最多积累 burst 个
+
+    采用预约方式取令牌：令牌不足时仍立即扣减（允许为负），返回调用方需要等待的时间，
+    并发请求因此按到达顺序依次排队，同步和异步调用方都只需按返回值等待。
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.request_count = 0
+        self.throttled_count = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数"""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.request_count += 1
+            if wait > 0:
+                self.throttled_count += 1
+                self.total_wait += wait
+            return wait
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            if self.rate > 0:
+                self._refill(time.monotonic())
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(self.tokens, 2),
+                # 令牌为负时，新请求需要排队等待的时间
+                'queue_delay': round(-self.tokens / self.rate, 2) if self.rate > 0 and self.tokens < 0 else 0,
+                'requests': self.request_count,
+                'throttled': self.throttled_count,
+                'total_wait': round(self.total_wait, 2)
+            }
+
+class RateLimiter:
+    """按平台（可选按主机）限速的令牌桶集合，所有爬虫实例共享
+
+    每个请求先从平台令牌桶取令牌，请求的主机单独配置了限速时同时从主机令牌桶取令牌，
+    等待时间取两者较大值。
+    """
+
+    def __init__(self, enabled: bool = True, default: Optional[Dict] = None,
+                 platforms: Optional[Dict[str, Dict]] = None, hosts: Optional[Dict[str, Dict]] = None):
+        self.enabled = enabled
+        self.default = default or {}
+        self.platform_limits = platforms or {}
+        self.host_limits = hosts or {}
+        self._lock = threading.Lock()
+        self._platform_buckets: Dict[str, TokenBucket] = {}
+        self._host_buckets: Dict[str, TokenBucket] = {}
+
+    def _get_bucket(self, buckets: Dict[str, TokenBucket], key: str, limits: Dict) -> TokenBucket:
+        with self._lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(limits.get('rate', 0), limits.get('burst', 1))
+                buckets[key] = bucket
+            return bucket
+
+    def reserve(self, platform: str, url: str) -> float:
+        """为一次请求取令牌，返回需要等待的秒数"""
+        if not self.enabled:
+            return 0.0
+
+        limits = self.platform_limits.get(platform, self.default)
+        wait = self._get_bucket(self._platform_buckets, platform, limits).reserve()
+
+        host = urlparse(url).hostname
+        if host and host in self.host_limits:
+            wait = max(wait, self._get_bucket(self._host_buckets, host, self.host_limits[host]).reserve())
+
+        return wait
+
+    def acquire(self, platform: str, url: str) -> float:
+        """阻塞等待直到允许发出请求，返回等待的秒数"""
+        wait = self.reserve(platform, url)
+        if wait > 0:
+            logger.debug(f"{platform} 请求限速，等待 {wait:.2f} 秒: {url}")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, platform: str, url: str) -> float:
+        """非阻塞等待直到允许发出请求，返回等待的秒数"""
+        wait = self.reserve(platform, url)
+        if wait > 0:
+            logger.debug(f"{platform} 请求限速，等待 {wait:.2f} 秒: {url}")
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            platform_buckets = dict(self._platform_buckets)
+            host_buckets = dict(self._host_buckets)
+        return {
+            'enabled': self.enabled,
+            'platforms': {platform: bucket.get_status() for platform, bucket in platform_buckets.items()},
+            'hosts': {host: bucket.get_status() for host, bucket in host_buckets.items()}
+        }
+
+# 创建全局限速器实例
+rate_limiter = RateLimiter(
+    enabled=config.RATE_LIMIT_ENABLED,
+    default=config.RATE_LIMIT_DEFAULT,
+    platforms=config.RATE_LIMIT_PLATFORMS,
+    hosts=config.RATE_LIMIT_HOSTS
+)
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from config import config
+import random
+import threading
+
+# 重复发送不会产生副作用的请求方法，默认只重试这些请求
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# 默认可重试的响应状态码（限流和服务端临时错误）
+DEFAULT_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或HTTP日期），无法解析时返回None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RetryBudget:
+    """单次爬取可用的重试次数，防止多个请求各自重试累积占用过长时间"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self) -> bool:
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+class RetryPolicy:
+    """指数退避加随机抖动的重试策略
+
+    第 attempt 次失败后的等待时间在 [0, min(max_delay, base_delay * 2^attempt)] 内随机（full jitter），
+    避免同一平台的多个任务同时重试。服务端给出 Retry-After 时按其等待，超过 max_delay 则放弃重试。
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 1, max_delay: float = 30):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """第 attempt 次（从0开始）失败后的等待秒数，不应再重试时返回None"""
+        if attempt >= self.max_retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+# 创建全局重试策略实例
+retry_policy = RetryPolicy(
+    max_retries=config.MAX_RETRY_TIMES,
+    base_delay=config.RETRY_BASE_DELAY,
+    max_delay=config.RETRY_MAX_DELAY
+)
@@ -0,0 +1,126 @@
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from loguru import logger
+import hashlib
+import json
+import requests
+import threading
+import time
+
+def credential_key(auth_config: Optional[Dict[str, Any]]) -> str:
+    """认证配置的指纹，未配置认证时为空字符串"""
+    if not auth_config:
+        return ''
+    payload = json.dumps(auth_config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+class SessionPool:
+    """按 (平台, 认证配置) 复用的 requests.Session 池
+
+    会话在多次爬取之间保留，复用 keep-alive 连接（免去重复的 TLS 握手）和 cookie。
+    认证时写入会话的 cookie 和请求头只属于对应账号，因此不同认证配置的会话分开池化，
+    避免一个爬虫配置的登录态被其他配置借用。
+    超过最大存活时间的会话会被关闭重建，取出会话时清理已过期的 cookie。
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 max_idle_sessions: int = 4, max_session_age: int = 3600):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_idle_sessions = max_idle_sessions
+        self.max_session_age = max_session_age
+
+        # 空闲会话 {(platform, credential_key): deque[(session, created_at)]}
+        self._idle = defaultdict(deque)
+        # 已借出会话的创建时间 {id(session): created_at}
+        self._leased = {}
+        self._lock = threading.Lock()
+
+        self.created_count = 0
+        self.reused_count = 0
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @staticmethod
+    def _pool_key(platform: str, auth_config: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        return platform, credential_key(auth_config)
+
+    def acquire(self, platform: str, auth_config: Optional[Dict[str, Any]] = None) -> requests.Session:
+        """借出一个使用该认证配置的平台会话，没有可用的空闲会话时新建"""
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle[self._pool_key(platform, auth_config)]
+            while idle:
+                session, created_at = idle.pop()
+                if now - created_at > self.max_session_age:
+                    session.close()
+                    continue
+                self._leased[id(session)] = created_at
+                self.reused_count += 1
+                break
+            else:
+                session = None
+
+        if session is None:
+            session = self._create_session()
+            with self._lock:
+                self._leased[id(session)] = now
+                self.created_count += 1
+            logger.debug(f"创建新的 {platform} 会话")
+        else:
+            session.cookies.clear_expired_cookies()
+
+        return session
+
+    def release(self, platform: str, session: requests.Session, discard: bool = False,
+                auth_config: Optional[Dict[str, Any]] = None):
+        """归还会话（auth_config 须与借出时相同），discard为True或空闲会话已满时直接关闭"""
+        with self._lock:
+            created_at = self._leased.pop(id(session), time.monotonic())
+            idle = self._idle[self._pool_key(platform, auth_config)]
+            if not discard and len(idle) < self.max_idle_sessions:
+                idle.append((session, created_at))
+                return
+        session.close()
+
+    @contextmanager
+    def lease(self, platform: str, auth_config: Optional[Dict[str, Any]] = None):
+        """以上下文管理器形式借用会话"""
+        session = self.acquire(platform, auth_config)
+        try:
+            yield session
+        finally:
+            self.release(platform, session, auth_config=auth_config)
+
+    def close_all(self):
+        with self._lock:
+            sessions = [session for idle in self._idle.values() for session, _ in idle]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            idle_by_platform = defaultdict(int)
+            for (platform, _), idle in self._idle.items():
+                idle_by_platform[platform] += len(idle)
+            return {
+                'created': self.created_count,
+                'reused': self.reused_count,
+                'leased': len(self._leased),
+                'idle': dict(idle_by_platform)
+            }
+
+def has_valid_cookie(session: requests.Session, name: str) -> bool:
+    """判断会话中是否存在未过期的指定cookie"""
+    for cookie in session.cookies:
+        if cookie.name == name and cookie.value and not cookie.is_expired():
+            return True
+    return False
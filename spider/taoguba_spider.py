@@ -3,12 +3,18 @@ import json
 from datetime import datetime
 from loguru import logger
 from .base_spider import BaseSpider
+from .html_selectors import TAOGUBA_POST_ITEMS, outer_html, parse_html, text_of
+import requests
 
 class TaogubaSpider(BaseSpider):
     """淘股吧爬虫"""
     
-    def __init__(self):
-        super().__init__('taoguba')
+    posts_are_parsed = True
+    # 列表含置顶帖且按回复时间排序
+    timeline_ordered = False
+    
+    def __init__(self, session: requests.Session = None):
+        super().__init__('taoguba', session)
         self.base_url = 'https://www.taoguba.com.cn'
         self.api_url = 'https://www.taoguba.com.cn/api'
     
@@ -25,21 +31,26 @@ class TaogubaSpider(BaseSpider):
             logger.error(f"淘股吧认证失败: {str(e)}")
             return False
     
-    def get_user_posts(self, user_id: str) -> List[Dict[str, Any]]:
-        """获取用户帖子"""
+    def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子（列表不按发帖时间排序，忽略since_id，返回页面上的全部帖子）"""
         try:
             url = f"{self.base_url}/user/{user_id}"
-            response = self.make_request(url)
+            response = self.make_conditional_request(url)
+            if response is None or self.is_content_unchanged(response.content):
+                # 页面自上次获取后未变化，没有新帖子
+                return []
             
-            from bs4 import BeautifulSoup
-            soup = BeautifulSoup(response.text, 'html.parser')
+            # 使用lxml和预编译的XPath解析HTML页面
+            document = parse_html(response.text)
             
             posts = []
+            # 页面没有发帖时间，同一页的帖子使用相同的抓取时间，按页面顺序入库
             # 根据淘股吧页面结构解析帖子
-            post_items = soup.find_all('div', class_='post-item')
+            post_items = TAOGUBA_POST_ITEMS(document)
             
+            fetched_at = datetime.now()
             for item in post_items:
-                post = self.parse_post(item)
+                post = self.parse_post(item, fetched_at)
                 if post:
                     posts.append(post)
             
@@ -49,7 +60,7 @@ class TaogubaSpider(BaseSpider):
             logger.error(f"获取淘股吧用户帖子失败: {str(e)}")
             return []
     
-    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
+    def parse_post(self, raw_post: Any, fetched_at: datetime = None) -> Dict[str, Any]:
         """解析帖子数据"""
         try:
             return {
@@ -57,9 +68,9 @@ class TaogubaSpider(BaseSpider):
                 'post_id': '',  # 需要从页面中提取
                 'user_id': '',
                 'username': '',
-                'content': raw_post.get_text().strip(),
-                'post_time': datetime.now(),
-                'raw_data': str(raw_post)
+                'content': text_of(raw_post),
+                'post_time': fetched_at or datetime.now(),
+                'raw_data': outer_html(raw_post)
             }
         except Exception as e:
             logger.error(f"解析淘股吧帖子失败: {str(e)}")
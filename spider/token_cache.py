@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+from config import config
+import json
+import os
+import threading
+import time
+
+class TokenCache:
+    """平台访问令牌（cookie）缓存
+
+    预热页面获取到的cookie保存在内存中并持久化到磁盘，同一平台的所有配置共享，
+    进程重启后也可直接复用。只有爬虫检测到令牌失效（WAF拦截或4xx响应）时才会作废并重新获取。
+    """
+
+    def __init__(self, cache_file: str, ttl_hours: float = 12):
+        self.cache_file = Path(cache_file)
+        self.ttl_seconds = ttl_hours * 3600
+        self._lock = threading.Lock()
+        # {platform: {'cookies': [...], 'token': str, 'saved_at': float}}
+        self._entries: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception as e:
+            logger.error(f"读取令牌缓存失败: {str(e)}")
+            return {}
+
+    def _save(self):
+        """原子写入缓存文件（调用方需持有锁）"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"保存令牌缓存失败: {str(e)}")
+
+    def _is_valid(self, entry: Dict) -> bool:
+        if not entry or not entry.get('token'):
+            return False
+        now = time.time()
+        if now - entry.get('saved_at', 0) > self.ttl_seconds:
+            return False
+        # cookie自带过期时间时以其为准
+        expires = entry.get('expires')
+        return expires is None or expires > now
+
+    def get(self, platform: str) -> Optional[List[Dict]]:
+        """获取平台有效的cookie列表，不存在或已过期时返回None"""
+        with self._lock:
+            entry = self._entries.get(platform)
+            if self._is_valid(entry):
+                return entry['cookies']
+            return None
+
+    def get_token(self, platform: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(platform)
+            return entry['token'] if self._is_valid(entry) else None
+
+    def put(self, platform: str, token: str, cookies: List[Dict], expires: Optional[float] = None):
+        """保存平台令牌及其cookie（name/value/domain/path）"""
+        with self._lock:
+            self._entries[platform] = {
+                'token': token,
+                'cookies': cookies,
+                'expires': expires,
+                'saved_at': time.time()
+            }
+            self._save()
+        logger.info(f"已缓存 {platform} 访问令牌")
+
+    def invalidate(self, platform: str, token: Optional[str] = None):
+        """作废平台令牌；指定token时仅在缓存的仍是该令牌时作废，避免并发任务重复刷新"""
+        with self._lock:
+            entry = self._entries.get(platform)
+            if not entry or (token is not None and entry.get('token') != token):
+                return
+            del self._entries[platform]
+            self._save()
+        logger.info(f"{platform} 访问令牌已失效")
+
+# 创建全局令牌缓存实例
+token_cache = TokenCache(config.TOKEN_CACHE_FILE, config.TOKEN_CACHE_TTL_HOURS)
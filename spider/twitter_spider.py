@@ -3,12 +3,15 @@ import tweepy
 from datetime import datetime
 from loguru import logger
 from .base_spider import BaseSpider
+import requests
 
 class TwitterSpider(BaseSpider):
     """推特爬虫"""
     
-    def __init__(self):
-        super().__init__('twitter')
+    posts_are_parsed = True
+    
+    def __init__(self, session: requests.Session = None):
+        super().__init__('twitter', session)
         self.api = None
     
     def authenticate(self, auth_config: Dict[str, Any]) -> bool:
@@ -41,17 +44,21 @@ class TwitterSpider(BaseSpider):
             logger.error(f"推特认证失败: {str(e)}")
             return False
     
-    def get_user_posts(self, user_id: str) -> List[Dict[str, Any]]:
-        """获取用户帖子"""
+    def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子（通过API的since_id参数只获取更新的推文）"""
         try:
             if not self.api:
                 return []
             
-            tweets = self.api.get_users_tweets(
-                id=user_id,
-                max_results=20,
-                tweet_fields=['created_at', 'text', 'author_id']
-            )
+            params = {
+                'id': user_id,
+                'max_results': max(5, min(limit, 100)),
+                'tweet_fields': ['created_at', 'text', 'author_id']
+            }
+            if since_id:
+                params['since_id'] = since_id
+            
+            tweets = self.api.get_users_tweets(**params)
             
             posts = []
             if tweets.data:
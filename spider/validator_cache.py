@@ -0,0 +1,60 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import config
+import threading
+
+class ValidatorCache:
+    """按URL缓存响应的 ETag / Last-Modified，用于发起条件请求
+
+    页面未变化时服务端返回不带响应体的304，爬虫可直接跳过下载和解析。
+    按平台统计命中（304）和未命中（返回完整页面）次数。
+    """
+
+    def __init__(self, max_entries: int = 2000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # {url: {'etag': str, 'last_modified': str}}，按最近使用排序
+        self._validators: OrderedDict = OrderedDict()
+        # {platform: {'hits': int, 'misses': int}}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """获取URL对应的条件请求头，没有缓存时返回空字典"""
+        with self._lock:
+            validators = self._validators.get(url)
+            if not validators:
+                return {}
+            self._validators.move_to_end(url)
+
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str]):
+        """保存完整响应的验证器，响应不带验证器时清除旧记录"""
+        with self._lock:
+            if not etag and not last_modified:
+                self._validators.pop(url, None)
+                return
+            self._validators[url] = {'etag': etag, 'last_modified': last_modified}
+            self._validators.move_to_end(url)
+            while len(self._validators) > self.max_entries:
+                self._validators.popitem(last=False)
+
+    def record(self, platform: str, hit: bool):
+        with self._lock:
+            stats = self._stats.setdefault(platform, {'hits': 0, 'misses': 0})
+            stats['hits' if hit else 'misses'] += 1
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._validators),
+                'platforms': {platform: dict(stats) for platform, stats in self._stats.items()}
+            }
+
+# 创建全局验证器缓存实例
+validator_cache = ValidatorCache(config.VALIDATOR_CACHE_MAX_ENTRIES)
@@ -2,15 +2,63 @@ from typing import List, Dict, Any
 import json
 from datetime import datetime
 from loguru import logger
-from .base_spider import BaseSpider
+from .base_spider import BaseSpider, PageFetchError, take_newer_than
+import requests
 
-class WeiboSpider(BaseSpider):
+WEIBO_TIMELINE_URL = 'https://weibo.com/ajax/statuses/mymblog'
+# 用于验证登录状态
+WEIBO_PROFILE_URL = 'https://weibo.com/ajax/profile/info'
+WEIBO_HEADERS = {
+    'Referer': 'https://weibo.com/',
+    'X-Requested-With': 'XMLHttpRequest'
+}
+
+class WeiboParserMixin:
+    """微博接口请求参数和响应解析逻辑，同步与异步爬虫共用"""
+    
+    api_url = WEIBO_TIMELINE_URL
+    
+    @staticmethod
+    def _page_params(user_id: str, page: int) -> Dict[str, Any]:
+        """时间线接口第page页的请求参数"""
+        return {
+            'uid': user_id,
+            'page': page,
+            'feature': 0
+        }
+    
+    @staticmethod
+    def _extract_posts(data: Dict[str, Any]) -> List[Any]:
+        """从时间线接口的JSON中取出原始微博列表"""
+        if 'data' in data and 'list' in data['data']:
+            return data['data']['list']
+        return []
+    
+    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
+        """解析帖子数据"""
+        try:
+            return {
+                'platform': self.platform,
+                'post_id': str(raw_post.get('id', '')),
+                'user_id': str(raw_post.get('user', {}).get('id', '')),
+                'username': raw_post.get('user', {}).get('screen_name', ''),
+                'content': raw_post.get('text_raw', ''),
+                'post_time': datetime.strptime(raw_post.get('created_at', ''), '%a %b %d %H:%M:%S %z %Y'),
+                'raw_data': raw_post
+            }
+        except Exception as e:
+            logger.error(f"解析微博帖子失败: {str(e)}")
+            return None
+
+class WeiboSpider(WeiboParserMixin, BaseSpider):
     """新浪微博爬虫"""
     
-    def __init__(self):
-        super().__init__('weibo')
+    supports_paging = True
+    posts_are_parsed = True
+    
+    def __init__(self, session: requests.Session = None):
+        super().__init__('weibo', session)
         self.base_url = 'https://weibo.com'
-        self.api_url = 'https://weibo.com/ajax/statuses/mymblog'
     
     def authenticate(self, auth_config: Dict[str, Any]) -> bool:
         """微博认证"""
@@ -21,56 +69,36 @@ class WeiboSpider(BaseSpider):
                 self.session.cookies.update(cookies)
             
             # 设置必要的headers
-            self.session.headers.update({
-                'Referer': 'https://weibo.com/',
-                'X-Requested-With': 'XMLHttpRequest'
-            })
+            self.session.headers.update(WEIBO_HEADERS)
             
             # 验证登录状态
-            response = self.make_request('https://weibo.com/ajax/profile/info')
+            response = self.make_request(WEIBO_PROFILE_URL)
             return response.status_code == 200
             
         except Exception as e:
             logger.error(f"微博认证失败: {str(e)}")
             return False
     
-    def get_user_posts(self, user_id: str) -> List[Dict[str, Any]]:
-        """获取用户帖子"""
+    def get_user_posts(self, user_id: str, limit: int = 20, since_id: str = None) -> List[Dict[str, Any]]:
+        """获取用户帖子（接口不支持按ID增量获取，解析前跳过不比since_id新的帖子）"""
+        posts = []
+        for item in take_newer_than(self.get_user_posts_page(user_id, 1), since_id, lambda item: item.get('id')):
+            post = self.parse_post(item)
+            if post:
+                posts.append(post)
+        return posts
+    
+    def get_user_posts_page(self, user_id: str, page: int, page_size: int = 20,
+                            raise_errors: bool = False) -> List[Any]:
+        """获取第page页的原始微博（每页条数由接口决定）"""
         try:
-            params = {
-                'uid': user_id,
-                'page': 1,
-                'feature': 0
-            }
-            
-            response = self.make_request(self.api_url, params=params)
-            data = response.json()
-            
-            posts = []
-            if 'data' in data and 'list' in data['data']:
-                for item in data['data']['list']:
-                    post = self.parse_post(item)
-                    if post:
-                        posts.append(post)
-            
-            return posts
+            response = self.make_request(self.api_url, params=self._page_params(user_id, page))
+            if page == 1 and self.is_content_unchanged(response.content):
+                return []
+            return self._extract_posts(response.json())
             
         except Exception as e:
             logger.error(f"获取微博用户帖子失败: {str(e)}")
+            if raise_errors:
+                raise PageFetchError(f"获取微博用户 {user_id} 第 {page} 页失败: {str(e)}") from e
             return []
-    
-    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
-        """解析帖子数据"""
-        try:
-            return {
-                'platform': self.platform,
-                'post_id': str(raw_post.get('id', '')),
-                'user_id': str(raw_post.get('user', {}).get('id', '')),
-                'username': raw_post.get('user', {}).get('screen_name', ''),
-                'content': raw_post.get('text_raw', ''),
-                'post_time': datetime.strptime(raw_post.get('created_at', ''), '%a %b %d %H:%M:%S %z %Y'),
-                'raw_data': raw_post
-            }
-        except Exception as e:
-            logger.error(f"解析微博帖子失败: {str(e)}")
-            return None
\ No newline at end of file
@@ -3,15 +3,194 @@ import json
 import re
 import requests
 from datetime import datetime
+from urllib.parse import urlparse
 from loguru import logger
 from fake_useragent import UserAgent
-from .base_spider import BaseSpider
+from .base_spider import BaseSpider, PageFetchError, take_newer_than
+from .session_pool import has_valid_cookie
+from .token_cache import token_cache
+from .endpoint_selector import EndpointSelector
+from .circuit_breaker import CircuitOpenError
+from .retry_policy import DEFAULT_RETRYABLE_STATUSES, parse_retry_after
+from config import config
 import time
-import random
 
-class XueqiuSpider(BaseSpider):
-    def __init__(self):
-        super().__init__('xueqiu')
+# 模拟真实浏览器的请求头
+XUEQIU_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Sec-Fetch-Dest': 'empty',
+    'Sec-Fetch-Mode': 'cors',
+    'Sec-Fetch-Site': 'same-origin',
+    'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"'
+}
+
+# 标识访问令牌的cookie，缺失或失效时API会被WAF拦截
+XUEQIU_TOKEN_COOKIE = 'xq_a_token'
+
+# 令牌失效时API返回的状态码（4xx中排除端点不存在和限流）
+XUEQIU_TOKEN_INVALID_STATUS = {400, 401, 403}
+
+# 用户时间线API端点（没有历史数据时的尝试顺序）
+XUEQIU_TIMELINE_ENDPOINTS = [
+    'https://xueqiu.com/v4/statuses/user_timeline.json',
+    'https://xueqiu.com/statuses/user_timeline.json',
+    'https://xueqiu.com/v5/statuses/user_timeline.json'
+]
+
+# 时间线端点的成功率和延迟统计，所有雪球爬虫共享，每次按得分从高到低尝试
+xueqiu_endpoint_selector = EndpointSelector(
+    XUEQIU_TIMELINE_ENDPOINTS,
+    alpha=config.ENDPOINT_SCORE_ALPHA,
+    half_life=config.ENDPOINT_SCORE_HALF_LIFE,
+    failure_threshold=config.ENDPOINT_FAILURE_THRESHOLD,
+    cooldown=config.ENDPOINT_COOLDOWN,
+    max_cooldown=config.ENDPOINT_MAX_COOLDOWN
+)
+
+# 页面中保存初始数据的脚本变量赋值，匹配到等号后从紧跟的 { 开始解码
+XUEQIU_STATE_ASSIGNMENT = re.compile(r'window\.(?:SNB|__INITIAL_STATE__|__NUXT__)\s*=\s*')
+
+# 页面中内嵌的帖子列表字段，匹配到冒号后从紧跟的 [ 开始解码
+XUEQIU_STATUSES_KEY = re.compile(r'"statuses"\s*:\s*')
+
+# 初始数据中帖子列表的已知位置，按顺序直接查找
+XUEQIU_STATUSES_PATHS = (
+    ('statuses',),
+    ('data', 'statuses'),
+    ('timeline', 'statuses'),
+    ('profile', 'statuses'),
+    ('user', 'statuses'),
+)
+
+_json_decoder = json.JSONDecoder()
+
+def _decode_json_at(text, pos, opening):
+    """从 text[pos] 开始解码一个完整的JSON值，该位置不是 opening 或解码失败时返回None"""
+    if text[pos:pos + 1] != opening:
+        return None
+    try:
+        return _json_decoder.raw_decode(text, pos)[0]
+    except json.JSONDecodeError:
+        return None
+
+class XueqiuParserMixin:
+    """雪球响应解析逻辑，同步与异步爬虫共用"""
+    
+    # 限流和服务端临时错误可重试；令牌失效的4xx和WAF拦截需要重新预热令牌，由 _fetch_timeline 处理
+    retryable_statuses = DEFAULT_RETRYABLE_STATUSES
+    
+    def _is_waf_blocked(self, response_text):
+        """检测是否被WAF拦截"""
+        waf_indicators = [
+            'aliyun_waf',
+            'renderData',
+            '_waf_',
+            'anti-scraping',
+            'verification required'
+        ]
+        
+        response_lower = response_text.lower()
+        return any(indicator in response_lower for indicator in waf_indicators)
+    
+    def is_blocked(self, response) -> bool:
+        """时间线JSON接口返回WAF拦截页的请求计为平台失败
+
+        首页和用户主页（预热cookie、HTML降级）本身就包含 renderData 等特征，不做拦截检测。
+        """
+        if response.status_code != 200 or not urlparse(str(response.url)).path.endswith('.json'):
+            return False
+        return self._is_waf_blocked(response.text)
+    
+    def _parse_html_content(self, html_content, limit):
+        """解析HTML内容
+
+        只扫描一遍页面找到初始数据的脚本赋值，从紧跟的 { 开始用 raw_decode 解码完整的JSON对象，
+        不再用多个非贪婪的 DOTALL 正则反复截取候选片段。
+        """
+        for match in XUEQIU_STATE_ASSIGNMENT.finditer(html_content):
+            data = _decode_json_at(html_content, match.end(), '{')
+            statuses = self._extract_statuses_from_dict(data) if data else []
+            if statuses:
+                logger.info(f"从HTML中提取到 {len(statuses)} 条数据")
+                return statuses[:limit]
+        
+        # 页面没有可用的初始数据变量时，查找内嵌的 "statuses": [...] 片段
+        for match in XUEQIU_STATUSES_KEY.finditer(html_content):
+            statuses = _decode_json_at(html_content, match.end(), '[')
+            if statuses:
+                logger.info(f"从HTML中提取到 {len(statuses)} 条数据")
+                return statuses[:limit]
+        
+        logger.warning("HTML解析未找到有效数据")
+        return []
+    
+    def _extract_statuses_from_dict(self, data):
+        """从字典中提取statuses，先查已知路径，找不到时再遍历整个对象"""
+        if isinstance(data, dict):
+            for path in XUEQIU_STATUSES_PATHS:
+                value = data
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if isinstance(value, list) and value:
+                    return value
+        
+        # 深度优先遍历，用显式栈避免嵌套过深的页面数据触发递归上限
+        stack = [data]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                statuses = node.get('statuses')
+                if isinstance(statuses, list) and statuses:
+                    return statuses
+                children = node.values()
+            elif isinstance(node, list):
+                children = node
+            else:
+                continue
+            stack.extend(child for child in reversed(list(children)) if isinstance(child, (dict, list)))
+        
+        return []
+    
+    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
+        """解析帖子数据"""
+        try:
+            # 处理时间戳
+            created_at = raw_post.get('created_at', 0)
+            if isinstance(created_at, (int, float)):
+                # 雪球的时间戳是毫秒级
+                post_time = datetime.fromtimestamp(created_at / 1000)
+            else:
+                post_time = datetime.now()
+            
+            return {
+                'platform': self.platform,
+                'post_id': str(raw_post.get('id', '')),
+                'user_id': str(raw_post.get('user', {}).get('id', '')),
+                'username': raw_post.get('user', {}).get('screen_name', ''),
+                'content': raw_post.get('text', ''),
+                'post_time': post_time,
+                'reply_count': raw_post.get('reply_count', 0),
+                'retweet_count': raw_post.get('retweet_count', 0),
+                'fav_count': raw_post.get('fav_count', 0),
+                'raw_data': raw_post
+            }
+        except Exception as e:
+            logger.error(f"解析雪球帖子失败: {str(e)}")
+            return None
+
+class XueqiuSpider(XueqiuParserMixin, BaseSpider):
+    supports_paging = True
+    
+    def __init__(self, session: requests.Session = None):
+        super().__init__('xueqiu', session)
+        self._token_invalid = False
+        self._retry_after = None
         self.ua = UserAgent()
         self.setup_session()
     
@@ -29,33 +208,20 @@ class XueqiuSpider(BaseSpider):
     def setup_session(self):
         """设置会话，模拟真实浏览器行为"""
         # 更真实的浏览器头
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/json, text/plain, */*',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Sec-Fetch-Dest': 'empty',
-            'Sec-Fetch-Mode': 'cors',
-            'Sec-Fetch-Site': 'same-origin',
-            'sec-ch-ua': '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
-            'sec-ch-ua-mobile': '?0',
-            'sec-ch-ua-platform': '"macOS"'
-        })
+        self.session.headers.update(XUEQIU_HEADERS)
     
     def get_initial_cookies(self, user_id):
         """获取初始cookies，模拟真实访问流程"""
         try:
             # 1. 先访问首页
             logger.info("访问雪球首页...")
-            response = self.session.get('https://xueqiu.com/', timeout=10)
-            time.sleep(random.uniform(1, 3))
+            response = self.request_with_retry('https://xueqiu.com/')
             
             # 2. 访问用户页面
             logger.info(f"访问用户页面 {user_id}...")
             user_url = f'https://xueqiu.com/u/{user_id}'
             self.session.headers['Referer'] = 'https://xueqiu.com/'
-            response = self.session.get(user_url, timeout=10)
+            response = self.request_with_retry(user_url)
             
             if response.status_code == 200:
                 logger.info("成功获取用户页面")
@@ -70,166 +236,189 @@ class XueqiuSpider(BaseSpider):
             logger.error(f"获取初始cookies失败: {e}")
             return False
     
-    def get_user_posts(self, user_id, limit=20):
-        """获取用户发帖（增强版，带重试机制）"""
-        max_retries = 3
+    def ensure_token(self, user_id) -> bool:
+        """确保会话持有有效令牌：优先使用共享缓存，缓存为空时才预热页面重新获取"""
+        cookies = token_cache.get(self.platform)
+        if cookies:
+            for cookie in cookies:
+                self.session.cookies.set(
+                    cookie['name'], cookie['value'],
+                    domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+                )
+            self.session.headers['Referer'] = f'https://xueqiu.com/u/{user_id}'
+            return True
+        
+        if not self.get_initial_cookies(user_id):
+            return False
+        self._store_token()
+        return True
+    
+    def _store_token(self):
+        """将预热获取到的cookie写入共享缓存"""
+        if not has_valid_cookie(self.session, XUEQIU_TOKEN_COOKIE):
+            logger.warning("预热后未获取到雪球访问令牌")
+            return
+        
+        token_cookie = None
+        cookies = []
+        for cookie in self.session.cookies:
+            if not cookie.domain.endswith('xueqiu.com'):
+                continue
+            if cookie.name == XUEQIU_TOKEN_COOKIE:
+                token_cookie = cookie
+            cookies.append({'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain, 'path': cookie.path})
         
-        for attempt in range(max_retries):
+        if token_cookie:
+            token_cache.put(self.platform, token_cookie.value, cookies, expires=token_cookie.expires)
+    
+    def _invalidate_token(self):
+        """作废当前会话使用的令牌，下次获取时重新预热"""
+        self._token_invalid = True
+        token_cache.invalidate(self.platform, self.session.cookies.get(XUEQIU_TOKEN_COOKIE))
+    
+    def get_user_posts(self, user_id, limit=20, since_id=None):
+        """获取用户发帖，只返回比since_id新的帖子"""
+        statuses = self._fetch_timeline(user_id, limit, page=1)
+        return take_newer_than(statuses, since_id, lambda status: status.get('id'))
+    
+    def get_user_posts_page(self, user_id, page, page_size=20, raise_errors=False):
+        """获取时间线第page页的原始动态"""
+        return self._fetch_timeline(user_id, page_size, page, raise_errors)
+    
+    def _fetch_timeline(self, user_id, limit, page=1, raise_errors=False):
+        """获取时间线指定页，所有端点失败或令牌失效时按统一的退避策略重试"""
+        attempt = 0
+        
+        while True:
             logger.info(f"尝试第 {attempt + 1} 次获取用户 {user_id} 的数据...")
+            self._retry_after = None
             
             try:
-                # 重新获取cookies
-                if not self.get_initial_cookies(user_id):
-                    continue
-                
-                # 尝试不同的API端点
-                endpoints = [
-                    'https://xueqiu.com/v4/statuses/user_timeline.json',
-                    'https://xueqiu.com/statuses/user_timeline.json',
-                    'https://xueqiu.com/v5/statuses/user_timeline.json'
-                ]
-                
-                for endpoint in endpoints:
-                    result = self._try_api_endpoint(endpoint, user_id, limit)
-                    if result:
-                        logger.success(f"成功获取用户 {user_id} 的 {len(result)} 条动态")
-                        return result
-                    
-                    # 每次尝试后等待
-                    time.sleep(random.uniform(2, 5))
-                
-                logger.warning(f"第 {attempt + 1} 次API尝试失败")
-                time.sleep(random.uniform(5, 10))
+                # 令牌有效时直接请求API，仅在令牌失效后重新获取cookies
+                if self.ensure_token(user_id):
+                    # 按历史表现依次尝试API端点，跳过冷却中的端点
+                    self._token_invalid = False
+                    for endpoint in xueqiu_endpoint_selector.ordered():
+                        result = self._try_api_endpoint(endpoint, user_id, limit, page)
+                        if result:
+                            logger.success(f"成功获取用户 {user_id} 的 {len(result)} 条动态")
+                            return result
+                        # 后续页返回空列表说明已到时间线末尾，首页内容未变化时也无需再尝试其他端点
+                        if result is not None and (page > 1 or self.content_unchanged):
+                            return result
+                        
+                        # 令牌已失效时其他端点同样会失败，直接进入下一轮重试
+                        if self._token_invalid:
+                            break
                 
+            except CircuitOpenError as e:
+                # 平台熔断期间不再重试，也不回退到HTML解析
+                logger.warning(f"{e}，跳过用户 {user_id}")
+                if raise_errors:
+                    raise PageFetchError(str(e)) from e
+                return []
             except Exception as e:
                 logger.error(f"第 {attempt + 1} 次尝试异常: {e}")
-                time.sleep(random.uniform(5, 10))
+            
+            if not self.backoff(attempt, f"第 {attempt + 1} 次API尝试失败", self._retry_after):
+                break
+            attempt += 1
+        
+        if raise_errors:
+            raise PageFetchError(f"获取用户 {user_id} 时间线第 {page} 页失败")
+        
+        # 用户页面HTML只包含第一页
+        if page > 1:
+            return []
         
         logger.info("所有API尝试均失败，切换到HTML解析模式")
         return self._fallback_to_html_parsing(user_id, limit)
     
-    def _try_api_endpoint(self, endpoint, user_id, limit):
-        """尝试特定API端点"""
+    def _try_api_endpoint(self, endpoint, user_id, limit, page=1):
+        """尝试特定API端点，结果计入端点得分，请求失败时返回None"""
+        started = time.monotonic()
+        succeeded = False
+        # 只有网络异常、5xx和无效响应体计入端点得分；熔断拒绝的请求未发出，
+        # 令牌失效、WAF拦截和限流与端点本身无关，均不计入
+        attempted = True
         try:
             params = {
                 'user_id': user_id,
-                'page': 1,
+                'page': page,
                 'count': limit,
                 '_': int(time.time() * 1000)  # 添加时间戳防止缓存
             }
             
             logger.debug(f"尝试API: {endpoint}")
-            response = self.session.get(endpoint, params=params, timeout=15)
+            # 端点失败时由 _fetch_timeline 换用其他端点并统一退避，这里不单独重试
+            response = self.fetch(endpoint, params=params)
             
             logger.debug(f"状态码: {response.status_code}")
             logger.debug(f"响应长度: {len(response.text)}")
             
+            if response.status_code in XUEQIU_TOKEN_INVALID_STATUS:
+                logger.warning(f"API返回 {response.status_code}，访问令牌可能已失效")
+                attempted = False
+                self._invalidate_token()
+                return None
+            
+            if self.should_retry(response):
+                logger.warning(f"API返回 {response.status_code}")
+                attempted = response.status_code >= 500
+                self._retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                return None
+            
             if response.status_code == 200:
                 # 检查是否是WAF页面
                 if self._is_waf_blocked(response.text):
                     logger.warning("检测到WAF拦截")
+                    attempted = False
+                    self._invalidate_token()
                     return None
                 
+                if page == 1 and self.is_content_unchanged(response.content):
+                    succeeded = True
+                    return []
+                
                 try:
                     data = response.json()
                     statuses = data.get('statuses', [])
+                    # 返回合法JSON即视为端点可用（用户可能确实没有动态）
+                    succeeded = True
                     if statuses:
                         logger.info(f"API成功获取 {len(statuses)} 条动态")
-                        return statuses
+                    return statuses
                 except json.JSONDecodeError as e:
                     logger.error(f"JSON解析失败: {e}")
             
             return None
             
+        except CircuitOpenError:
+            attempted = False
+            raise
         except Exception as e:
             logger.error(f"API请求异常: {e}")
             return None
-    
-    def _is_waf_blocked(self, response_text):
-        """检测是否被WAF拦截"""
-        waf_indicators = [
-            'aliyun_waf',
-            'renderData',
-            '_waf_',
-            'anti-scraping',
-            'verification required'
-        ]
-        
-        response_lower = response_text.lower()
-        return any(indicator in response_lower for indicator in waf_indicators)
+        finally:
+            if attempted:
+                xueqiu_endpoint_selector.record(endpoint, succeeded, time.monotonic() - started)
     
     def _fallback_to_html_parsing(self, user_id, limit):
         """回退到HTML解析"""
         try:
             logger.info("使用HTML解析模式...")
             url = f'https://xueqiu.com/u/{user_id}'
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                return self._parse_html_content(response.text, limit)
-            else:
-                logger.error(f"HTML页面访问失败: {response.status_code}")
+            response = self.make_conditional_request(url)
+            if response is None or self.is_content_unchanged(response.content):
+                logger.info("用户页面未变化，跳过HTML解析")
                 return []
+            
+            return self._parse_html_content(response.text, limit)
                 
         except Exception as e:
             logger.error(f"HTML解析失败: {e}")
             return []
     
-    def _parse_html_content(self, html_content, limit):
-        """解析HTML内容"""
-        # 尝试提取页面中的JSON数据
-        patterns = [
-            r'window\.SNB\s*=\s*(\{.*?\});',
-            r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});',
-            r'window\.__NUXT__\s*=\s*(\{.*?\});',
-            r'"statuses"\s*:\s*(\[.*?\])',
-        ]
-        
-        for pattern in patterns:
-            matches = re.finditer(pattern, html_content, re.DOTALL)
-            for match in matches:
-                try:
-                    json_str = match.group(1)
-                    data = json.loads(json_str)
-                    
-                    # 尝试提取statuses
-                    if isinstance(data, list):
-                        logger.info(f"从HTML中提取到 {len(data)} 条数据")
-                        return data[:limit]
-                    elif isinstance(data, dict):
-                        statuses = self._extract_statuses_from_dict(data)
-                        if statuses:
-                            logger.info(f"从HTML中提取到 {len(statuses)} 条数据")
-                            return statuses[:limit]
-                            
-                except json.JSONDecodeError:
-                    continue
-        
-        logger.warning("HTML解析未找到有效数据")
-        return []
-    
-    def _extract_statuses_from_dict(self, data):
-        """从字典中递归提取statuses"""
-        if isinstance(data, dict):
-            if 'statuses' in data and isinstance(data['statuses'], list):
-                return data['statuses']
-            
-            # 递归搜索
-            for value in data.values():
-                if isinstance(value, (dict, list)):
-                    result = self._extract_statuses_from_dict(value)
-                    if result:
-                        return result
-        
-        elif isinstance(data, list):
-            for item in data:
-                if isinstance(item, dict):
-                    result = self._extract_statuses_from_dict(item)
-                    if result:
-                        return result
-        
-        return []
-    
     def _get_posts_via_api(self, user_id, limit):
         """通过API获取发帖（保留原方法作为简单版本）"""
         # 先访问用户主页
@@ -277,30 +466,3 @@ class XueqiuSpider(BaseSpider):
         # 这里可以添加BeautifulSoup解析逻辑
         logger.warning("DOM解析功能待实现")
         return []
-
-    def parse_post(self, raw_post: Any) -> Dict[str, Any]:
-        """解析帖子数据"""
-        try:
-            # 处理时间戳
-            created_at = raw_post.get('created_at', 0)
-            if isinstance(created_at, (int, float)):
-                # 雪球的时间戳是毫秒级
-                post_time = datetime.fromtimestamp(created_at / 1000)
-            else:
-                post_time = datetime.now()
-            
-            return {
-                'platform': self.platform,
-                'post_id': str(raw_post.get('id', '')),
-                'user_id': str(raw_post.get('user', {}).get('id', '')),
-                'username': raw_post.get('user', {}).get('screen_name', ''),
-                'content': raw_post.get('text', ''),
-                'post_time': post_time,
-                'reply_count': raw_post.get('reply_count', 0),
-                'retweet_count': raw_post.get('retweet_count', 0),
-                'fav_count': raw_post.get('fav_count', 0),
-                'raw_data': raw_post
-            }
-        except Exception as e:
-            logger.error(f"解析雪球帖子失败: {str(e)}")
-            return None
\ No newline at end of file
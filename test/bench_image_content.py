@@ -0,0 +1,82 @@
+"""帖子图片链接提取与替换性能对比：四个正则逐个扫描 + 逐个 str.replace 与单个预编译分支表达式 + 一次拼接
+
+用法: python test/bench_image_content.py [重复次数]
+
+只比较链接的提取和改写，图片下载替换为固定的URL映射。
+"""
+import hashlib
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from loguru import logger
+from utils.image_cache import ImageCache
+
+LEGACY_PATTERNS = [
+    r'https?://[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?',
+    r'//[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?',
+    r'<img[^>]+src=["\']([^"\'>]+)["\'][^>]*>',
+    r'!\[([^\]]*)\]\(([^)]+)\)',
+]
+
+def cached_url(img_url):
+    """模拟缓存结果：与 ImageCache 相同的本地文件命名"""
+    if img_url.startswith('//'):
+        img_url = 'https:' + img_url
+    ext = img_url.rsplit('.', 1)[-1].split('?')[0].lower()
+    return f"/static/images/cache/{hashlib.md5(img_url.encode()).hexdigest()}.{ext}"
+
+def legacy_process(content):
+    """原实现：每个正则各扫描一遍，每个匹配对整段内容做一次 str.replace"""
+    processed_content = content
+    for pattern in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, content, re.IGNORECASE):
+            group = 1 if 'src=' in pattern else 2 if '![' in pattern else 0
+            img_url = match.group(group)
+            processed_content = processed_content.replace(match.group(group), cached_url(img_url))
+    return processed_content
+
+def build_post(image_count):
+    """构造长帖：正文段落中混排img标签、Markdown图片和直接图片链接"""
+    parts = []
+    for i in range(image_count):
+        url = f'https://xqimg.imedao.com/{i:05d}{"abcdef"[i % 6]}.jpg!800.jpg?w={i}'
+        kind = i % 3
+        if kind == 0:
+            parts.append(f'<p>第{i}段 仓位与估值复盘，' + '长期持有优质资产。' * 20 + f'</p><img class="ke_img" src="{url}" />')
+        elif kind == 1:
+            # 原实现的直接链接正则会把Markdown链接后的 ?... 连同右括号一起吞掉，这里不带查询参数以便对比结果
+            parts.append(f'<p>第{i}段 图表见下 ' + '现金流稳健。' * 20 + f'</p>![图{i}]({url.split("?")[0]})')
+        else:
+            parts.append(f'<p>第{i}段 原图 {url} ' + '估值回到合理区间。' * 20 + '</p>')
+    return '\n'.join(parts)
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f"  {label:<36} {seconds * 1000:8.2f} ms/帖")
+    return seconds
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    logger.remove()
+
+    cache = ImageCache()
+    cache.enabled = True
+    # 不下载图片，直接返回映射后的本地URL
+    cache.prefetch = lambda img_urls: {img_url: cached_url(img_url) for img_url in img_urls}
+
+    for image_count in (9, 100, 500):
+        content = build_post(image_count)
+        assert legacy_process(content) == cache.process_content(content), '改写结果不一致'
+        assert len(cache.extract_image_urls(content)) == image_count, '提取的图片数量不正确'
+
+        print(f"{image_count} 张图片（{len(content.encode('utf-8')) // 1024} KB）")
+        old_time = bench('四个正则 + 逐个 str.replace', lambda: legacy_process(content), number)
+        new_time = bench('预编译分支表达式 + 一次拼接', lambda: cache.process_content(content), number)
+        print(f"  加速比 {old_time / new_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
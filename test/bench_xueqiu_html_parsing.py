@@ -0,0 +1,84 @@
+"""雪球用户主页初始数据提取性能对比：多个 re.DOTALL 非贪婪正则 + json.loads 与单次扫描 + raw_decode
+
+用法: python test/bench_xueqiu_html_parsing.py [重复次数]
+"""
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from loguru import logger
+from spider.xueqiu_spider import XueqiuSpider
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+LEGACY_PATTERNS = [
+    r'window\.SNB\s*=\s*(\{.*?\});',
+    r'window\.__INITIAL_STATE__\s*=\s*(\{.*?\});',
+    r'window\.__NUXT__\s*=\s*(\{.*?\});',
+    r'"statuses"\s*:\s*(\[.*?\])',
+]
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def legacy_extract_statuses(data):
+    if isinstance(data, dict):
+        if 'statuses' in data and isinstance(data['statuses'], list):
+            return data['statuses']
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                result = legacy_extract_statuses(value)
+                if result:
+                    return result
+    elif isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                result = legacy_extract_statuses(item)
+                if result:
+                    return result
+    return []
+
+def legacy_parse(html_content, limit):
+    """原实现：依次用四个 DOTALL 正则截取候选片段后 json.loads"""
+    for pattern in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, html_content, re.DOTALL):
+            try:
+                data = json.loads(match.group(1))
+                if isinstance(data, list):
+                    return data[:limit]
+                elif isinstance(data, dict):
+                    statuses = legacy_extract_statuses(data)
+                    if statuses:
+                        return statuses[:limit]
+            except json.JSONDecodeError:
+                continue
+    return []
+
+def bench(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+    print(f"  {label:<32} {seconds * 1000:8.2f} ms/页")
+    return seconds
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # 屏蔽解析过程中的日志输出，避免影响计时
+    logger.remove()
+
+    spider = XueqiuSpider()
+    html = load_fixture('xueqiu_profile.html')
+
+    old_posts, new_posts = legacy_parse(html, 100), spider._parse_html_content(html, 100)
+    assert old_posts and old_posts == new_posts, '提取结果不一致'
+
+    print(f"雪球 xueqiu_profile.html（{len(html.encode('utf-8')) // 1024} KB，{len(new_posts)} 条帖子）")
+    old_time = bench('re.DOTALL 非贪婪正则 + json.loads', lambda: legacy_parse(html, 100), number)
+    new_time = bench('单次扫描 + raw_decode', lambda: spider._parse_html_content(html, 100), number)
+    print(f"  加速比 {old_time / new_time:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models import Base
+
+class SQLiteDatabaseManager:
+    """测试用的数据库管理器，接口与 DatabaseManager 一致，使用临时SQLite文件"""
+
+    def __init__(self, path):
+        self.engine = create_engine(f'sqlite:///{path}', connect_args={'check_same_thread': False})
+        Base.metadata.create_all(self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine)
+
+    def get_session(self):
+        return self.SessionLocal()
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = SQLiteDatabaseManager(tmp_path / 'test.db')
+    yield manager
+    manager.engine.dispose()
+
+@pytest.fixture
+def scheduler(db_manager):
+    """使用测试数据库的调度器实例（不启动调度线程）"""
+    from utils.scheduler import SpiderScheduler
+    from utils.seen_posts import SeenPostFilter
+    from utils.image_pipeline import ImagePipeline
+
+    instance = SpiderScheduler()
+    instance.db_manager = db_manager
+    instance.adaptive_policy.db_manager = db_manager
+    instance.backfill.db_manager = db_manager
+    instance.seen_posts = SeenPostFilter(db_manager)
+    instance.image_pipeline = ImagePipeline(db_manager)
+    yield instance
+    instance.image_pipeline.shutdown()
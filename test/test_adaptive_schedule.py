@@ -0,0 +1,111 @@
+"""交易日历阶段划分与自适应调度间隔"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from database.models import PostData
+from utils.adaptive_schedule import AdaptiveIntervalPolicy
+from utils.trading_calendar import (
+    AFTER_HOURS, CLOSED, HOLIDAY, LUNCH_BREAK, PRE_MARKET, SESSION, TradingCalendar
+)
+
+# 2024-01-01 为周一，设为节假日；2024-01-05 为周五
+calendar = TradingCalendar(holidays=['2024-01-01'])
+
+@pytest.mark.parametrize('moment, phase', [
+    (datetime(2024, 1, 2, 8, 59), CLOSED),
+    (datetime(2024, 1, 2, 9, 0), PRE_MARKET),
+    (datetime(2024, 1, 2, 9, 30), SESSION),
+    (datetime(2024, 1, 2, 12, 0), LUNCH_BREAK),
+    (datetime(2024, 1, 2, 14, 59), SESSION),
+    (datetime(2024, 1, 2, 16, 0), AFTER_HOURS),
+    (datetime(2024, 1, 2, 20, 0), CLOSED),
+    (datetime(2024, 1, 1, 10, 0), HOLIDAY),
+    (datetime(2024, 1, 6, 10, 0), HOLIDAY),
+])
+def test_get_phase(moment, phase):
+    assert calendar.get_phase(moment) == phase
+
+def test_custom_sessions():
+    custom = TradingCalendar(sessions={'afternoon': ['13:00', '14:00']})
+    assert custom.get_phase(datetime(2024, 1, 2, 14, 30)) == CLOSED
+
+def test_next_phase_change_within_day_and_across_weekend():
+    assert calendar.next_phase_change(datetime(2024, 1, 2, 10, 0)) == datetime(2024, 1, 2, 11, 30)
+    # 周五收盘后到周六零点进入节假日阶段，周一零点再切换为收盘
+    assert calendar.next_phase_change(datetime(2024, 1, 5, 20, 0)) == datetime(2024, 1, 6, 0, 0)
+    assert calendar.next_phase_change(datetime(2024, 1, 6, 10, 0)) == datetime(2024, 1, 8, 0, 0)
+
+def test_phase_hours_for_one_trading_day():
+    hours = calendar.phase_hours(datetime(2024, 1, 2), datetime(2024, 1, 3))
+    assert hours[SESSION] == pytest.approx(4.0)
+    assert hours[LUNCH_BREAK] == pytest.approx(1.5)
+    assert hours[PRE_MARKET] == pytest.approx(0.5)
+    assert hours[AFTER_HOURS] == pytest.approx(2.0)
+    assert hours[CLOSED] == pytest.approx(16.0)
+    assert hours[HOLIDAY] == 0
+
+@pytest.fixture
+def policy(db_manager):
+    policy = AdaptiveIntervalPolicy(db_manager, calendar)
+    policy.phase_multipliers = {SESSION: 0.5, CLOSED: 4.0, HOLIDAY: 6.0}
+    policy.min_interval, policy.max_interval = 30, 7200
+    policy.reference_rate = 1.0
+    policy.min_activity_factor, policy.max_activity_factor = 0.5, 4.0
+    policy.min_samples = 5
+    policy.history_days = 14
+    policy.rate_refresh_seconds = 3600
+    return policy
+
+def make_config(interval=600):
+    return SimpleNamespace(id=1, platform='weibo', user_id='u1', schedule_interval=interval)
+
+def test_interval_scales_with_phase_without_history(policy):
+    config = make_config()
+    assert policy.get_interval(config, datetime(2024, 1, 2, 10, 0)) == 300
+    assert policy.get_interval(config, datetime(2024, 1, 2, 20, 0)) == 2400
+    assert policy.get_interval(config, datetime(2024, 1, 6, 10, 0)) == 3600
+    # 限制在最小、最大间隔之间
+    assert policy.get_interval(make_config(30), datetime(2024, 1, 2, 10, 0)) == 30
+    assert policy.get_interval(make_config(3600), datetime(2024, 1, 6, 10, 0)) == 7200
+
+def test_interval_follows_posting_rate(policy, monkeypatch):
+    config = make_config()
+    rates = {SESSION: 4.0, CLOSED: 0.0}
+    monkeypatch.setattr(policy, 'get_posting_rates', lambda config: rates)
+
+    # 发帖频率为参考值的4倍，间隔缩短为 1/sqrt(4)
+    assert policy.get_interval(config, datetime(2024, 1, 2, 10, 0)) == 150
+    # 不发帖的阶段按系数上限放宽
+    assert policy.get_interval(config, datetime(2024, 1, 2, 20, 0)) == 7200
+
+def test_next_run_time_stops_at_phase_change(policy):
+    config = make_config()
+    base = datetime(2024, 1, 2, 11, 28)
+    assert policy.next_run_time(config, base) == datetime(2024, 1, 2, 11, 30)
+    assert policy.next_run_time(config, datetime(2024, 1, 2, 10, 0)) == datetime(2024, 1, 2, 10, 5)
+
+def store_post_times(db_manager, post_times, prefix=''):
+    session = db_manager.get_session()
+    session.add_all(
+        PostData(platform='weibo', user_id='u1', post_id=f'{prefix}{index}', post_time=post_time)
+        for index, post_time in enumerate(post_times)
+    )
+    session.commit()
+    session.close()
+
+def test_posting_rates_need_enough_samples_and_are_cached(policy, db_manager):
+    config = make_config()
+    recent = datetime.now() - timedelta(days=1)
+    store_post_times(db_manager, [recent] * 4)
+    assert policy.get_posting_rates(config) == {}
+
+    store_post_times(db_manager, [recent - timedelta(minutes=minute) for minute in range(1, 11)], prefix='n')
+    # 缓存未过期时不重新统计
+    assert policy.get_posting_rates(config) == {}
+
+    policy.invalidate(config.id)
+    rates = policy.get_posting_rates(config)
+    assert rates
+    assert sum(rates.values()) > 0
@@ -0,0 +1,145 @@
+"""历史回溯任务：起点锚定、断点续传和失败处理（SQLite）"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from database.models import BackfillJob, PostData, SpiderConfig
+from database.post_store import save_new_posts
+from spider.base_spider import PageFetchError
+from spider.session_pool import SessionPool
+from utils.backfill import BackfillError, BackfillManager
+
+# 时间线为帖子 100..1（从新到旧），每页10条
+TIMELINE_SIZE = 100
+PAGE_SIZE = 10
+
+class TimelineSpider:
+    """按页返回固定时间线的爬虫，fail_pages 中的页码请求失败"""
+
+    supports_paging = True
+    fail_pages = set()
+    requested = []
+
+    def __init__(self, session=None):
+        self.session = session
+
+    def authenticate(self, auth_config):
+        return True
+
+    def reset_retry_budget(self):
+        pass
+
+    def get_user_posts_page(self, user_id, page, page_size=20, raise_errors=False):
+        type(self).requested.append(page)
+        if page in self.fail_pages:
+            raise PageFetchError(f'第 {page} 页请求超时')
+        newest = TIMELINE_SIZE - (page - 1) * PAGE_SIZE
+        return [post_id for post_id in range(newest, newest - PAGE_SIZE, -1) if post_id > 0]
+
+    def parse_post(self, raw_post):
+        return {
+            'post_id': str(raw_post),
+            'content': f'帖子 {raw_post}',
+            'post_time': datetime(2024, 1, 1) + timedelta(minutes=raw_post)
+        }
+
+@pytest.fixture
+def manager(db_manager):
+    TimelineSpider.fail_pages = set()
+    TimelineSpider.requested = []
+    session = db_manager.get_session()
+    session.add(SpiderConfig(platform='test', user_id='u1', auth_config={}))
+    session.commit()
+    session.close()
+
+    backfill = BackfillManager(db_manager, {'test': TimelineSpider}, SessionPool())
+    yield backfill
+    backfill.shutdown()
+    backfill.session_pool.close_all()
+
+def store_newest(db_manager, post_id):
+    session = db_manager.get_session()
+    save_new_posts(session, 'test', 'u1', [TimelineSpider().parse_post(post_id)])
+    session.commit()
+    session.close()
+
+def wait_idle(manager, timeout=10):
+    deadline = time.monotonic() + timeout
+    while manager.get_status()['active_jobs']:
+        assert time.monotonic() < deadline, '回溯任务未在超时时间内结束'
+        time.sleep(0.01)
+    return manager.list_jobs()[0]
+
+def backfilled_ids(db_manager):
+    session = db_manager.get_session()
+    rows = session.query(PostData.post_id).filter(PostData.is_sent == True).all()
+    session.close()
+    return {int(post_id) for (post_id,) in rows}
+
+def test_requires_stored_posts(manager):
+    with pytest.raises(BackfillError):
+        manager.start(1)
+
+def test_saves_only_posts_older_than_newest_stored(manager, db_manager):
+    store_newest(db_manager, 95)
+
+    job = manager.start(1)
+    assert job['max_id'] == '95'
+    job = wait_idle(manager)
+
+    assert job['status'] == 'completed'
+    # 比起点新的帖子留给增量爬取推送
+    assert backfilled_ids(db_manager) == set(range(1, 95))
+    assert job['posts_saved'] == 94
+    # 第11页为空页，到达时间线末尾
+    assert TimelineSpider.requested[-1] == 11
+    # 爬虫使用会话池中的会话，任务结束后归还
+    assert manager.session_pool.get_status()['idle'] == {'test': 1}
+
+def test_page_error_fails_job_and_resume_continues_from_checkpoint(manager, db_manager):
+    store_newest(db_manager, 100)
+    TimelineSpider.fail_pages = {3}
+
+    manager.start(1)
+    job = wait_idle(manager)
+    assert job['status'] == 'failed'
+    assert job['next_page'] == 3
+    assert '第 3 页' in job['last_error']
+    assert backfilled_ids(db_manager) == set(range(81, 100))
+
+    TimelineSpider.fail_pages = set()
+    TimelineSpider.requested = []
+    resumed = manager.start(1)
+    # 继续同一个任务，保留原来的起点
+    assert resumed['id'] == job['id']
+    assert resumed['max_id'] == '100'
+    job = wait_idle(manager)
+
+    assert job['status'] == 'completed'
+    assert TimelineSpider.requested[0] == 3
+    assert backfilled_ids(db_manager) == set(range(1, 100))
+    assert job['pages_fetched'] == 10
+
+def test_max_pages_limits_job(manager, db_manager):
+    store_newest(db_manager, 100)
+
+    manager.start(1, max_pages=2)
+    job = wait_idle(manager)
+    assert job['status'] == 'completed'
+    assert job['next_page'] == 3
+    assert backfilled_ids(db_manager) == set(range(81, 100))
+
+def test_resume_interrupted_picks_up_paused_jobs(manager, db_manager):
+    store_newest(db_manager, 100)
+    session = db_manager.get_session()
+    session.add(BackfillJob(spider_config_id=1, platform='test', user_id='u1', status='paused',
+                            next_page=9, max_pages=100, page_size=PAGE_SIZE, max_id='100'))
+    session.commit()
+    session.close()
+
+    manager.resume_interrupted()
+    job = wait_idle(manager)
+    assert job['status'] == 'completed'
+    assert TimelineSpider.requested[0] == 9
+    assert backfilled_ids(db_manager) == set(range(1, 21))
@@ -0,0 +1,79 @@
+"""图片缓存淘汰策略：LRU、LFU、GDSF 及索引按优先级弹出"""
+import pytest
+
+from utils.cache_eviction import GDSFPolicy, LFUPolicy, LRUPolicy, create_eviction_policy
+from utils.image_cache_index import ImageCacheIndex
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / 'image_cache_index.db')
+
+def pop_all(index):
+    victims = []
+    while True:
+        entry = index.pop_victim()
+        if entry is None:
+            return victims
+        victims.append(entry.filename)
+
+def test_lru_evicts_least_recently_accessed(index_path):
+    index = ImageCacheIndex(index_path, policy=LRUPolicy())
+    for i, name in enumerate(['a', 'b', 'c']):
+        index.add(name, 10, float(i))
+    index.touch('a', at=10.0)
+
+    assert pop_all(index) == ['b', 'c', 'a']
+    assert (len(index), index.total_size) == (0, 0)
+    index.close()
+
+def test_lfu_evicts_least_hit(index_path):
+    index = ImageCacheIndex(index_path, policy=LFUPolicy())
+    for i, name in enumerate(['a', 'b', 'c']):
+        index.add(name, 10, float(i))
+    index.touch('a', at=10.0)
+    index.touch('a', at=11.0)
+    index.touch('c', at=12.0)
+
+    assert pop_all(index) == ['b', 'c', 'a']
+    index.close()
+
+def test_gdsf_prefers_keeping_small_frequent_files(index_path):
+    policy = GDSFPolicy()
+    index = ImageCacheIndex(index_path, policy=policy)
+    index.add('large.png', 1000, 1.0)
+    index.add('small.png', 10, 1.0)
+
+    assert index.pop_victim().filename == 'large.png'
+    # 淘汰后老化值提高到被淘汰文件的优先级
+    assert policy.clock == pytest.approx(1 / 1000)
+    index.close()
+
+def test_gdsf_aging_lets_stale_frequent_file_go(index_path):
+    policy = GDSFPolicy()
+    index = ImageCacheIndex(index_path, policy=policy)
+    index.add('hot.png', 10, 1.0)
+    for at in range(2, 6):
+        index.touch('hot.png', at=float(at))
+    # 老化值升高后新写入的文件优先级超过长期未访问的高频文件
+    policy.clock = 1.0
+    index.add('new.png', 10, 10.0)
+
+    assert index.pop_victim().filename == 'hot.png'
+    index.close()
+
+def test_stale_heap_entries_are_skipped(index_path):
+    index = ImageCacheIndex(index_path)
+    index.add('a', 10, 1.0)
+    index.add('b', 10, 2.0)
+    for at in range(3, 200):
+        index.touch('a', at=float(at))
+    index.remove('b')
+
+    assert pop_all(index) == ['a']
+    index.close()
+
+def test_create_eviction_policy():
+    assert isinstance(create_eviction_policy('LFU'), LFUPolicy)
+    assert isinstance(create_eviction_policy('gdsf'), GDSFPolicy)
+    assert isinstance(create_eviction_policy('unknown'), LRUPolicy)
+    assert isinstance(create_eviction_policy(None), LRUPolicy)
@@ -0,0 +1,134 @@
+"""平台熔断器状态转换：closed -> open -> half_open -> closed/open"""
+import pytest
+
+import spider.circuit_breaker as circuit_breaker_module
+from spider.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker_module, 'time', fake)
+    return fake
+
+def make_breaker(**kwargs):
+    options = {'failure_threshold': 3, 'cooldown': 60, 'max_cooldown': 200, 'half_open_max_calls': 1}
+    options.update(kwargs)
+    return CircuitBreaker('test', **options)
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow_request()
+        breaker.record_failure()
+
+def test_trips_after_consecutive_failures(clock):
+    breaker = make_breaker()
+    breaker.record_failure()
+    breaker.record_failure()
+    # 中间的成功清零连续失败次数
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    assert not breaker.allow_request()
+    assert breaker.retry_after() == pytest.approx(60)
+    assert breaker.get_status()['rejected'] == 1
+
+def test_half_open_allows_limited_probes(clock):
+    breaker = make_breaker(half_open_max_calls=2)
+    trip(breaker)
+
+    clock.now += 60
+    # 冷却结束后不再算作熔断中，调度器据此放行探测任务
+    assert not breaker.is_open()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+def test_half_open_success_closes(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 60
+
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.trip_count == 0
+    assert breaker.allow_request()
+
+def test_late_success_while_open_is_ignored(clock):
+    breaker = make_breaker()
+    trip(breaker)
+
+    # 熔断前发出的请求在熔断后才成功返回
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_status()['consecutive_failures'] == 3
+
+    clock.now += 60
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+def test_half_open_failure_reopens_with_doubled_cooldown(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 60
+
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.retry_after() == pytest.approx(120)
+
+    # 冷却时间不超过 max_cooldown
+    clock.now += 120
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.retry_after() == pytest.approx(200)
+
+def test_release_returns_half_open_probe_slot(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 60
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+def test_release_in_closed_state_is_noop(clock):
+    breaker = make_breaker()
+    breaker.release()
+    assert breaker.half_open_calls == 0
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_registry_raises_when_open(clock):
+    registry = CircuitBreakerRegistry(failure_threshold=1, cooldown=30)
+    registry.before_request('weibo')
+    registry.record('weibo', False)
+
+    assert registry.is_open('weibo')
+    assert not registry.is_open('xueqiu')
+    with pytest.raises(CircuitOpenError) as excinfo:
+        registry.before_request('weibo')
+    assert excinfo.value.platform == 'weibo'
+    assert excinfo.value.retry_after == pytest.approx(30)
+
+def test_disabled_registry_never_blocks(clock):
+    registry = CircuitBreakerRegistry(enabled=False, failure_threshold=1)
+    for _ in range(5):
+        registry.before_request('weibo')
+        registry.record('weibo', False)
+    assert not registry.is_open('weibo')
@@ -0,0 +1,64 @@
+"""首页响应指纹：内容未变化时跳过解析，入库后才更新指纹"""
+from types import SimpleNamespace
+
+import pytest
+
+import spider.base_spider as base_spider_module
+from spider.content_fingerprint import ContentFingerprints
+from spider.eastmoney_spider import EastmoneySpider
+
+def test_check_and_put():
+    fingerprints = ContentFingerprints()
+    fingerprint, unchanged = fingerprints.check('weibo', 'u1', b'page')
+    assert not unchanged
+    fingerprints.put('weibo', 'u1', fingerprint)
+
+    assert fingerprints.check('weibo', 'u1', b'page') == (fingerprint, True)
+    assert not fingerprints.check('weibo', 'u1', b'page 2')[1]
+    # 按账号分别记录
+    assert not fingerprints.check('weibo', 'u2', b'page')[1]
+
+    fingerprints.discard('weibo', 'u1')
+    assert not fingerprints.check('weibo', 'u1', b'page')[1]
+    assert fingerprints.get_status() == {'accounts': 0}
+
+def make_page(*post_ids):
+    items = ''.join(
+        f'<div class="articleh"><span class="l3"><a href="/news/{post_id}.html">帖子 {post_id}</a></span></div>'
+        for post_id in post_ids
+    )
+    html = f'<html><body>{items}</body></html>'
+    return SimpleNamespace(text=html, content=html.encode())
+
+@pytest.fixture
+def fingerprints(monkeypatch):
+    fingerprints = ContentFingerprints()
+    monkeypatch.setattr(base_spider_module, 'content_fingerprints', fingerprints)
+    return fingerprints
+
+def crawl(spider, monkeypatch, page):
+    monkeypatch.setattr(spider, 'make_conditional_request', lambda url: page)
+    return [post['post_id'] for post in spider.iter_user_posts('600000')]
+
+def test_unchanged_page_is_skipped_after_confirm(scheduler, fingerprints, monkeypatch):
+    spider = EastmoneySpider()
+    page = make_page('2', '1')
+
+    assert crawl(spider, monkeypatch, page) == ['2', '1']
+    # 入库前不更新指纹，爬取失败时下次仍会完整处理
+    assert crawl(spider, monkeypatch, page) == ['2', '1']
+    scheduler._finish_crawl(spider, 'eastmoney')
+    assert scheduler.no_change_runs == {}
+
+    assert crawl(spider, monkeypatch, page) == []
+    assert spider.content_unchanged
+    scheduler._finish_crawl(spider, 'eastmoney')
+    assert scheduler.no_change_runs == {'eastmoney': 1}
+
+    assert crawl(spider, monkeypatch, make_page('3', '2', '1')) == ['3', '2', '1']
+    assert not spider.content_unchanged
+
+def test_outside_crawl_never_unchanged(fingerprints):
+    spider = EastmoneySpider()
+    assert not spider.is_content_unchanged(b'page')
+    assert fingerprints.get_status() == {'accounts': 0}
@@ -0,0 +1,115 @@
+"""爬虫任务执行器：平台并发上限、同配置防重叠和成败统计"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils.crawl_executor import AsyncCrawlExecutor, CrawlExecutor
+
+PLATFORMS = {1: 'a', 2: 'a', 3: 'a', 4: 'a', 5: 'b'}
+
+class Tracker:
+    """记录各平台同时执行的任务数，任务在 gate 打开前一直阻塞"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.gate = threading.Event()
+        self.active = {'a': 0, 'b': 0}
+        self.peak = {'a': 0, 'b': 0}
+        self.started = []
+
+    def enter(self, config_id):
+        platform = PLATFORMS[config_id]
+        with self.lock:
+            self.active[platform] += 1
+            self.peak[platform] = max(self.peak[platform], self.active[platform])
+            self.started.append(config_id)
+
+    def leave(self, config_id):
+        with self.lock:
+            self.active[PLATFORMS[config_id]] -= 1
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, '等待超时'
+        time.sleep(0.01)
+
+def run_caps_scenario(executor, tracker):
+    for config_id, platform in PLATFORMS.items():
+        assert executor.submit(config_id, platform)
+    # 同一配置在队列或执行中时不重复提交
+    assert not executor.submit(1, 'a')
+
+    wait_until(lambda: len(tracker.started) == 3)
+    status = executor.get_status()
+    assert status['platforms']['a'] == {'limit': 2, 'queue_depth': 2, 'in_flight': 2}
+    assert status['platforms']['b']['in_flight'] == 1
+    assert status['skipped_overlap'] == 1
+
+    tracker.gate.set()
+    wait_until(lambda: executor.get_status()['completed'] + executor.get_status()['failed'] == 5)
+    assert tracker.peak == {'a': 2, 'b': 1}
+    assert sorted(tracker.started) == [1, 2, 3, 4, 5]
+
+def test_thread_executor_respects_platform_limits():
+    tracker = Tracker()
+
+    def run(config_id):
+        tracker.enter(config_id)
+        tracker.gate.wait(5)
+        tracker.leave(config_id)
+        return True
+
+    executor = CrawlExecutor(run, max_workers=8, platform_limits={'a': 2}, default_platform_limit=1)
+    try:
+        run_caps_scenario(executor, tracker)
+    finally:
+        executor.shutdown(wait=True)
+
+def test_async_executor_respects_platform_limits():
+    tracker = Tracker()
+
+    async def run(config_id):
+        tracker.enter(config_id)
+        while not tracker.gate.is_set():
+            await asyncio.sleep(0.01)
+        tracker.leave(config_id)
+        return True
+
+    executor = AsyncCrawlExecutor(run, max_concurrency=8, platform_limits={'a': 2}, default_platform_limit=1)
+    try:
+        run_caps_scenario(executor, tracker)
+    finally:
+        executor.shutdown(wait=True)
+
+@pytest.mark.parametrize('result, completed, failed', [(True, 1, 0), (None, 1, 0), (False, 0, 1)])
+def test_false_result_counts_as_failure(result, completed, failed):
+    executor = CrawlExecutor(lambda config_id: result, max_workers=1)
+    try:
+        executor.submit(1, 'a')
+        wait_until(lambda: not executor.is_busy(1))
+        status = executor.get_status()
+        assert (status['completed'], status['failed']) == (completed, failed)
+    finally:
+        executor.shutdown(wait=True)
+
+def test_exception_counts_as_failure_and_frees_slot():
+    calls = []
+
+    def run(config_id):
+        calls.append(config_id)
+        if config_id == 1:
+            raise RuntimeError('boom')
+        return True
+
+    executor = CrawlExecutor(run, max_workers=2, default_platform_limit=1)
+    try:
+        executor.submit(1, 'a')
+        executor.submit(2, 'a')
+        wait_until(lambda: len(calls) == 2 and not executor.is_busy(2))
+        status = executor.get_status()
+        assert (status['completed'], status['failed']) == (1, 1)
+    finally:
+        executor.shutdown(wait=True)
@@ -0,0 +1,56 @@
+"""Cron表达式解析和下次触发时间计算"""
+from datetime import datetime
+
+import pytest
+
+from utils.cron import CronExpression, CronParseError
+
+def next_fire(expression, after):
+    return CronExpression(expression).next_fire_time(after)
+
+def test_every_minute_is_strictly_after():
+    assert next_fire('* * * * *', datetime(2024, 1, 1, 9, 30, 0)) == datetime(2024, 1, 1, 9, 31, 0)
+    assert next_fire('* * * * *', datetime(2024, 1, 1, 9, 30, 59, 999)) == datetime(2024, 1, 1, 9, 31, 0)
+
+def test_six_field_seconds():
+    assert next_fire('*/15 * * * * *', datetime(2024, 1, 1, 9, 30, 14)) == datetime(2024, 1, 1, 9, 30, 15)
+    assert next_fire('*/15 * * * * *', datetime(2024, 1, 1, 9, 30, 45)) == datetime(2024, 1, 1, 9, 31, 0)
+
+def test_ranges_steps_and_lists():
+    cron = CronExpression('0,30 9-11 * * *')
+    assert cron.next_fire_time(datetime(2024, 1, 1, 8, 0)) == datetime(2024, 1, 1, 9, 0)
+    assert cron.next_fire_time(datetime(2024, 1, 1, 9, 0)) == datetime(2024, 1, 1, 9, 30)
+    # 当天最后一次触发之后进入次日
+    assert cron.next_fire_time(datetime(2024, 1, 1, 11, 30)) == datetime(2024, 1, 2, 9, 0)
+
+def test_weekday_names_skip_weekend():
+    # 2024-01-05 是周五
+    assert next_fire('0 9 * * mon-fri', datetime(2024, 1, 5, 10, 0)) == datetime(2024, 1, 8, 9, 0)
+
+def test_sunday_as_zero_and_seven():
+    after = datetime(2024, 1, 1, 0, 0)
+    assert next_fire('0 0 * * 0', after) == next_fire('0 0 * * 7', after) == datetime(2024, 1, 7, 0, 0)
+
+def test_day_and_weekday_are_unioned():
+    # 每月1日或每个周一：2024-01-02 之后最近的是 1月8日（周一）
+    assert next_fire('0 0 1 * mon', datetime(2024, 1, 2)) == datetime(2024, 1, 8)
+
+def test_month_end_and_leap_year():
+    assert next_fire('0 0 31 * *', datetime(2024, 1, 31, 1)) == datetime(2024, 3, 31)
+    assert next_fire('0 0 29 2 *', datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+
+def test_year_rollover_with_month_names():
+    assert next_fire('0 8 1 jan *', datetime(2024, 6, 1)) == datetime(2025, 1, 1, 8, 0)
+
+def test_never_firing_expression_returns_none():
+    assert next_fire('0 0 30 2 *', datetime(2024, 1, 1)) is None
+
+def test_matches():
+    cron = CronExpression('30 9 * * mon-fri')
+    assert cron.matches(datetime(2024, 1, 5, 9, 30))
+    assert not cron.matches(datetime(2024, 1, 6, 9, 30))
+
+@pytest.mark.parametrize('expression', ['', '* * * *', '60 * * * *', '*/0 * * * *', '5-1 * * * *', 'x * * * *'])
+def test_invalid_expressions(expression):
+    with pytest.raises(CronParseError):
+        CronExpression(expression)
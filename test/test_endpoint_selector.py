@@ -0,0 +1,58 @@
+"""雪球API端点得分：只有端点本身的故障计入失败"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import spider.xueqiu_spider as xueqiu_module
+from spider.endpoint_selector import EndpointSelector
+from spider.xueqiu_spider import XueqiuSpider
+
+ENDPOINT = 'https://xueqiu.com/v4/statuses/user_timeline.json'
+
+def make_response(status_code, body=''):
+    def parse_json():
+        return json.loads(body)
+    return SimpleNamespace(status_code=status_code, text=body, content=body.encode(),
+                           headers={}, json=parse_json)
+
+@pytest.fixture
+def selector(monkeypatch):
+    selector = EndpointSelector([ENDPOINT])
+    monkeypatch.setattr(xueqiu_module, 'xueqiu_endpoint_selector', selector)
+    return selector
+
+@pytest.fixture
+def spider(monkeypatch):
+    spider = XueqiuSpider()
+    # 令牌缓存是全局共享的，测试中不作废
+    monkeypatch.setattr(xueqiu_module.token_cache, 'invalidate', lambda *args: None)
+    return spider
+
+def endpoint_counts(selector):
+    status = selector.get_status()[0]
+    return status['attempts'], status['successes']
+
+def try_endpoint(spider, monkeypatch, response):
+    monkeypatch.setattr(spider, 'fetch', lambda url, **kwargs: response)
+    return spider._try_api_endpoint(ENDPOINT, 'u1', 20, page=2)
+
+@pytest.mark.parametrize('response', [
+    make_response(401),
+    make_response(403),
+    make_response(429),
+    make_response(200, '<html>aliyun_waf</html>'),
+])
+def test_token_and_throttling_problems_are_not_recorded(spider, selector, monkeypatch, response):
+    assert try_endpoint(spider, monkeypatch, response) is None
+    assert endpoint_counts(selector) == (0, 0)
+
+@pytest.mark.parametrize('response', [make_response(502), make_response(200, 'not json')])
+def test_server_errors_and_bad_payloads_count_as_failures(spider, selector, monkeypatch, response):
+    assert try_endpoint(spider, monkeypatch, response) is None
+    assert endpoint_counts(selector) == (1, 0)
+
+def test_valid_payload_counts_as_success(spider, selector, monkeypatch):
+    response = make_response(200, json.dumps({'statuses': [{'id': 1}]}))
+    assert try_endpoint(spider, monkeypatch, response) == [{'id': 1}]
+    assert endpoint_counts(selector) == (1, 1)
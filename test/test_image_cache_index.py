@@ -0,0 +1,60 @@
+"""图片缓存索引：文件数和总大小统计、访问记录持久化、与目录同步"""
+import pytest
+
+from utils.image_cache_index import ImageCacheIndex
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / 'index' / 'image_cache_index.db')
+
+def test_running_totals(index_path):
+    index = ImageCacheIndex(index_path)
+    index.add('a.png', 100, 1.0)
+    index.add('b.png', 50, 2.0)
+    assert (len(index), index.total_size) == (2, 150)
+
+    # 重新下载同名文件时替换原记录
+    index.add('a.png', 30, 3.0)
+    assert (len(index), index.total_size) == (2, 80)
+
+    assert index.remove('b.png').size == 50
+    assert index.remove('missing.png') is None
+    assert (len(index), index.total_size) == (1, 30)
+    index.close()
+
+def test_totals_and_access_survive_reopen(index_path):
+    index = ImageCacheIndex(index_path)
+    index.add('a.png', 100, 1.0)
+    index.add('b.png', 50, 2.0)
+    assert index.touch('a.png', at=10.0)
+    assert not index.touch('missing.png')
+    index.close()
+
+    reopened = ImageCacheIndex(index_path)
+    assert (len(reopened), reopened.total_size) == (2, 150)
+    entry = reopened.get('a.png')
+    assert (entry.last_access, entry.hits) == (10.0, 1)
+    reopened.close()
+
+def test_reconcile_with_cache_dir(index_path, tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    (cache_dir / 'on_disk.png').write_bytes(b'x' * 10)
+    # 下载中途留下的临时文件不计入索引
+    (cache_dir / '.partial.tmp').write_bytes(b'x' * 99)
+
+    index = ImageCacheIndex(index_path)
+    index.add('deleted.png', 100, 1.0)
+    assert index.reconcile(cache_dir) == (1, 1)
+    assert (len(index), index.total_size) == (1, 10)
+    assert index.get('on_disk.png') is not None
+    assert index.reconcile(cache_dir) == (0, 0)
+    index.close()
+
+def test_expired_uses_last_access(index_path):
+    index = ImageCacheIndex(index_path)
+    index.add('old.png', 1, 1.0)
+    index.add('touched.png', 1, 1.0)
+    index.touch('touched.png', at=100.0)
+    assert [entry.filename for entry in index.expired(50.0)] == ['old.png']
+    index.close()
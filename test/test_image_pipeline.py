@@ -0,0 +1,102 @@
+"""入库后的图片处理：回写 processed_content，通知器按截止时间等待结果"""
+import threading
+import time
+
+import pytest
+
+import utils.image_pipeline as image_pipeline_module
+from database.models import PostData
+from utils.image_pipeline import ImagePipeline
+
+IMAGE_CONTENT = '看图 <img src="https://example.com/a.jpg">'
+CACHED_CONTENT = '看图 <img src="/static/image_cache/a.jpg">'
+
+class FakeImageCache:
+    """在 release 之前阻塞处理的图片缓存，failing 为True时处理失败"""
+
+    enabled = True
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.failing = False
+
+    def process_content(self, content):
+        self.release.wait(5)
+        if self.failing:
+            raise OSError('下载失败')
+        return content.replace('https://example.com/', '/static/image_cache/')
+
+@pytest.fixture
+def image_cache(monkeypatch):
+    cache = FakeImageCache()
+    monkeypatch.setattr(image_pipeline_module, 'image_cache', cache)
+    return cache
+
+@pytest.fixture
+def pipeline(db_manager, image_cache):
+    pipeline = ImagePipeline(db_manager)
+    yield pipeline
+    image_cache.release.set()
+    pipeline.shutdown()
+
+def store_post(db_manager, post_id, content):
+    session = db_manager.get_session()
+    session.add(PostData(platform='weibo', user_id='u1', post_id=post_id, content=content))
+    session.commit()
+    session.close()
+    return {'post_id': post_id, 'content': content}
+
+def processed_content(db_manager, post_id):
+    session = db_manager.get_session()
+    post = session.query(PostData).filter(PostData.post_id == post_id).one()
+    session.close()
+    return post.processed_content
+
+def test_wait_returns_processed_content(pipeline, image_cache, db_manager):
+    pipeline.submit('weibo', 'u1', [store_post(db_manager, '1', IMAGE_CONTENT)])
+    image_cache.release.set()
+
+    assert pipeline.wait('weibo', 'u1', '1', timeout=5) == CACHED_CONTENT
+    assert processed_content(db_manager, '1') == CACHED_CONTENT
+    assert pipeline.get_status()['processed'] == 1
+
+def test_wait_times_out_with_none(pipeline, image_cache, db_manager):
+    pipeline.submit('weibo', 'u1', [store_post(db_manager, '1', IMAGE_CONTENT)])
+
+    started = time.monotonic()
+    assert pipeline.wait('weibo', 'u1', '1', timeout=0.05) is None
+    assert time.monotonic() - started < 1
+    assert pipeline.get_status()['pending'] == 1
+
+    # 超时后处理仍在后台完成并回写
+    image_cache.release.set()
+    assert pipeline.wait('weibo', 'u1', '1', timeout=5) == CACHED_CONTENT
+
+def test_posts_without_images_are_skipped(pipeline, db_manager):
+    pipeline.submit('weibo', 'u1', [store_post(db_manager, '1', '没有图片')])
+    assert pipeline.wait('weibo', 'u1', '1', timeout=5) is None
+    assert pipeline.get_status()['pending'] == 0
+
+def test_failed_processing_keeps_original(pipeline, image_cache, db_manager):
+    image_cache.failing = True
+    pipeline.submit('weibo', 'u1', [store_post(db_manager, '1', IMAGE_CONTENT)])
+    image_cache.release.set()
+
+    assert pipeline.wait('weibo', 'u1', '1', timeout=5) is None
+    assert processed_content(db_manager, '1') is None
+    assert pipeline.get_status()['failed'] == 1
+
+def test_keeps_only_recent_completed_results(pipeline, image_cache, db_manager):
+    pipeline.max_completed = 1
+    image_cache.release.set()
+    for post_id in ('1', '2'):
+        pipeline.submit('weibo', 'u1', [store_post(db_manager, post_id, IMAGE_CONTENT)])
+        assert pipeline.wait('weibo', 'u1', post_id, timeout=5) == CACHED_CONTENT
+
+    deadline = time.monotonic() + 5
+    while pipeline.get_status()['pending']:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    # 较早完成的结果已被清理，通知器直接使用原始内容
+    assert pipeline.wait('weibo', 'u1', '1', timeout=5) is None
+    assert pipeline.wait('weibo', 'u1', '2', timeout=5) == CACHED_CONTENT
@@ -0,0 +1,105 @@
+"""批量去重入库（SQLite）"""
+from datetime import datetime
+
+import database.post_store as post_store
+from database.models import PostData
+from database.post_store import find_existing_post_ids, find_latest_post_id, save_new_posts
+
+def make_post(post_id, minute=0, content=None):
+    return {
+        'post_id': post_id,
+        'content': content or f'帖子 {post_id}',
+        'post_time': datetime(2024, 1, 1, 9, minute)
+    }
+
+def stored_ids(session, platform='weibo', user_id='u1'):
+    rows = session.query(PostData.post_id).filter(
+        PostData.platform == platform,
+        PostData.user_id == user_id
+    ).order_by(PostData.id).all()
+    return [post_id for (post_id,) in rows]
+
+def test_saves_only_new_posts(db_manager):
+    session = db_manager.get_session()
+    saved = save_new_posts(session, 'weibo', 'u1', [make_post('1'), make_post('2')])
+    session.commit()
+    assert [row['post_id'] for row in saved] == ['1', '2']
+
+    saved = save_new_posts(session, 'weibo', 'u1', [make_post('3'), make_post('2'), make_post('1')])
+    session.commit()
+    assert [row['post_id'] for row in saved] == ['3']
+    assert stored_ids(session) == ['1', '2', '3']
+    session.close()
+
+def test_duplicates_within_batch_keep_first(db_manager):
+    session = db_manager.get_session()
+    saved = save_new_posts(session, 'weibo', 'u1', [
+        make_post('1', content='第一条'),
+        make_post(1, content='重复'),
+        None,
+        {'content': '没有ID'}
+    ])
+    session.commit()
+    assert len(saved) == 1
+    assert session.query(PostData.content).scalar() == '第一条'
+    session.close()
+
+def test_dedup_is_scoped_to_platform_and_user(db_manager):
+    session = db_manager.get_session()
+    save_new_posts(session, 'weibo', 'u1', [make_post('1')])
+    assert len(save_new_posts(session, 'weibo', 'u2', [make_post('1')])) == 1
+    assert len(save_new_posts(session, 'xueqiu', 'u1', [make_post('1')])) == 1
+    session.commit()
+    assert session.query(PostData).count() == 3
+    session.close()
+
+def test_insert_ignores_rows_written_concurrently(db_manager, monkeypatch):
+    session = db_manager.get_session()
+    other = db_manager.get_session()
+    original = post_store.find_existing_post_ids
+
+    def lookup_then_race(*args):
+        # 另一个会话在本次查询之后、写入之前写入了同一帖子
+        existing = original(*args)
+        other.add(PostData(platform='weibo', user_id='u1', post_id='1', content='并发写入'))
+        other.commit()
+        return existing
+
+    monkeypatch.setattr(post_store, 'find_existing_post_ids', lookup_then_race)
+    save_new_posts(session, 'weibo', 'u1', [make_post('1'), make_post('2')])
+    session.commit()
+
+    assert sorted(stored_ids(session)) == ['1', '2']
+    assert session.query(PostData.content).filter(PostData.post_id == '1').scalar() == '并发写入'
+    session.close()
+    other.close()
+
+def test_lookup_is_chunked(db_manager, monkeypatch):
+    monkeypatch.setattr(post_store, 'LOOKUP_CHUNK_SIZE', 3)
+    session = db_manager.get_session()
+    save_new_posts(session, 'weibo', 'u1', [make_post(str(i)) for i in range(10)])
+    session.commit()
+
+    assert find_existing_post_ids(session, 'weibo', 'u1', [str(i) for i in range(5, 15)]) == {str(i) for i in range(5, 10)}
+    assert len(save_new_posts(session, 'weibo', 'u1', [make_post(str(i)) for i in range(15)])) == 5
+    session.close()
+
+def test_content_processor_and_is_sent(db_manager):
+    session = db_manager.get_session()
+    saved = save_new_posts(session, 'weibo', 'u1', [make_post('1', content='原文')],
+                           content_processor=lambda content: content + '（已处理）', is_sent=True)
+    session.commit()
+    assert saved[0]['processed_content'] == '原文（已处理）'
+    post = session.query(PostData).one()
+    assert post.is_sent is True
+    assert post.processed_content == '原文（已处理）'
+    session.close()
+
+def test_find_latest_post_id(db_manager):
+    session = db_manager.get_session()
+    assert find_latest_post_id(session, 'weibo', 'u1') is None
+    # 同一批次按从新到旧写入，发帖时间相同时先写入的更新
+    save_new_posts(session, 'weibo', 'u1', [make_post('9', minute=5), make_post('8', minute=5), make_post('7', minute=1)])
+    session.commit()
+    assert find_latest_post_id(session, 'weibo', 'u1') == '9'
+    session.close()
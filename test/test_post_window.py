@@ -0,0 +1,177 @@
+"""帖子ID区间过滤和逐条产出帖子"""
+import asyncio
+from types import SimpleNamespace
+
+from spider.async_base_spider import AsyncBaseSpider
+from spider.base_spider import BaseSpider, PostWindow, take_newer_than
+from spider.eastmoney_spider import EastmoneySpider
+
+def run_window(window, post_ids):
+    """依次检查帖子ID，返回产出的ID，遇到STOP即结束"""
+    result = []
+    for post_id in post_ids:
+        action = window.check(post_id)
+        if action == PostWindow.STOP:
+            break
+        if action == PostWindow.YIELD:
+            result.append(post_id)
+    return result
+
+def test_numeric_since_id_skips_older_and_pinned_posts():
+    window = PostWindow(since_id='100')
+    # 置顶的旧帖排在最前，不会提前结束过滤
+    assert run_window(window, ['50', '103', '102', '100', '99']) == ['103', '102']
+    assert window.reached_since
+
+def test_non_numeric_since_id_stops_at_match():
+    window = PostWindow(since_id='abc')
+    assert run_window(window, ['xyz', 'def', 'abc', 'older']) == ['xyz', 'def']
+    assert window.reached_since
+
+def test_numeric_max_id_skips_newer_posts():
+    window = PostWindow(max_id='100')
+    assert run_window(window, ['102', '100', '99', '98']) == ['99', '98']
+    assert not window.reached_since
+
+def test_non_numeric_max_id_skips_through_match():
+    window = PostWindow(max_id='b')
+    assert run_window(window, ['a', 'b', 'c', 'd']) == ['c', 'd']
+
+def test_since_and_max_bound_both_sides():
+    window = PostWindow(since_id='10', max_id='20')
+    assert run_window(window, ['25', '20', '15', '11', '10', '5']) == ['15', '11']
+
+def test_no_bounds_yields_everything():
+    assert run_window(PostWindow(), ['3', '2', '', None]) == ['3', '2', '', None]
+
+def test_take_newer_than():
+    items = [{'id': 5}, {'id': 4}, {'id': 3}]
+    assert take_newer_than(items, '3', lambda item: item['id']) == [{'id': 5}, {'id': 4}]
+    assert take_newer_than(items, None, lambda item: item['id']) == items
+
+class PagedSpider(BaseSpider):
+    """按页返回预设帖子的爬虫，记录请求过的页码"""
+
+    supports_paging = True
+
+    def __init__(self, pages):
+        super().__init__('test')
+        self.pages = pages
+        self.requested = []
+
+    def authenticate(self, auth_config):
+        return True
+
+    def get_user_posts(self, user_id, limit=20, since_id=None):
+        return self.get_user_posts_page(user_id, 1, limit)
+
+    def get_user_posts_page(self, user_id, page, page_size=20, raise_errors=False):
+        self.requested.append(page)
+        return self.pages[page - 1] if page <= len(self.pages) else []
+
+    def parse_post(self, raw_post):
+        return {'post_id': raw_post} if raw_post else None
+
+class SinglePageSpider(BaseSpider):
+    """不支持分页、get_user_posts 直接返回解析后帖子的爬虫"""
+
+    posts_are_parsed = True
+
+    def __init__(self, posts):
+        super().__init__('test')
+        self.posts = posts
+        self.requested = []
+
+    def authenticate(self, auth_config):
+        return True
+
+    def get_user_posts(self, user_id, limit=20, since_id=None):
+        self.requested.append(1)
+        return [{'post_id': post_id} for post_id in self.posts]
+
+    def parse_post(self, raw_post):
+        raise AssertionError('已解析的帖子不应再次解析')
+
+def post_ids(posts):
+    return [post['post_id'] for post in posts]
+
+def test_iter_user_posts_pages_until_since_id():
+    spider = PagedSpider([['9', '8'], ['7', '6'], ['5', '4'], ['3']])
+    assert post_ids(spider.iter_user_posts('u1', since_id='5', max_pages=10)) == ['9', '8', '7', '6']
+    # 第3页遇到 since_id 后不再请求第4页
+    assert spider.requested == [1, 2, 3]
+
+def test_iter_user_posts_resumes_below_max_id():
+    spider = PagedSpider([['9', '8'], ['7', '6'], ['5']])
+    assert post_ids(spider.iter_user_posts('u1', max_id='8', max_pages=10)) == ['7', '6', '5']
+    assert spider.requested == [1, 2, 3, 4]
+
+def test_iter_user_posts_stops_on_empty_page_and_skips_unparsed():
+    spider = PagedSpider([['9', None, '8'], []])
+    assert post_ids(spider.iter_user_posts('u1', max_pages=5)) == ['9', '8']
+    assert spider.requested == [1, 2]
+
+def test_iter_user_posts_caller_can_stop_early():
+    spider = PagedSpider([['9', '8'], ['7']])
+    posts = spider.iter_user_posts('u1', max_pages=5)
+    assert next(posts)['post_id'] == '9'
+    posts.close()
+    assert spider.requested == [1]
+
+def test_non_paging_spider_fetches_one_page():
+    spider = SinglePageSpider(['9', '8', '7'])
+    assert post_ids(spider.iter_user_posts('u1', since_id='8', max_pages=5)) == ['9']
+    assert spider.requested == [1]
+    # 不支持分页的平台没有可翻的页
+    assert spider.get_user_posts_page('u1', 2) == []
+
+EASTMONEY_PAGE = ''.join(
+    f'<div class="articleh"><span class="l3"><a href="/news/{post_id}.html">帖子 {post_id}</a></span></div>'
+    for post_id in ('900', '905', '901')
+)
+
+def test_unordered_platform_ignores_since_id(monkeypatch):
+    spider = EastmoneySpider()
+    page = SimpleNamespace(text=f'<html><body>{EASTMONEY_PAGE}</body></html>', content=EASTMONEY_PAGE.encode())
+    monkeypatch.setattr(spider, 'make_conditional_request', lambda url: page)
+    monkeypatch.setattr(spider, 'is_content_unchanged', lambda content: False)
+
+    # 已入库的置顶帖900排在新帖905之前，不能在900处停止
+    posts = list(spider.iter_user_posts('600000', since_id='900'))
+    assert post_ids(posts) == ['900', '905', '901']
+    # 同一页的帖子使用相同的抓取时间
+    assert len({post['post_time'] for post in posts}) == 1
+
+class AsyncPagedSpider(AsyncBaseSpider):
+    """异步版本的 PagedSpider"""
+
+    supports_paging = True
+
+    def __init__(self, pages):
+        super().__init__('test')
+        self.pages = pages
+        self.requested = []
+
+    async def authenticate(self, auth_config):
+        return True
+
+    async def get_user_posts(self, user_id, limit=20, since_id=None):
+        return await self.get_user_posts_page(user_id, 1, limit)
+
+    async def get_user_posts_page(self, user_id, page, page_size=20, raise_errors=False):
+        self.requested.append(page)
+        return self.pages[page - 1] if page <= len(self.pages) else []
+
+    def parse_post(self, raw_post):
+        return {'post_id': raw_post} if raw_post else None
+
+def test_async_iter_user_posts_matches_sync():
+    async def collect(spider, **kwargs):
+        return [post async for post in spider.iter_user_posts('u1', max_pages=10, **kwargs)]
+
+    spider = AsyncPagedSpider([['9', '8'], ['7', '6'], ['5', '4'], ['3']])
+    assert post_ids(asyncio.run(collect(spider, since_id='5'))) == ['9', '8', '7', '6']
+    assert spider.requested == [1, 2, 3]
+
+    spider = AsyncPagedSpider([['9', '8'], ['7', '6'], ['5']])
+    assert post_ids(asyncio.run(collect(spider, max_id='8'))) == ['7', '6', '5']
@@ -0,0 +1,86 @@
+"""令牌桶和平台/主机限速器"""
+import pytest
+
+import spider.rate_limiter as rate_limiter_module
+from spider.rate_limiter import RateLimiter, TokenBucket
+
+class FakeClock:
+    """替换模块中的 time，手动推进时间"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter_module, 'time', fake)
+    return fake
+
+def test_burst_then_queue_in_arrival_order(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    # 令牌用完后预约排队：每个请求比前一个多等 1/rate 秒
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+
+    status = bucket.get_status()
+    assert status['requests'] == 5
+    assert status['throttled'] == 2
+    assert status['total_wait'] == pytest.approx(1.5)
+    assert status['queue_delay'] == pytest.approx(1.0)
+
+def test_refill_is_capped_at_burst(clock):
+    bucket = TokenBucket(rate=1, burst=2)
+    bucket.reserve()
+    bucket.reserve()
+
+    clock.now += 100
+    assert bucket.get_status()['tokens'] == 2
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(1.0)
+
+def test_partial_refill_reduces_wait(clock):
+    bucket = TokenBucket(rate=4, burst=1)
+    assert bucket.reserve() == 0
+    clock.now += 0.125
+    assert bucket.reserve() == pytest.approx(0.125)
+
+def test_zero_rate_is_unlimited(clock):
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.reserve() == 0 for _ in range(10))
+
+def test_limiter_takes_longer_of_platform_and_host_wait(clock):
+    limiter = RateLimiter(
+        default={'rate': 10, 'burst': 1},
+        platforms={'xueqiu': {'rate': 1, 'burst': 1}},
+        hosts={'stock.xueqiu.com': {'rate': 0.5, 'burst': 1}}
+    )
+
+    assert limiter.reserve('xueqiu', 'https://stock.xueqiu.com/a') == 0
+    # 平台桶需等 1 秒，主机桶需等 2 秒
+    assert limiter.reserve('xueqiu', 'https://stock.xueqiu.com/b') == pytest.approx(2.0)
+    # 其他主机只受平台桶限制
+    assert limiter.reserve('xueqiu', 'https://xueqiu.com/c') == pytest.approx(2.0)
+    # 未单独配置的平台使用默认限速
+    assert limiter.reserve('weibo', 'https://weibo.com/') == 0
+    assert set(limiter.get_status()['hosts']) == {'stock.xueqiu.com'}
+
+def test_acquire_sleeps_for_reserved_wait(clock):
+    limiter = RateLimiter(default={'rate': 2, 'burst': 1})
+    assert limiter.acquire('taoguba', 'https://www.taoguba.com.cn/') == 0
+    assert limiter.acquire('taoguba', 'https://www.taoguba.com.cn/') == pytest.approx(0.5)
+    assert clock.slept == [pytest.approx(0.5)]
+
+def test_disabled_limiter(clock):
+    limiter = RateLimiter(enabled=False, default={'rate': 1, 'burst': 1})
+    assert all(limiter.reserve('weibo', 'https://weibo.com/') == 0 for _ in range(5))
@@ -0,0 +1,109 @@
+"""请求重试：退避策略、Retry-After、单次爬取的重试预算"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+import spider.base_spider as base_spider_module
+import spider.retry_policy as retry_policy_module
+from spider.base_spider import BaseSpider
+from spider.retry_policy import RetryBudget, RetryPolicy, parse_retry_after
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(' 12 ') == 12.0
+    assert parse_retry_after('soon') is None
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    assert 55 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+    # 已过去的时间不等待
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+def test_backoff_delay_grows_and_is_capped(monkeypatch):
+    # 抖动取上限，便于检查退避上界
+    monkeypatch.setattr(retry_policy_module.random, 'uniform', lambda low, high: high)
+    policy = RetryPolicy(max_retries=5, base_delay=1, max_delay=5)
+    assert [policy.next_delay(attempt) for attempt in range(6)] == [1, 2, 4, 5, 5, None]
+
+def test_retry_after_overrides_backoff():
+    policy = RetryPolicy(max_retries=3, base_delay=1, max_delay=30)
+    assert policy.next_delay(0, retry_after=20) == 20
+    # 服务端要求等待的时间超过上限时放弃重试
+    assert policy.next_delay(0, retry_after=31) is None
+    assert policy.next_delay(3, retry_after=1) is None
+
+def test_retry_budget():
+    budget = RetryBudget(2)
+    assert [budget.consume() for _ in range(3)] == [True, True, False]
+    assert budget.remaining == 0
+
+class ScriptedSpider(BaseSpider):
+    """按预设顺序返回响应或抛出异常的爬虫"""
+
+    def __init__(self, outcomes):
+        super().__init__('test')
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def authenticate(self, auth_config):
+        return True
+
+    def get_user_posts(self, user_id, limit=20, since_id=None):
+        return []
+
+    def parse_post(self, raw_post):
+        return raw_post
+
+    def fetch(self, url, method='GET', **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(status_code=outcome[0], headers=outcome[1] if len(outcome) > 1 else {})
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(base_spider_module, 'retry_policy', RetryPolicy(max_retries=3, base_delay=1, max_delay=30))
+    monkeypatch.setattr(base_spider_module.time, 'sleep', recorded.append)
+    monkeypatch.setattr(retry_policy_module.random, 'uniform', lambda low, high: high)
+    return recorded
+
+def make_spider(outcomes, budget=10):
+    spider = ScriptedSpider(outcomes)
+    spider.retry_budget = RetryBudget(budget)
+    return spider
+
+def test_retries_retryable_statuses_and_connection_errors(sleeps):
+    spider = make_spider([(503,), requests.ConnectionError('reset'), (429, {'Retry-After': '7'}), (200,)])
+    assert spider.request_with_retry('https://example.com').status_code == 200
+    assert spider.calls == 4
+    assert sleeps == [1, 2, 7.0]
+
+def test_returns_last_response_after_max_retries(sleeps):
+    spider = make_spider([(502,)] * 5)
+    assert spider.request_with_retry('https://example.com').status_code == 502
+    assert spider.calls == 4
+
+def test_budget_limits_retries_across_requests(sleeps):
+    spider = make_spider([(503,), (503,), (200,), (503,)], budget=2)
+    assert spider.request_with_retry('https://example.com/a').status_code == 200
+    # 预算已被前一个请求用完，第二个请求不再重试
+    assert spider.request_with_retry('https://example.com/b').status_code == 503
+    assert spider.calls == 4
+
+def test_non_idempotent_requests_are_not_retried(sleeps):
+    spider = make_spider([(503,)])
+    assert spider.request_with_retry('https://example.com', method='POST').status_code == 503
+    with pytest.raises(requests.Timeout):
+        make_spider([requests.Timeout()]).request_with_retry('https://example.com', method='POST')
+
+    spider = make_spider([(503,), (200,)])
+    assert spider.request_with_retry('https://example.com', method='POST', idempotent=True).status_code == 200
+    assert sleeps == [1]
+
+def test_non_retryable_status_returns_immediately(sleeps):
+    spider = make_spider([(404,)])
+    assert spider.request_with_retry('https://example.com').status_code == 404
+    assert sleeps == []
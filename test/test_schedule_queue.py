@@ -0,0 +1,75 @@
+"""调度队列：到期弹出、重新入队和惰性删除"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+from utils.schedule_queue import ScheduleQueue
+
+NOW = datetime(2024, 1, 1, 9, 0)
+
+def test_pop_due_in_time_order():
+    queue = ScheduleQueue()
+    queue.push(1, NOW + timedelta(seconds=30))
+    queue.push(2, NOW - timedelta(seconds=10))
+    queue.push(3, NOW)
+
+    assert queue.pop_due(NOW) == [2, 3]
+    assert len(queue) == 1
+    assert queue.next_due_time() == NOW + timedelta(seconds=30)
+    assert queue.pop_due(NOW + timedelta(minutes=1)) == [1]
+    assert queue.next_due_time() is None
+
+def test_repush_replaces_previous_entry():
+    queue = ScheduleQueue()
+    queue.push(1, NOW)
+    queue.push(1, NOW + timedelta(minutes=5))
+
+    # 旧条目仍在堆中，但弹出时被丢弃
+    assert queue.pop_due(NOW) == []
+    assert queue.due_time(1) == NOW + timedelta(minutes=5)
+    assert queue.pop_due(NOW + timedelta(minutes=5)) == [1]
+    assert len(queue) == 0
+
+def test_repush_earlier_moves_entry_forward():
+    queue = ScheduleQueue()
+    queue.push(1, NOW + timedelta(minutes=5))
+    queue.push(1, NOW)
+
+    assert queue.next_due_time() == NOW
+    assert queue.pop_due(NOW) == [1]
+    assert queue.pop_due(NOW + timedelta(minutes=10)) == []
+
+def test_remove_is_lazy():
+    queue = ScheduleQueue()
+    queue.push(1, NOW)
+    queue.push(2, NOW + timedelta(seconds=1))
+    queue.remove(1)
+    # 移除不存在的配置不报错
+    queue.remove(99)
+
+    assert len(queue) == 1
+    assert queue.due_time(1) is None
+    assert queue.next_due_time() == NOW + timedelta(seconds=1)
+    assert queue.pop_due(NOW + timedelta(seconds=1)) == [2]
+
+def test_clear():
+    queue = ScheduleQueue()
+    queue.push(1, NOW)
+    queue.clear()
+    assert len(queue) == 0
+    assert queue.pop_due(NOW) == []
+
+def test_wait_returns_on_wake():
+    queue = ScheduleQueue()
+    threading.Timer(0.05, queue.wake).start()
+    started = time.monotonic()
+    queue.wait(max_wait=5)
+    assert time.monotonic() - started < 2
+
+def test_wait_returns_when_earlier_entry_pushed():
+    queue = ScheduleQueue()
+    queue.push(1, datetime.now() + timedelta(hours=1))
+    threading.Timer(0.05, lambda: queue.push(2, datetime.now())).start()
+    started = time.monotonic()
+    queue.wait()
+    assert time.monotonic() - started < 2
@@ -0,0 +1,86 @@
+"""已入库帖子ID的内存过滤器"""
+from database.models import PostData
+from utils.seen_posts import SeenPostFilter
+
+def store_posts(db_manager, post_ids, platform='weibo', user_id='u1'):
+    session = db_manager.get_session()
+    session.add_all(PostData(platform=platform, user_id=user_id, post_id=str(post_id)) for post_id in post_ids)
+    session.commit()
+    session.close()
+
+def test_loads_most_recent_ids_from_db(db_manager):
+    store_posts(db_manager, range(1, 11))
+    seen = SeenPostFilter(db_manager, max_per_user=5)
+    seen.ensure_loaded('weibo', 'u1')
+
+    assert all(seen.is_known('weibo', 'u1', post_id) for post_id in (6, '7', 10))
+    assert not seen.is_known('weibo', 'u1', 5)
+    assert not seen.is_known('weibo', 'u2', 10)
+    assert seen.get_status() == {'accounts': 1, 'post_ids': 5, 'hits': 3, 'misses': 2}
+
+def test_ensure_loaded_queries_once(db_manager):
+    seen = SeenPostFilter(db_manager)
+    seen.ensure_loaded('weibo', 'u1')
+    store_posts(db_manager, [1])
+    seen.ensure_loaded('weibo', 'u1')
+    # 账号已加载，之后入库的ID需通过 add 记录
+    assert not seen.is_known('weibo', 'u1', 1)
+    seen.add('weibo', 'u1', [1])
+    assert seen.is_known('weibo', 'u1', 1)
+
+def test_add_keeps_newest_ids_within_limit(db_manager):
+    seen = SeenPostFilter(db_manager, max_per_user=3)
+    seen.add('weibo', 'u1', [1, 2, 3])
+    # 重新记录的ID移到最新位置，不会被先淘汰
+    seen.add('weibo', 'u1', [1, 4])
+
+    assert [seen.is_known('weibo', 'u1', post_id) for post_id in (1, 2, 3, 4)] == [True, False, True, True]
+
+def test_load_keeps_ids_added_meanwhile(db_manager):
+    store_posts(db_manager, [1, 2])
+    seen = SeenPostFilter(db_manager)
+    seen.add('weibo', 'u1', [3])
+    seen.warm([('weibo', 'u1')])
+
+    assert all(seen.is_known('weibo', 'u1', post_id) for post_id in (1, 2, 3))
+
+def test_discard_forgets_account(db_manager):
+    store_posts(db_manager, [1])
+    seen = SeenPostFilter(db_manager)
+    seen.ensure_loaded('weibo', 'u1')
+    seen.discard('weibo', 'u1')
+    assert not seen.is_known('weibo', 'u1', 1)
+
+    seen.ensure_loaded('weibo', 'u1')
+    assert seen.is_known('weibo', 'u1', 1)
+
+def test_scheduler_drops_known_posts_before_db(scheduler, db_manager, monkeypatch):
+    import utils.scheduler as scheduler_module
+
+    store_posts(db_manager, [1, 2])
+    saved_batches = []
+    original_save = scheduler_module.save_new_posts
+
+    def recording_save(session, platform, user_id, posts, **kwargs):
+        saved_batches.append([post['post_id'] for post in posts])
+        return original_save(session, platform, user_id, posts, **kwargs)
+
+    notified = []
+    monkeypatch.setattr(scheduler_module, 'save_new_posts', recording_save)
+    monkeypatch.setattr(scheduler, 'send_notifications_for_config', notified.append)
+
+    # 已入库的帖子2置顶排在新帖子之前
+    posts = [{'post_id': post_id, 'content': f'帖子 {post_id}'} for post_id in ('2', '4', '3', '1')]
+    scheduler._ingest_posts(7, 'weibo', 'u1', None, iter(posts))
+
+    # 已入库的帖子逐条丢弃，不交给数据库去重，也不会挡住后面的新帖子
+    assert saved_batches == [['4', '3']]
+    assert notified == [7]
+    assert stored_ids(db_manager) == {'1', '2', '3', '4'}
+    assert scheduler.seen_posts.is_known('weibo', 'u1', '4')
+
+def stored_ids(db_manager):
+    session = db_manager.get_session()
+    rows = session.query(PostData.post_id).all()
+    session.close()
+    return {post_id for (post_id,) in rows}
@@ -0,0 +1,103 @@
+"""HTTP会话池：按平台和认证配置复用会话"""
+import asyncio
+
+import pytest
+
+import spider.session_pool as session_pool_module
+from spider.async_base_spider import AsyncSessionPool
+from spider.session_pool import SessionPool, credential_key
+
+ACCOUNT_A = {'cookies': {'SUB': 'a'}}
+ACCOUNT_B = {'cookies': {'SUB': 'b'}}
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_pool_module, 'time', fake)
+    return fake
+
+def test_credential_key():
+    assert credential_key(None) == credential_key({}) == ''
+    # 与键的顺序无关
+    assert credential_key({'a': 1, 'b': 2}) == credential_key({'b': 2, 'a': 1})
+    assert credential_key(ACCOUNT_A) != credential_key(ACCOUNT_B)
+
+def test_reuses_session_for_same_platform_and_credentials(clock):
+    pool = SessionPool()
+    with pool.lease('weibo', ACCOUNT_A) as first:
+        pass
+    with pool.lease('weibo', {'cookies': {'SUB': 'a'}}) as second:
+        assert second is first
+    assert pool.get_status()['created'] == 1
+    assert pool.get_status()['reused'] == 1
+    pool.close_all()
+
+def test_credentials_and_platforms_do_not_share_sessions(clock):
+    pool = SessionPool()
+    with pool.lease('weibo', ACCOUNT_A) as session_a:
+        pass
+    # 其他账号和其他平台不会借到带有账号A登录态的会话
+    with pool.lease('weibo', ACCOUNT_B) as session_b:
+        assert session_b is not session_a
+    with pool.lease('xueqiu', ACCOUNT_A) as other_platform:
+        assert other_platform is not session_a
+    with pool.lease('weibo') as anonymous:
+        assert anonymous not in (session_a, session_b)
+
+    status = pool.get_status()
+    assert status['created'] == 4
+    assert status['idle'] == {'weibo': 3, 'xueqiu': 1}
+    pool.close_all()
+
+def test_concurrent_leases_get_distinct_sessions(clock):
+    pool = SessionPool()
+    first = pool.acquire('weibo', ACCOUNT_A)
+    second = pool.acquire('weibo', ACCOUNT_A)
+    assert first is not second
+    assert pool.get_status()['leased'] == 2
+    pool.release('weibo', first, auth_config=ACCOUNT_A)
+    pool.release('weibo', second, auth_config=ACCOUNT_A)
+    assert pool.get_status()['leased'] == 0
+    pool.close_all()
+
+def test_expired_sessions_are_replaced(clock):
+    pool = SessionPool(max_session_age=60)
+    with pool.lease('weibo') as first:
+        pass
+    clock.now += 61
+    with pool.lease('weibo') as second:
+        assert second is not first
+
+def test_discard_and_idle_limit(clock):
+    pool = SessionPool(max_idle_sessions=1)
+    first = pool.acquire('weibo')
+    second = pool.acquire('weibo')
+    pool.release('weibo', first)
+    # 空闲会话已满，直接关闭
+    pool.release('weibo', second)
+    assert pool.get_status()['idle'] == {'weibo': 1}
+
+    session = pool.acquire('weibo')
+    pool.release('weibo', session, discard=True)
+    assert pool.get_status()['idle'] == {'weibo': 0}
+
+def test_async_pool_keys_by_credentials():
+    async def scenario():
+        pool = AsyncSessionPool()
+        try:
+            session_a = pool.get('weibo', ACCOUNT_A)
+            assert pool.get('weibo', dict(ACCOUNT_A)) is session_a
+            assert pool.get('weibo', ACCOUNT_B) is not session_a
+            assert pool.get('xueqiu', ACCOUNT_A) is not session_a
+            return len(pool.get_status())
+        finally:
+            await pool.close_all()
+
+    assert asyncio.run(scenario()) == 3
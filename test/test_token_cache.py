@@ -0,0 +1,71 @@
+"""访问令牌缓存：过期判断、作废和持久化"""
+import pytest
+
+import spider.token_cache as token_cache_module
+from spider.token_cache import TokenCache
+
+COOKIES = [{'name': 'xq_a_token', 'value': 't1', 'domain': '.xueqiu.com', 'path': '/'}]
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(token_cache_module, 'time', fake)
+    return fake
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return tmp_path / 'cache' / 'tokens.json'
+
+def test_expires_after_ttl(clock, cache_file):
+    cache = TokenCache(cache_file, ttl_hours=1)
+    cache.put('xueqiu', 't1', COOKIES)
+    assert cache.get('xueqiu') == COOKIES
+    assert cache.get_token('xueqiu') == 't1'
+
+    clock.now += 3600
+    assert cache.get('xueqiu') == COOKIES
+    clock.now += 1
+    assert cache.get('xueqiu') is None
+    assert cache.get_token('xueqiu') is None
+
+def test_cookie_expiry_takes_precedence(clock, cache_file):
+    cache = TokenCache(cache_file, ttl_hours=12)
+    cache.put('xueqiu', 't1', COOKIES, expires=clock.now + 60)
+    clock.now += 59
+    assert cache.get_token('xueqiu') == 't1'
+    clock.now += 1
+    assert cache.get_token('xueqiu') is None
+
+def test_invalidate_only_matching_token(clock, cache_file):
+    cache = TokenCache(cache_file)
+    cache.put('xueqiu', 't2', COOKIES)
+    # 其他任务已刷新令牌，作废旧令牌不影响新令牌
+    cache.invalidate('xueqiu', 't1')
+    assert cache.get_token('xueqiu') == 't2'
+
+    cache.invalidate('xueqiu', 't2')
+    assert cache.get_token('xueqiu') is None
+    cache.invalidate('xueqiu')
+
+def test_persists_across_instances(clock, cache_file):
+    TokenCache(cache_file).put('xueqiu', 't1', COOKIES)
+    reloaded = TokenCache(cache_file)
+    assert reloaded.get('xueqiu') == COOKIES
+
+    reloaded.invalidate('xueqiu')
+    assert TokenCache(cache_file).get('xueqiu') is None
+
+def test_corrupt_cache_file_is_ignored(clock, cache_file):
+    cache_file.parent.mkdir(parents=True)
+    cache_file.write_text('{not json', encoding='utf-8')
+    cache = TokenCache(cache_file)
+    assert cache.get('xueqiu') is None
+    cache.put('xueqiu', 't1', COOKIES)
+    assert TokenCache(cache_file).get_token('xueqiu') == 't1'
@@ -0,0 +1,92 @@
+"""ETag / Last-Modified 条件请求：验证器缓存和入库后才保存验证器"""
+from types import SimpleNamespace
+
+import pytest
+
+import spider.base_spider as base_spider_module
+from spider.base_spider import BaseSpider
+from spider.validator_cache import ValidatorCache
+
+URL = 'https://example.com/list'
+
+def test_conditional_headers():
+    cache = ValidatorCache()
+    assert cache.conditional_headers(URL) == {}
+    cache.store(URL, '"v1"', 'Mon, 01 Jan 2024 00:00:00 GMT')
+    assert cache.conditional_headers(URL) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+    }
+    cache.store(URL, None, 'Tue, 02 Jan 2024 00:00:00 GMT')
+    assert cache.conditional_headers(URL) == {'If-Modified-Since': 'Tue, 02 Jan 2024 00:00:00 GMT'}
+    # 新响应不带验证器时清除旧记录
+    cache.store(URL, None, None)
+    assert cache.conditional_headers(URL) == {}
+
+def test_evicts_least_recently_used():
+    cache = ValidatorCache(max_entries=2)
+    cache.store('a', '"a"', None)
+    cache.store('b', '"b"', None)
+    cache.conditional_headers('a')
+    cache.store('c', '"c"', None)
+    assert cache.conditional_headers('b') == {}
+    assert cache.conditional_headers('a') and cache.conditional_headers('c')
+    assert cache.get_status()['entries'] == 2
+
+class PageSpider(BaseSpider):
+    """make_request 按预设返回响应并记录请求头的爬虫"""
+
+    def __init__(self, responses):
+        super().__init__('test')
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def authenticate(self, auth_config):
+        return True
+
+    def get_user_posts(self, user_id, limit=20, since_id=None):
+        return []
+
+    def parse_post(self, raw_post):
+        return raw_post
+
+    def make_request(self, url, method='GET', headers=None, **kwargs):
+        self.sent_headers.append(headers)
+        status_code, response_headers = self.responses.pop(0)
+        return SimpleNamespace(status_code=status_code, headers=response_headers)
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ValidatorCache()
+    monkeypatch.setattr(base_spider_module, 'validator_cache', cache)
+    return cache
+
+def test_not_modified_returns_none(cache):
+    cache.store(URL, '"v1"', None)
+    spider = PageSpider([(304, {})])
+    assert spider.make_conditional_request(URL, headers={'Referer': 'https://example.com/'}) is None
+    assert spider.sent_headers == [{'If-None-Match': '"v1"', 'Referer': 'https://example.com/'}]
+    assert cache.get_status()['platforms'] == {'test': {'hits': 1, 'misses': 0}}
+
+def test_validators_saved_only_after_confirm(cache):
+    spider = PageSpider([(200, {'ETag': '"v2"'})])
+    spider.begin_crawl('u1')
+    assert spider.make_conditional_request(URL).status_code == 200
+    # 入库前不保存，入库失败时下次仍获取完整页面
+    assert cache.conditional_headers(URL) == {}
+
+    spider.confirm_content()
+    assert cache.conditional_headers(URL) == {'If-None-Match': '"v2"'}
+
+    # 未开始增量爬取时（如认证请求）直接保存
+    spider = PageSpider([(200, {'ETag': '"v3"'})])
+    spider.make_conditional_request(URL)
+    assert cache.conditional_headers(URL) == {'If-None-Match': '"v3"'}
+
+def test_new_crawl_discards_unconfirmed_validators(cache):
+    spider = PageSpider([(200, {'ETag': '"v2"'})])
+    spider.begin_crawl('u1')
+    spider.make_conditional_request(URL)
+    spider.begin_crawl('u1')
+    spider.confirm_content()
+    assert cache.conditional_headers(URL) == {}
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from typing import Dict
+from loguru import logger
+from database.models import PostData
+from utils.trading_calendar import TradingCalendar, PHASES
+from config import config as app_config
+import math
+import threading
+import time
+
+DEFAULT_PHASE_MULTIPLIERS = {
+    'pre_market': 0.5,
+    'session': 0.5,
+    'lunch_break': 1.0,
+    'after_hours': 1.0,
+    'closed': 4.0,
+    'holiday': 6.0
+}
+
+class AdaptiveIntervalPolicy:
+    """自适应调度间隔
+
+    以配置的 schedule_interval 为基准间隔，先按当前交易阶段乘以阶段系数，
+    再按账号在该阶段的历史发帖频率调整：发帖越频繁间隔越短，长期不发帖则逐步放宽。
+    """
+
+    def __init__(self, db_manager, calendar: TradingCalendar = None):
+        self.db_manager = db_manager
+        self.calendar = calendar or TradingCalendar(
+            holidays=app_config.TRADING_HOLIDAYS,
+            sessions=app_config.TRADING_SESSIONS
+        )
+        self.phase_multipliers = {**DEFAULT_PHASE_MULTIPLIERS, **app_config.ADAPTIVE_PHASE_MULTIPLIERS}
+        self.min_interval = app_config.ADAPTIVE_MIN_INTERVAL
+        self.max_interval = app_config.ADAPTIVE_MAX_INTERVAL
+        self.history_days = app_config.ADAPTIVE_HISTORY_DAYS
+        self.min_samples = app_config.ADAPTIVE_MIN_SAMPLES
+        self.reference_rate = app_config.ADAPTIVE_REFERENCE_POSTS_PER_HOUR
+        self.min_activity_factor, self.max_activity_factor = app_config.ADAPTIVE_ACTIVITY_FACTOR_RANGE
+        self.rate_refresh_seconds = app_config.ADAPTIVE_RATE_REFRESH_MINUTES * 60
+
+        # 发帖频率缓存 {config_id: (计算时间, {阶段: 每小时发帖数})}
+        self._rate_cache = {}
+        self._lock = threading.Lock()
+
+    def next_run_time(self, config, base_time: datetime) -> datetime:
+        """计算下次执行时间，跨越交易阶段切换（如开盘）时在切换点重新评估"""
+        next_run = base_time + timedelta(seconds=self.get_interval(config, base_time))
+        return min(next_run, self.calendar.next_phase_change(base_time))
+
+    def get_interval(self, config, moment: datetime) -> float:
+        """计算指定时间点的执行间隔（秒）"""
+        phase = self.calendar.get_phase(moment)
+        interval = (config.schedule_interval or app_config.SPIDER_INTERVAL) * self.phase_multipliers.get(phase, 1.0)
+
+        rate = self.get_posting_rates(config).get(phase)
+        if rate is not None:
+            # 开方平滑频率差异，避免单个阶段的少量样本导致间隔剧烈变化
+            activity_factor = math.sqrt(self.reference_rate / max(rate, 1e-6))
+            activity_factor = min(max(activity_factor, self.min_activity_factor), self.max_activity_factor)
+            interval *= activity_factor
+
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def get_posting_rates(self, config) -> Dict[str, float]:
+        """获取账号在各交易阶段的历史发帖频率（每小时），样本不足时返回空字典"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._rate_cache.get(config.id)
+            if cached and now - cached[0] < self.rate_refresh_seconds:
+                return cached[1]
+
+        rates = self._compute_posting_rates(config)
+        with self._lock:
+            self._rate_cache[config.id] = (now, rates)
+        return rates
+
+    def invalidate(self, config_id: int):
+        with self._lock:
+            self._rate_cache.pop(config_id, None)
+
+    def _compute_posting_rates(self, config) -> Dict[str, float]:
+        window_end = datetime.now()
+        window_start = window_end - timedelta(days=self.history_days)
+
+        session = self.db_manager.get_session()
+        try:
+            rows = session.query(PostData.post_time).filter(
+                PostData.platform == config.platform,
+                PostData.user_id == config.user_id,
+                PostData.post_time >= window_start
+            ).all()
+        except Exception as e:
+            logger.error(f"统计发帖频率失败: {config.platform} - {config.user_id}, 错误: {str(e)}")
+            return {}
+        finally:
+            session.close()
+
+        if len(rows) < self.min_samples:
+            return {}
+
+        counts = {phase: 0 for phase in PHASES}
+        for (post_time,) in rows:
+            if post_time is None:
+                continue
+            if post_time.tzinfo is not None:
+                post_time = post_time.astimezone().replace(tzinfo=None)
+            counts[self.calendar.get_phase(post_time)] += 1
+
+        hours = self.calendar.phase_hours(window_start, window_end)
+        return {
+            phase: counts[phase] / hours[phase]
+            for phase in PHASES if hours[phase] > 0
+        }
+
+    def get_status(self, moment: datetime = None) -> Dict:
+        moment = moment or datetime.now()
+        return {
+            'phase': self.calendar.get_phase(moment),
+            'next_phase_change': self.calendar.next_phase_change(moment).isoformat(),
+            'phase_multipliers': self.phase_multipliers
+        }
@@ -0,0 +1,279 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List
+from loguru import logger
+from sqlalchemy import desc
+from database.models import BackfillJob, SpiderConfig
+from database.post_store import find_latest_post_id, save_new_posts
+from spider.base_spider import PostWindow
+from spider.session_pool import SessionPool
+from config import config as app_config
+import threading
+
+# 尚未结束、可以继续执行的任务状态
+RESUMABLE_STATUSES = ('pending', 'running', 'paused', 'failed', 'cancelled')
+
+class BackfillError(Exception):
+    """回溯任务无法启动"""
+    pass
+
+class BackfillManager:
+    """历史回溯任务管理器
+
+    逐页获取账号的完整时间线并批量入库，多个账号的任务在线程池中并发执行。
+    爬虫使用调度器会话池中的会话，翻页请求与增量爬取共用平台限速器。每页入库与断点（下一页页码）在同一事务中提交，
+    任务中断后从断点继续。回溯只保存比创建任务时已入库最新帖子更旧的帖子，并标记为已推送，不会触发通知。
+    """
+
+    def __init__(self, db_manager, spiders: Dict[str, type], session_pool: SessionPool):
+        self.db_manager = db_manager
+        self.spiders = spiders
+        self.session_pool = session_pool
+        self.max_workers = app_config.BACKFILL_MAX_WORKERS
+        self.page_size = app_config.BACKFILL_PAGE_SIZE
+        self.max_pages = app_config.BACKFILL_MAX_PAGES
+
+        self._executor = None
+        self._lock = threading.Lock()
+        # 执行中的任务 {config_id: job_id}
+        self._active = {}
+        # 请求停止的任务 {config_id: 停止后的状态}
+        self._stop_requests = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='backfill')
+            return self._executor
+
+    def start(self, config_id: int, max_pages: int = None) -> Dict:
+        """启动或从断点继续指定配置的回溯任务"""
+        with self._lock:
+            if config_id in self._active:
+                raise BackfillError('该配置的回溯任务正在执行中')
+
+        session = self.db_manager.get_session()
+        try:
+            config = session.query(SpiderConfig).filter(SpiderConfig.id == config_id).first()
+            if not config:
+                raise BackfillError('爬虫配置不存在')
+
+            spider_class = self.spiders.get(config.platform)
+            if not spider_class or not spider_class.supports_paging:
+                raise BackfillError(f'平台不支持分页回溯: {config.platform}')
+
+            job = session.query(BackfillJob).filter(
+                BackfillJob.spider_config_id == config_id,
+                BackfillJob.status.in_(RESUMABLE_STATUSES)
+            ).order_by(desc(BackfillJob.id)).first()
+
+            if job is None or not job.max_id:
+                # 回溯只保存比已入库最新帖子更旧的帖子，更新的帖子由增量爬取入库并推送
+                latest_post_id = find_latest_post_id(session, config.platform, config.user_id)
+                if not latest_post_id:
+                    raise BackfillError('该账号还没有已入库的帖子，请等待首次爬取完成后再回溯')
+
+            if job is None:
+                job = BackfillJob(
+                    spider_config_id=config_id,
+                    platform=config.platform,
+                    user_id=config.user_id,
+                    next_page=1,
+                    max_pages=max_pages or self.max_pages,
+                    page_size=self.page_size,
+                    max_id=latest_post_id
+                )
+                session.add(job)
+            else:
+                job.max_id = job.max_id or latest_post_id
+                if max_pages:
+                    job.max_pages = max_pages
+
+            job.status = 'pending'
+            job.last_error = None
+            job.finished_at = None
+            session.commit()
+            job_data = self._job_to_dict(job)
+        finally:
+            session.close()
+
+        self._submit(config_id, job_data['id'])
+        logger.info(f"回溯任务已提交: {job_data['platform']} - {job_data['user_id']}, 从第 {job_data['next_page']} 页开始")
+        return job_data
+
+    def _submit(self, config_id: int, job_id: int):
+        with self._lock:
+            if config_id in self._active:
+                return
+            self._active[config_id] = job_id
+            self._stop_requests.pop(config_id, None)
+        self._get_executor().submit(self._run_job, config_id, job_id)
+
+    def cancel(self, config_id: int) -> bool:
+        """取消执行中的回溯任务（当前页完成后停止，保留断点）"""
+        with self._lock:
+            if config_id not in self._active:
+                return False
+            self._stop_requests[config_id] = 'cancelled'
+            return True
+
+    def resume_interrupted(self):
+        """继续进程退出时未完成的回溯任务"""
+        session = self.db_manager.get_session()
+        try:
+            jobs = session.query(BackfillJob).filter(
+                BackfillJob.status.in_(('pending', 'running', 'paused'))
+            ).all()
+            pending = [(job.spider_config_id, job.id) for job in jobs]
+        except Exception as e:
+            logger.error(f"加载未完成的回溯任务失败: {str(e)}")
+            return
+        finally:
+            session.close()
+
+        for config_id, job_id in pending:
+            self._submit(config_id, job_id)
+        if pending:
+            logger.info(f"继续 {len(pending)} 个未完成的回溯任务")
+
+    def shutdown(self):
+        """暂停所有执行中的任务，断点保留到下次启动时继续"""
+        with self._lock:
+            for config_id in self._active:
+                self._stop_requests[config_id] = 'paused'
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def _update_job(self, job_id: int, **fields):
+        session = self.db_manager.get_session()
+        try:
+            session.query(BackfillJob).filter(BackfillJob.id == job_id).update(fields)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"更新回溯任务失败: job_id={job_id}, 错误: {str(e)}")
+        finally:
+            session.close()
+
+    def _load_job(self, job_id: int):
+        session = self.db_manager.get_session()
+        try:
+            job = session.query(BackfillJob).filter(BackfillJob.id == job_id).first()
+            config = session.query(SpiderConfig).filter(SpiderConfig.id == job.spider_config_id).first() if job else None
+            if not job or not config:
+                return None
+            return self._job_to_dict(job), config.auth_config or {}
+        finally:
+            session.close()
+
+    def _run_job(self, config_id: int, job_id: int):
+        try:
+            loaded = self._load_job(job_id)
+            if not loaded:
+                self._update_job(job_id, status='failed', last_error='爬虫配置不存在', finished_at=datetime.now())
+                return
+            job, auth_config = loaded
+            platform, user_id = job['platform'], job['user_id']
+
+            with self.session_pool.lease(platform, auth_config) as http_session:
+                spider = self.spiders[platform](session=http_session)
+                if not spider.authenticate(auth_config):
+                    self._update_job(job_id, status='failed', last_error='爬虫认证失败', finished_at=datetime.now())
+                    return
+
+                self._update_job(job_id, status='running')
+                status = self._fetch_pages(config_id, job, spider)
+
+            finished_at = datetime.now() if status in ('completed', 'cancelled') else None
+            self._update_job(job_id, status=status, finished_at=finished_at)
+            logger.info(f"回溯任务结束: {platform} - {user_id}, 状态: {status}")
+
+        except Exception as e:
+            logger.error(f"回溯任务执行失败: job_id={job_id}, 错误: {str(e)}")
+            self._update_job(job_id, status='failed', last_error=str(e))
+        finally:
+            with self._lock:
+                self._active.pop(config_id, None)
+                self._stop_requests.pop(config_id, None)
+
+    def _fetch_pages(self, config_id: int, job: Dict, spider) -> str:
+        """从断点开始逐页获取并入库，返回任务结束时的状态"""
+        platform, user_id = job['platform'], job['user_id']
+        page = job['next_page']
+        # 比起点新的帖子（含起点本身）留给增量爬取，避免被标记为已推送而漏掉通知
+        window = PostWindow(max_id=job['max_id'])
+
+        while page <= job['max_pages']:
+            with self._lock:
+                stop_status = self._stop_requests.get(config_id)
+            if stop_status:
+                return stop_status
+
+            # 每页按一次爬取计算重试预算
+            spider.reset_retry_budget()
+            # 请求失败时抛出 PageFetchError，任务记为 failed 并保留断点；空页才表示到达时间线末尾
+            raw_posts = spider.get_user_posts_page(user_id, page, job['page_size'], raise_errors=True)
+            if not raw_posts:
+                return 'completed'
+
+            parsed_posts = [post for post in (spider.parse_post(raw_post) for raw_post in raw_posts) if post]
+            older_posts = [post for post in parsed_posts if window.check(post.get('post_id')) == PostWindow.YIELD]
+
+            session = self.db_manager.get_session()
+            try:
+                saved = save_new_posts(session, platform, user_id, older_posts, is_sent=True)
+                # 入库和断点在同一事务中提交
+                session.query(BackfillJob).filter(BackfillJob.id == job['id']).update({
+                    BackfillJob.next_page: page + 1,
+                    BackfillJob.pages_fetched: BackfillJob.pages_fetched + 1,
+                    BackfillJob.posts_fetched: BackfillJob.posts_fetched + len(parsed_posts),
+                    BackfillJob.posts_saved: BackfillJob.posts_saved + len(saved)
+                }, synchronize_session=False)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+            logger.debug(f"回溯 {platform} - {user_id} 第 {page} 页: {len(parsed_posts)} 条，新增 {len(saved)} 条")
+            page += 1
+
+        return 'completed'
+
+    def _job_to_dict(self, job: BackfillJob) -> Dict:
+        return {
+            'id': job.id,
+            'spider_config_id': job.spider_config_id,
+            'platform': job.platform,
+            'user_id': job.user_id,
+            'status': job.status,
+            'next_page': job.next_page,
+            'max_pages': job.max_pages,
+            'page_size': job.page_size,
+            'max_id': job.max_id,
+            'pages_fetched': job.pages_fetched or 0,
+            'posts_fetched': job.posts_fetched or 0,
+            'posts_saved': job.posts_saved or 0,
+            'last_error': job.last_error,
+            'created_at': job.created_at.isoformat() if job.created_at else None,
+            'updated_at': job.updated_at.isoformat() if job.updated_at else None,
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None
+        }
+
+    def list_jobs(self, limit: int = 50) -> List[Dict]:
+        """获取最近的回溯任务"""
+        session = self.db_manager.get_session()
+        try:
+            jobs = session.query(BackfillJob).order_by(desc(BackfillJob.id)).limit(limit).all()
+            return [self._job_to_dict(job) for job in jobs]
+        finally:
+            session.close()
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'active_jobs': len(self._active)
+            }
@@ -0,0 +1,63 @@
+from typing import Dict, Tuple
+from loguru import logger
+
+class EvictionPolicy:
+    """缓存淘汰策略：为每条缓存记录计算优先级，优先级最小的最先淘汰"""
+
+    name = ''
+
+    def priority(self, entry) -> Tuple:
+        raise NotImplementedError
+
+    def on_evict(self, entry):
+        """记录被淘汰后的回调"""
+        pass
+
+class LRUPolicy(EvictionPolicy):
+    """最近最少使用：淘汰最久未访问的文件"""
+
+    name = 'lru'
+
+    def priority(self, entry) -> Tuple:
+        return (entry.last_access,)
+
+class LFUPolicy(EvictionPolicy):
+    """最不经常使用：淘汰命中次数最少的文件，次数相同时淘汰最久未访问的"""
+
+    name = 'lfu'
+
+    def priority(self, entry) -> Tuple:
+        return (entry.hits, entry.last_access)
+
+class GDSFPolicy(EvictionPolicy):
+    """Greedy-Dual-Size-Frequency：按 访问次数 / 文件大小 加上老化值淘汰
+
+    同样的空间优先保留访问频繁的小图；每次淘汰把老化值提高到被淘汰文件的优先级，
+    之后被访问的文件获得更高的优先级，长期未访问的高频大图最终也会被淘汰。
+    老化值只保存在内存中，重启后从0开始。
+    """
+
+    name = 'gdsf'
+
+    def __init__(self):
+        self.clock = 0.0
+
+    def priority(self, entry) -> Tuple:
+        return (self.clock + (entry.hits + 1) / max(entry.size, 1), entry.last_access)
+
+    def on_evict(self, entry):
+        self.clock = max(self.clock, entry.priority[0])
+
+EVICTION_POLICIES: Dict[str, type] = {
+    LRUPolicy.name: LRUPolicy,
+    LFUPolicy.name: LFUPolicy,
+    GDSFPolicy.name: GDSFPolicy
+}
+
+def create_eviction_policy(name: str) -> EvictionPolicy:
+    """按名称创建淘汰策略，名称无效时使用LRU"""
+    policy_class = EVICTION_POLICIES.get((name or '').lower())
+    if policy_class is None:
+        logger.warning(f"不支持的图片缓存淘汰策略: {name}，使用 lru")
+        policy_class = LRUPolicy
+    return policy_class()
@@ -2,6 +2,7 @@ from typing import List, Dict, Any
 from loguru import logger
 from database.connection import db_manager
 from database.models import SpiderConfig, NotificationConfig, PostData
+from database.post_store import save_new_posts
 
 class ConfigManager:
     """配置管理器"""
@@ -123,25 +124,13 @@ class ConfigManager:
         db_session = db_manager.get_session()
         
         try:
+            # 按平台和用户分组，每组一次批量查重和写入
+            groups = {}
             for post in posts:
-                # 检查是否已存在
-                existing = db_session.query(PostData).filter(
-                    PostData.platform == post['platform'],
-                    PostData.post_id == post['post_id']
-                ).first()
-                
-                if not existing:
-                    # 创建新记录
-                    post_data = PostData(
-                        platform=post['platform'],
-                        user_id=post['user_id'],
-                        post_id=post['post_id'],
-                        content=post['content'],
-                        post_time=post['post_time']
-                    )
-                    
-                    db_session.add(post_data)
-                    saved_count += 1
+                groups.setdefault((post['platform'], post['user_id']), []).append(post)
+            
+            for (platform, user_id), group_posts in groups.items():
+                saved_count += len(save_new_posts(db_session, platform, user_id, group_posts))
             
             db_session.commit()
             return saved_count
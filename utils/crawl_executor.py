@@ -0,0 +1,257 @@
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict
+from loguru import logger
+import asyncio
+import threading
+
+class CrawlExecutor:
+    """爬虫任务执行器：有界线程池 + 平台并发上限 + 同配置防重叠"""
+
+    def __init__(self, run_func: Callable[[int], bool], max_workers: int = 8,
+                 platform_limits: Dict[str, int] = None, default_platform_limit: int = 2):
+        self.run_func = run_func
+        self.max_workers = max_workers
+        self.platform_limits = platform_limits or {}
+        self.default_platform_limit = default_platform_limit
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='crawl')
+        self._lock = threading.Lock()
+        # 等待平台并发名额的任务
+        self._waiting = defaultdict(deque)
+        self._waiting_ids = set()
+        # 已占用平台名额（含已提交到线程池但尚未开始执行）的任务
+        self._dispatched = {}
+        # 正在执行的任务
+        self._running = set()
+        self._platform_active = defaultdict(int)
+        self._shutdown = False
+
+        self.completed_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+
+    def _platform_limit(self, platform: str) -> int:
+        return max(1, int(self.platform_limits.get(platform, self.default_platform_limit)))
+
+    def submit(self, config_id: int, platform: str) -> bool:
+        """提交爬虫任务，同一配置已在队列或执行中时返回False"""
+        with self._lock:
+            if self._shutdown:
+                return False
+
+            if config_id in self._dispatched or config_id in self._waiting_ids:
+                self.skipped_count += 1
+                logger.debug(f"爬虫任务仍在执行中，跳过: config_id={config_id}")
+                return False
+
+            if self._platform_active[platform] < self._platform_limit(platform):
+                self._dispatch(config_id, platform)
+            else:
+                self._waiting[platform].append(config_id)
+                self._waiting_ids.add(config_id)
+            return True
+
+    def _dispatch(self, config_id: int, platform: str):
+        """占用平台名额并提交到线程池（需持有锁）"""
+        self._dispatched[config_id] = platform
+        self._platform_active[platform] += 1
+        self._pool.submit(self._run, config_id, platform)
+
+    def _run(self, config_id: int, platform: str):
+        with self._lock:
+            self._running.add(config_id)
+
+        succeeded = False
+        try:
+            # run_func 自行记录错误日志，返回False表示执行失败
+            succeeded = self.run_func(config_id) is not False
+        except Exception as e:
+            logger.error(f"爬虫任务异常: config_id={config_id}, 错误: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.discard(config_id)
+                self._dispatched.pop(config_id, None)
+                self._platform_active[platform] -= 1
+                if succeeded:
+                    self.completed_count += 1
+                else:
+                    self.failed_count += 1
+
+                # 释放的名额交给同平台的下一个等待任务
+                if not self._shutdown and self._waiting[platform]:
+                    next_config_id = self._waiting[platform].popleft()
+                    self._waiting_ids.discard(next_config_id)
+                    self._dispatch(next_config_id, platform)
+
+    def is_busy(self, config_id: int) -> bool:
+        """判断配置是否在队列或执行中"""
+        with self._lock:
+            return config_id in self._dispatched or config_id in self._waiting_ids
+
+    def shutdown(self, wait: bool = False):
+        """关闭执行器，丢弃尚未开始的任务"""
+        with self._lock:
+            self._shutdown = True
+            self._waiting.clear()
+            self._waiting_ids.clear()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def get_status(self) -> Dict:
+        """获取执行器状态"""
+        with self._lock:
+            platforms = set(self._platform_active) | set(self._waiting)
+            platform_status = {}
+            for platform in sorted(platforms):
+                queued = len(self._waiting[platform]) + sum(
+                    1 for cid, p in self._dispatched.items() if p == platform and cid not in self._running
+                )
+                in_flight = sum(
+                    1 for cid in self._running if self._dispatched.get(cid) == platform
+                )
+                platform_status[platform] = {
+                    'limit': self._platform_limit(platform),
+                    'queue_depth': queued,
+                    'in_flight': in_flight
+                }
+
+            return {
+                'runtime': 'threads',
+                'max_workers': self.max_workers,
+                'queue_depth': sum(p['queue_depth'] for p in platform_status.values()),
+                'in_flight': len(self._running),
+                'completed': self.completed_count,
+                'failed': self.failed_count,
+                'skipped_overlap': self.skipped_count,
+                'platforms': platform_status
+            }
+
+class AsyncCrawlExecutor:
+    """异步爬虫任务执行器：在独立线程的事件循环中并发运行协程任务
+
+    接口与 CrawlExecutor 一致，平台并发上限由 asyncio.Semaphore 控制，
+    等待中的任务只占用协程而不占用线程。
+    """
+
+    def __init__(self, run_coro: Callable[[int], Awaitable[bool]], max_concurrency: int = 100,
+                 platform_limits: Dict[str, int] = None, default_platform_limit: int = 2):
+        self.run_coro = run_coro
+        self.max_concurrency = max_concurrency
+        self.platform_limits = platform_limits or {}
+        self.default_platform_limit = default_platform_limit
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True, name='crawl-loop')
+        self._thread.start()
+
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._global_semaphore = None
+        # 已提交（排队或执行中）的任务 {config_id: platform}
+        self._submitted = {}
+        self._running = set()
+        self._futures = set()
+        self._shutdown = False
+
+        self.completed_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+
+    def _platform_limit(self, platform: str) -> int:
+        return max(1, int(self.platform_limits.get(platform, self.default_platform_limit)))
+
+    def _get_semaphore(self, platform: str) -> asyncio.Semaphore:
+        """获取平台信号量（仅在事件循环线程中调用）"""
+        if platform not in self._semaphores:
+            self._semaphores[platform] = asyncio.Semaphore(self._platform_limit(platform))
+        return self._semaphores[platform]
+
+    def submit(self, config_id: int, platform: str) -> bool:
+        """提交爬虫任务，同一配置已在队列或执行中时返回False"""
+        with self._lock:
+            if self._shutdown:
+                return False
+            if config_id in self._submitted:
+                self.skipped_count += 1
+                logger.debug(f"爬虫任务仍在执行中，跳过: config_id={config_id}")
+                return False
+            self._submitted[config_id] = platform
+
+        future = asyncio.run_coroutine_threadsafe(self._run(config_id, platform), self._loop)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+        return True
+
+    def _on_done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    async def _run(self, config_id: int, platform: str):
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        succeeded = False
+        try:
+            async with self._global_semaphore, self._get_semaphore(platform):
+                with self._lock:
+                    self._running.add(config_id)
+                succeeded = await self.run_coro(config_id) is not False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"爬虫任务异常: config_id={config_id}, 错误: {str(e)}")
+        finally:
+            with self._lock:
+                self._running.discard(config_id)
+                self._submitted.pop(config_id, None)
+                if succeeded:
+                    self.completed_count += 1
+                else:
+                    self.failed_count += 1
+
+    def is_busy(self, config_id: int) -> bool:
+        with self._lock:
+            return config_id in self._submitted
+
+    def run_coroutine(self, coro, timeout: float = 5):
+        """在执行器的事件循环中运行协程并等待结果（用于关闭循环内创建的共享资源）"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    def shutdown(self, wait: bool = False):
+        """关闭执行器，取消未完成的任务并停止事件循环"""
+        with self._lock:
+            self._shutdown = True
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if wait:
+            self._thread.join(timeout=5)
+
+    def get_status(self) -> Dict:
+        """获取执行器状态"""
+        with self._lock:
+            platform_status = {}
+            for config_id, platform in self._submitted.items():
+                status = platform_status.setdefault(platform, {
+                    'limit': self._platform_limit(platform),
+                    'queue_depth': 0,
+                    'in_flight': 0
+                })
+                if config_id in self._running:
+                    status['in_flight'] += 1
+                else:
+                    status['queue_depth'] += 1
+
+            return {
+                'runtime': 'asyncio',
+                'max_concurrency': self.max_concurrency,
+                'queue_depth': len(self._submitted) - len(self._running),
+                'in_flight': len(self._running),
+                'completed': self.completed_count,
+                'failed': self.failed_count,
+                'skipped_overlap': self.skipped_count,
+                'platforms': platform_status
+            }
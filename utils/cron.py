@@ -0,0 +1,184 @@
+from bisect import bisect_left
+from calendar import monthrange
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+MONTH_NAMES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+WEEKDAY_NAMES = {'sun': 0, 'mon': 1, 'tue': 2, 'wed': 3, 'thu': 4, 'fri': 5, 'sat': 6}
+
+# 最多向后查找的年数，防止如“2月30日”这类永不触发的表达式死循环
+MAX_SEARCH_YEARS = 8
+
+class CronParseError(ValueError):
+    """Cron表达式格式错误"""
+    pass
+
+class CronExpression:
+    """预编译的Cron表达式
+
+    支持5段（分 时 日 月 周）和6段（秒 分 时 日 月 周）格式，
+    每段支持 *、?、数字、范围(a-b)、步长(*/n, a-b/n)、列表(a,b,c)以及月份/星期英文缩写。
+    星期取值 0-7，0 和 7 均表示周日；日和周同时限定时按标准 cron 语义取并集。
+    """
+
+    def __init__(self, expression: str):
+        self.expression = (expression or '').strip()
+        fields = self.expression.split()
+
+        if len(fields) == 5:
+            fields = ['0'] + fields
+        elif len(fields) != 6:
+            raise CronParseError(f"Cron表达式应为5段或6段: {self.expression!r}")
+
+        second, minute, hour, day, month, weekday = fields
+        self.seconds = self._parse_field(second, 0, 59)
+        self.minutes = self._parse_field(minute, 0, 59)
+        self.hours = self._parse_field(hour, 0, 23)
+        self.days = self._parse_field(day, 1, 31)
+        self.months = self._parse_field(month, 1, 12, MONTH_NAMES)
+        weekdays = self._parse_field(weekday, 0, 7, WEEKDAY_NAMES)
+        self.weekdays = sorted({w % 7 for w in weekdays})
+
+        self._day_restricted = day.strip() not in ('*', '?')
+        self._weekday_restricted = weekday.strip() not in ('*', '?')
+        self._weekday_set = frozenset(self.weekdays)
+
+    @staticmethod
+    def _parse_value(value: str, names: dict) -> int:
+        value = value.strip().lower()
+        if names and value in names:
+            return names[value]
+        if not value.isdigit():
+            raise CronParseError(f"无效的Cron取值: {value!r}")
+        return int(value)
+
+    @classmethod
+    def _parse_field(cls, field: str, minimum: int, maximum: int, names: dict = None) -> List[int]:
+        """解析单个字段为有序取值列表"""
+        values = set()
+        for part in field.split(','):
+            part = part.strip()
+            if not part:
+                raise CronParseError(f"无效的Cron字段: {field!r}")
+
+            step = 1
+            if '/' in part:
+                part, step_str = part.split('/', 1)
+                if not step_str.isdigit() or int(step_str) == 0:
+                    raise CronParseError(f"无效的Cron步长: {field!r}")
+                step = int(step_str)
+
+            if part in ('*', '?'):
+                start, end = minimum, maximum
+            elif '-' in part:
+                start_str, end_str = part.split('-', 1)
+                start = cls._parse_value(start_str, names)
+                end = cls._parse_value(end_str, names)
+            else:
+                start = cls._parse_value(part, names)
+                # 形如 5/10 表示从5开始每10个单位
+                end = maximum if step > 1 else start
+
+            if start < minimum or end > maximum or start > end:
+                raise CronParseError(f"Cron字段超出范围 [{minimum}-{maximum}]: {field!r}")
+
+            values.update(range(start, end + 1, step))
+
+        return sorted(values)
+
+    @staticmethod
+    def _next_value(values: List[int], current: int) -> Optional[int]:
+        """有序列表中大于等于current的最小值"""
+        index = bisect_left(values, current)
+        return values[index] if index < len(values) else None
+
+    def _days_in_month(self, year: int, month: int) -> List[int]:
+        """计算指定月份中满足日/周约束的日期列表"""
+        first_weekday, last_day = monthrange(year, month)
+        # calendar以周一为0，cron以周日为0
+        first_weekday = (first_weekday + 1) % 7
+
+        day_matches = [d for d in self.days if d <= last_day]
+        weekday_matches = [
+            d for d in range(1, last_day + 1)
+            if (first_weekday + d - 1) % 7 in self._weekday_set
+        ]
+
+        if self._day_restricted and self._weekday_restricted:
+            return sorted(set(day_matches) | set(weekday_matches))
+        if self._weekday_restricted:
+            return weekday_matches
+        return day_matches
+
+    def next_fire_time(self, after: datetime) -> Optional[datetime]:
+        """计算严格晚于after的下一次触发时间，找不到时返回None"""
+        start = after.replace(microsecond=0) + timedelta(seconds=1)
+        year, month, day = start.year, start.month, start.day
+        hour, minute, second = start.hour, start.minute, start.second
+
+        while year <= after.year + MAX_SEARCH_YEARS:
+            # 月
+            next_month = self._next_value(self.months, month)
+            if next_month is None:
+                year, month, day, hour, minute, second = year + 1, self.months[0], 1, 0, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute, second = next_month, 1, 0, 0, 0
+
+            # 日
+            next_day = self._next_value(self._days_in_month(year, month), day)
+            if next_day is None:
+                month, day, hour, minute, second = month + 1, 1, 0, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+            if next_day != day:
+                day, hour, minute, second = next_day, 0, 0, 0
+
+            # 时
+            next_hour = self._next_value(self.hours, hour)
+            if next_hour is None:
+                day, hour, minute, second = day + 1, 0, 0, 0
+                continue
+            if next_hour != hour:
+                hour, minute, second = next_hour, 0, 0
+
+            # 分
+            next_minute = self._next_value(self.minutes, minute)
+            if next_minute is None:
+                hour, minute, second = hour + 1, 0, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                continue
+            if next_minute != minute:
+                minute, second = next_minute, 0
+
+            # 秒
+            next_second = self._next_value(self.seconds, second)
+            if next_second is None:
+                minute, second = minute + 1, 0
+                if minute > 59:
+                    hour, minute = hour + 1, 0
+                    if hour > 23:
+                        day, hour = day + 1, 0
+                continue
+
+            return datetime(year, month, day, hour, minute, next_second, tzinfo=after.tzinfo)
+
+        return None
+
+    def matches(self, moment: datetime) -> bool:
+        """判断给定时间（精确到秒）是否命中表达式"""
+        return (
+            moment.month in self.months
+            and moment.day in self._days_in_month(moment.year, moment.month)
+            and moment.hour in self.hours
+            and moment.minute in self.minutes
+            and moment.second in self.seconds
+        )
+
+    def __repr__(self):
+        return f"CronExpression({self.expression!r})"
@@ -1,13 +1,41 @@
 import os
 import re
 import hashlib
+import threading
+import time
+import tempfile
 import requests
-from datetime import datetime, timedelta
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from loguru import logger
 from config import config
+from utils.image_cache_index import ImageCacheIndex
+from utils.cache_eviction import create_eviction_policy
+
+# 匹配图片链接的正则表达式，各写法合并为一个分支表达式，只扫描一遍内容
+# img标签和Markdown语法排在前面，其中的链接不会再被当作直接链接重复匹配；
+# 开头的前瞻限定各分支可能的首字符，其余位置不再逐个尝试每个分支
+IMAGE_URL_PATTERN = re.compile(
+    r'(?=[<!h/])(?:'
+    r'<img[^>]+src=["\'](?P<src>[^"\'>]+)["\'][^>]*>'  # HTML img标签
+    r'|!\[[^\]]*\]\((?P<markdown>[^)]+)\)'  # Markdown图片语法
+    r'|(?P<url>(?:https?:)?//[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?)'  # 直接图片链接和协议相对URL
+    r')',
+    re.IGNORECASE
+)
+
+def iter_image_links(content: str) -> Iterator[Tuple[int, int, str]]:
+    """按出现顺序返回内容中的图片链接 (起始位置, 结束位置, 原始链接)"""
+    for match in IMAGE_URL_PATTERN.finditer(content):
+        group = match.lastgroup
+        yield match.start(group), match.end(group), match.group(group)
+
+def normalize_image_url(link: str) -> str:
+    """协议相对URL补全为https"""
+    return 'https:' + link if link.startswith('//') else link
 
 class ImageCache:
     """图片缓存管理器"""
@@ -19,89 +47,185 @@ class ImageCache:
         self.allowed_formats = config.IMAGE_CACHE_ALLOWED_FORMATS
         self.max_file_size_mb = config.IMAGE_CACHE_MAX_FILE_SIZE_MB
         self.enabled = config.IMAGE_CACHE_ENABLED
+        self.prefetch_workers = config.IMAGE_CACHE_PREFETCH_WORKERS
+        self.per_host_limit = config.IMAGE_CACHE_PER_HOST_LIMIT
+        self.janitor_interval = config.IMAGE_CACHE_JANITOR_INTERVAL
+        
+        self._executor = None
+        self._lock = threading.Lock()
+        # 下载中的图片 {图片URL: Future}
+        self._inflight: Dict[str, Future] = {}
+        # 各主机正在下载的任务数和排队等待的任务 {主机: deque[(图片URL, Future)]}
+        # 主机达到并发上限时任务在队列中等待，不占用线程池的工作线程
+        self._host_active: Dict[str, int] = defaultdict(int)
+        self._host_queues: Dict[str, deque] = defaultdict(deque)
+        # 后台清理线程，缓存超过上限时可提前唤醒
+        self._janitor = None
+        self._janitor_stop = threading.Event()
+        self._janitor_wakeup = threading.Event()
         
         # 确保缓存目录存在
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
+        # 缓存文件索引，启动时与目录同步一次，之后统计和清理都只读索引
+        self.index = ImageCacheIndex(
+            config.IMAGE_CACHE_INDEX_PATH,
+            policy=create_eviction_policy(config.IMAGE_CACHE_EVICTION_POLICY)
+        )
+        added, removed = self.index.reconcile(self.cache_dir)
+        if added or removed:
+            logger.info(f"图片缓存索引已同步: 补录 {added} 个文件，移除 {removed} 条失效记录")
+        
         # 启动时清理过期文件
         self._cleanup_expired_files()
     
     def process_content(self, content: str) -> str:
-        """处理内容中的图片链接，返回处理后的内容"""
+        """处理内容中的图片链接，返回处理后的内容
+
+        先提取全部图片URL，在线程池中并发下载，最后按链接位置拼接出替换后的内容。
+        """
         if not self.enabled or not content:
             return content
         
-        # 匹配图片URL的正则表达式
-        img_url_patterns = [
-            r'https?://[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?',  # 直接图片链接
-            r'//[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?',  # 协议相对URL
-            r'<img[^>]+src=["\']([^"\'>]+)["\'][^>]*>',  # HTML img标签
-            r'!\[([^\]]*)\]\(([^)]+)\)',  # Markdown图片语法
-        ]
-        
-        processed_content = content
+        links = list(iter_image_links(content))
+        if not links:
+            return content
         
-        for pattern in img_url_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                if 'src=' in pattern:  # HTML img标签
-                    img_url = match.group(1)
-                    # 处理协议相对URL
-                    if img_url.startswith('//'):
-                        img_url = 'https:' + img_url
-                    cached_url = self._cache_image(img_url)
-                    if cached_url:
-                        processed_content = processed_content.replace(match.group(1), cached_url)
-                elif '![' in pattern:  # Markdown语法
-                    img_url = match.group(2)
-                    if img_url.startswith('//'):
-                        img_url = 'https:' + img_url
-                    cached_url = self._cache_image(img_url)
-                    if cached_url:
-                        processed_content = processed_content.replace(match.group(2), cached_url)
-                else:  # 直接链接
-                    img_url = match.group(0)
-                    if img_url.startswith('//'):
-                        img_url = 'https:' + img_url
-                    cached_url = self._cache_image(img_url)
-                    if cached_url:
-                        processed_content = processed_content.replace(match.group(0), cached_url)
+        cached_urls = self.prefetch(normalize_image_url(link) for _, _, link in links)
         
-        return processed_content
+        segments = []
+        last_end = 0
+        for start, end, link in links:
+            cached_url = cached_urls.get(normalize_image_url(link))
+            if cached_url:
+                segments.append(content[last_end:start])
+                segments.append(cached_url)
+                last_end = end
+        if not segments:
+            return content
+        segments.append(content[last_end:])
+        return ''.join(segments)
+    
+    def prefetch(self, img_urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """并发缓存一组图片，返回 {图片URL: 本地URL}，缓存失败的为None"""
+        futures = {img_url: self._submit(img_url) for img_url in dict.fromkeys(img_urls)}
+        return {img_url: future.result() for img_url, future in futures.items()}
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.prefetch_workers, thread_name_prefix='image-cache')
+            return self._executor
+    
+    def _submit(self, img_url: str) -> Future:
+        """提交下载任务，同一URL正在下载时复用已有任务
+
+        同一主机的并发下载数不超过 per_host_limit，超出的任务按主机排队，
+        前一个任务完成后再提交到线程池。
+        """
+        host = urlparse(img_url).netloc
+        with self._lock:
+            future = self._inflight.get(img_url)
+            if future is not None:
+                return future
+            future = Future()
+            self._inflight[img_url] = future
+            if self._host_active[host] >= self.per_host_limit:
+                self._host_queues[host].append((img_url, future))
+                start = False
+            else:
+                self._host_active[host] += 1
+                start = True
+        future.add_done_callback(lambda done: self._finish_download(img_url, done))
+        if start:
+            self._start_download(host, img_url, future)
+        return future
+    
+    def _start_download(self, host: str, img_url: str, future: Future):
+        try:
+            self._get_executor().submit(self._run_download, host, img_url, future)
+        except RuntimeError as e:
+            # 线程池已关闭
+            logger.error(f"提交图片下载任务失败: {img_url}, 错误: {str(e)}")
+            future.set_result(None)
+            self._release_host(host)
+    
+    def _run_download(self, host: str, img_url: str, future: Future):
+        try:
+            future.set_result(self._cache_image(img_url))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._release_host(host)
+    
+    def _release_host(self, host: str):
+        """主机的一个下载任务结束，有排队任务时提交下一个，否则归还并发名额"""
+        with self._lock:
+            queue = self._host_queues.get(host)
+            if queue:
+                img_url, future = queue.popleft()
+            else:
+                self._host_queues.pop(host, None)
+                self._host_active[host] -= 1
+                if self._host_active[host] <= 0:
+                    del self._host_active[host]
+                return
+        self._start_download(host, img_url, future)
+    
+    def _finish_download(self, img_url: str, future: Future):
+        with self._lock:
+            if self._inflight.get(img_url) is future:
+                del self._inflight[img_url]
+    
+    def shutdown(self):
+        """停止下载线程池和后台清理线程，并写回未保存的访问记录"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+        self.stop_janitor()
+        self.index.flush()
+    
+    def record_access(self, cache_filename: str):
+        """记录一次缓存图片的访问（页面或通知加载 /static/images/cache/ 下的图片）"""
+        self.index.touch(cache_filename)
+    
+    def start_janitor(self):
+        """启动后台清理线程，定期清理过期文件、按淘汰策略把缓存控制在 max_size_mb 内"""
+        with self._lock:
+            if self._janitor and self._janitor.is_alive():
+                return
+            self._janitor_stop.clear()
+            self._janitor = threading.Thread(target=self._run_janitor, name='image-cache-janitor', daemon=True)
+            self._janitor.start()
+    
+    def stop_janitor(self):
+        with self._lock:
+            janitor, self._janitor = self._janitor, None
+        if janitor:
+            self._janitor_stop.set()
+            self._janitor_wakeup.set()
+            janitor.join(timeout=5)
+    
+    def _run_janitor(self):
+        while not self._janitor_stop.is_set():
+            self._janitor_wakeup.wait(self.janitor_interval)
+            self._janitor_wakeup.clear()
+            if self._janitor_stop.is_set():
+                break
+            self._cleanup_expired_files()
+            self._cleanup_by_size()
+            try:
+                self.index.flush()
+            except Exception as e:
+                logger.error(f"写回图片缓存访问记录失败: {str(e)}")
     
     def extract_image_urls(self, content: str) -> List[str]:
-        """从内容中提取所有图片URL"""
+        """从内容中提取所有图片URL（去重，按出现顺序）"""
         if not content:
             return []
-        
-        urls = []
-        img_url_patterns = [
-            r'https?://[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?',
-            r'//[^\s<>"]+\.(?:jpg|jpeg|png|gif|webp)(?:\?[^\s<>"]*)?',  # 新增协议相对URL
-            r'<img[^>]+src=["\']([^"\'>]+)["\'][^>]*>',
-            r'!\[([^\]]*)\]\(([^)]+)\)',
-        ]
-        
-        for pattern in img_url_patterns:
-            matches = re.finditer(pattern, content, re.IGNORECASE)
-            for match in matches:
-                if 'src=' in pattern:
-                    url = match.group(1)
-                    if url.startswith('//'):
-                        url = 'https:' + url
-                    urls.append(url)
-                elif '![' in pattern:
-                    url = match.group(2)
-                    if url.startswith('//'):
-                        url = 'https:' + url
-                    urls.append(url)
-                else:
-                    url = match.group(0)
-                    if url.startswith('//'):
-                        url = 'https:' + url
-                    urls.append(url)
-        
-        return list(set(urls))  # 去重
+        return list(dict.fromkeys(normalize_image_url(link) for _, _, link in iter_image_links(content)))
     
     def _cache_image(self, img_url: str) -> Optional[str]:
         """缓存单个图片，返回本地URL"""
@@ -123,65 +247,88 @@ class ImageCache:
             cache_filename = f"{url_hash}.{file_ext}"
             cache_filepath = self.cache_dir / cache_filename
             
-            # 检查文件是否已存在且未过期
-            if cache_filepath.exists():
-                file_age = datetime.now() - datetime.fromtimestamp(cache_filepath.stat().st_mtime)
-                if file_age < timedelta(hours=self.expire_hours):
-                    # 文件存在且未过期，返回本地URL
+            # 检查索引中是否已有未过期的缓存文件
+            entry = self.index.get(cache_filename)
+            if entry is not None:
+                if not cache_filepath.exists():
+                    # 文件已被外部删除，同步索引后重新下载
+                    self.index.remove(cache_filename)
+                elif time.time() - entry.last_access < self.expire_hours * 3600:
+                    # 文件存在且在有效期内被访问过，返回本地URL
+                    self.record_access(cache_filename)
                     return f"/static/images/cache/{cache_filename}"
                 else:
-                    # 文件过期，删除
-                    cache_filepath.unlink()
+                    # 超过有效期未被访问，删除后重新下载
+                    self._remove_file(cache_filename)
             
-            # 下载图片
-            response = requests.get(img_url, timeout=30, stream=True)
+            if not self._download(img_url, cache_filepath):
+                return None
+            
+            stat = cache_filepath.stat()
+            self.index.add(cache_filename, stat.st_size, stat.st_mtime)
+            if self.index.total_size > self.max_size_mb * 1024 * 1024:
+                self._janitor_wakeup.set()
+            logger.info(f"图片缓存成功: {img_url} -> {cache_filename}")
+            return f"/static/images/cache/{cache_filename}"
+            
+        except Exception as e:
+            logger.error(f"缓存图片失败: {img_url}, 错误: {str(e)}")
+            return None
+    
+    def _download(self, img_url: str, cache_filepath: Path) -> bool:
+        """下载图片到缓存文件，不是图片或文件过大时返回False
+        
+        先写入缓存目录中的临时文件，下载完成后再原子替换为缓存文件，
+        其他线程或页面不会读到写了一半的图片。
+        """
+        max_bytes = self.max_file_size_mb * 1024 * 1024
+        with requests.get(img_url, timeout=30, stream=True) as response:
             response.raise_for_status()
             
             # 检查Content-Type
             content_type = response.headers.get('content-type', '').lower()
             if not content_type.startswith('image/'):
                 logger.warning(f"URL返回的不是图片类型: {content_type}, URL: {img_url}")
-                return None
+                return False
             
             # 检查文件大小
             content_length = response.headers.get('content-length')
-            if content_length and int(content_length) > self.max_file_size_mb * 1024 * 1024:
+            if content_length and int(content_length) > max_bytes:
                 logger.warning(f"图片文件过大: {content_length} bytes, URL: {img_url}")
-                return None
-            
-            # 保存文件
-            with open(cache_filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            # 检查保存后的文件大小
-            if cache_filepath.stat().st_size > self.max_file_size_mb * 1024 * 1024:
-                cache_filepath.unlink()
-                logger.warning(f"下载的图片文件过大，已删除: {img_url}")
-                return None
+                return False
             
-            logger.info(f"图片缓存成功: {img_url} -> {cache_filename}")
-            return f"/static/images/cache/{cache_filename}"
-            
-        except Exception as e:
-            logger.error(f"缓存图片失败: {img_url}, 错误: {str(e)}")
-            return None
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.', suffix='.tmp')
+            try:
+                size = 0
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=8192):
+                        size += len(chunk)
+                        # 未声明或声明不实的 Content-Length 在下载过程中检查
+                        if size > max_bytes:
+                            logger.warning(f"下载的图片文件过大，已放弃: {img_url}")
+                            return False
+                        f.write(chunk)
+                os.replace(tmp_path, cache_filepath)
+                tmp_path = None
+            finally:
+                if tmp_path:
+                    Path(tmp_path).unlink(missing_ok=True)
+        return True
+    
+    def _remove_file(self, cache_filename: str):
+        """删除缓存文件及其索引记录"""
+        self.index.remove(cache_filename)
+        (self.cache_dir / cache_filename).unlink(missing_ok=True)
     
     def _cleanup_expired_files(self):
-        """清理过期的缓存文件"""
+        """清理超过有效期未被访问的缓存文件"""
         try:
-            current_time = datetime.now()
-            expired_count = 0
+            expired = self.index.expired(time.time() - self.expire_hours * 3600)
+            for entry in expired:
+                self._remove_file(entry.filename)
             
-            for cache_file in self.cache_dir.glob('*'):
-                if cache_file.is_file():
-                    file_age = current_time - datetime.fromtimestamp(cache_file.stat().st_mtime)
-                    if file_age > timedelta(hours=self.expire_hours):
-                        cache_file.unlink()
-                        expired_count += 1
-            
-            if expired_count > 0:
-                logger.info(f"清理了 {expired_count} 个过期的缓存图片")
+            if expired:
+                logger.info(f"清理了 {len(expired)} 个过期的缓存图片")
                 
         except Exception as e:
             logger.error(f"清理过期缓存文件失败: {str(e)}")
@@ -189,26 +336,18 @@ class ImageCache:
     def _cleanup_by_size(self):
         """按大小清理缓存（当缓存超过最大限制时）"""
         try:
-            # 计算当前缓存大小
-            total_size = sum(f.stat().st_size for f in self.cache_dir.glob('*') if f.is_file())
             max_size_bytes = self.max_size_mb * 1024 * 1024
-            
-            if total_size <= max_size_bytes:
+            if self.index.total_size <= max_size_bytes:
                 return
             
-            # 按修改时间排序，删除最旧的文件
-            cache_files = [(f, f.stat().st_mtime) for f in self.cache_dir.glob('*') if f.is_file()]
-            cache_files.sort(key=lambda x: x[1])  # 按时间排序
-            
+            # 按淘汰策略从索引中依次弹出优先级最低的文件，清理到80%
             deleted_count = 0
-            for cache_file, _ in cache_files:
-                cache_file.unlink()
-                deleted_count += 1
-                
-                # 重新计算大小
-                total_size = sum(f.stat().st_size for f in self.cache_dir.glob('*') if f.is_file())
-                if total_size <= max_size_bytes * 0.8:  # 清理到80%
+            while self.index.total_size > max_size_bytes * 0.8:
+                entry = self.index.pop_victim()
+                if entry is None:
                     break
+                (self.cache_dir / entry.filename).unlink(missing_ok=True)
+                deleted_count += 1
             
             logger.info(f"按大小清理了 {deleted_count} 个缓存图片")
             
@@ -216,18 +355,16 @@ class ImageCache:
             logger.error(f"按大小清理缓存失败: {str(e)}")
     
     def get_cache_stats(self) -> dict:
-        """获取缓存统计信息"""
+        """获取缓存统计信息（来自索引，不遍历缓存目录）"""
         try:
-            cache_files = list(self.cache_dir.glob('*'))
-            file_count = len([f for f in cache_files if f.is_file()])
-            total_size = sum(f.stat().st_size for f in cache_files if f.is_file())
-            
             return {
                 'enabled': self.enabled,
-                'file_count': file_count,
-                'total_size_mb': round(total_size / (1024 * 1024), 2),
+                'file_count': len(self.index),
+                'total_size_mb': round(self.index.total_size / (1024 * 1024), 2),
                 'max_size_mb': self.max_size_mb,
                 'expire_hours': self.expire_hours,
+                'eviction_policy': self.index.policy.name,
+                'janitor_running': bool(self._janitor and self._janitor.is_alive()),
                 'cache_dir': str(self.cache_dir)
             }
         except Exception as e:
@@ -0,0 +1,197 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from utils.cache_eviction import EvictionPolicy, LRUPolicy
+import heapq
+import os
+import sqlite3
+import threading
+import time
+
+class CacheEntry:
+    """缓存文件的索引记录"""
+
+    __slots__ = ('filename', 'size', 'mtime', 'last_access', 'hits', 'priority')
+
+    def __init__(self, filename: str, size: int, mtime: float, last_access: float, hits: int = 0):
+        self.filename = filename
+        self.size = size
+        self.mtime = mtime
+        self.last_access = last_access
+        self.hits = hits
+        # 淘汰优先级，由淘汰策略在写入和每次访问时计算
+        self.priority = None
+
+class ImageCacheIndex:
+    """图片缓存目录的持久化索引（SQLite）
+
+    记录每个缓存文件的大小、写入时间、最后访问时间和命中次数，并在内存中维护文件数和总大小，
+    统计信息无需遍历目录。按淘汰策略优先级排序的小顶堆用于淘汰，每次淘汰弹出堆顶即可；
+    删除或重新计算优先级的记录在堆中惰性失效，堆中失效项过多时重建。
+    访问记录先更新内存，由 flush 批量写回数据库。
+    """
+
+    def __init__(self, path: str, policy: Optional[EvictionPolicy] = None):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS image_cache_entries ('
+            'filename TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, '
+            'last_access REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)'
+        )
+        self._conn.commit()
+
+        self.policy = policy or LRUPolicy()
+        self._entries: Dict[str, CacheEntry] = {}
+        # [(priority, filename)]
+        self._heap: List[Tuple[Tuple, str]] = []
+        # 有未写回访问记录的文件
+        self._dirty: Set[str] = set()
+        self.total_size = 0
+
+        for filename, size, mtime, last_access, hits in self._conn.execute(
+                'SELECT filename, size, mtime, last_access, hits FROM image_cache_entries'):
+            entry = CacheEntry(filename, size, mtime, last_access, hits)
+            entry.priority = self.policy.priority(entry)
+            self._entries[filename] = entry
+            self.total_size += size
+        self._rebuild_heap()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _rebuild_heap(self):
+        self._heap = [(entry.priority, entry.filename) for entry in self._entries.values()]
+        heapq.heapify(self._heap)
+
+    def _push(self, entry: CacheEntry):
+        entry.priority = self.policy.priority(entry)
+        heapq.heappush(self._heap, (entry.priority, entry.filename))
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._rebuild_heap()
+
+    def reconcile(self, cache_dir: Path) -> Tuple[int, int]:
+        """与缓存目录同步（启动时执行一次），返回 (补录的文件数, 移除的失效记录数)"""
+        on_disk = {}
+        with os.scandir(cache_dir) as it:
+            for dir_entry in it:
+                # 跳过下载中途留下的临时文件
+                if dir_entry.is_file() and not dir_entry.name.startswith('.'):
+                    on_disk[dir_entry.name] = dir_entry
+
+        with self._lock:
+            missing = [filename for filename in self._entries if filename not in on_disk]
+            added = []
+            for filename, dir_entry in on_disk.items():
+                if filename in self._entries:
+                    continue
+                stat = dir_entry.stat()
+                added.append(CacheEntry(filename, stat.st_size, stat.st_mtime, stat.st_mtime))
+
+            for filename in missing:
+                self.total_size -= self._entries.pop(filename).size
+            for entry in added:
+                entry.priority = self.policy.priority(entry)
+                self._entries[entry.filename] = entry
+                self.total_size += entry.size
+
+            with self._conn:
+                self._conn.executemany('DELETE FROM image_cache_entries WHERE filename = ?',
+                                       [(filename,) for filename in missing])
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO image_cache_entries (filename, size, mtime, last_access, hits) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    [(e.filename, e.size, e.mtime, e.last_access, e.hits) for e in added]
+                )
+            if missing or added:
+                self._rebuild_heap()
+        return len(added), len(missing)
+
+    def get(self, filename: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._entries.get(filename)
+
+    def add(self, filename: str, size: int, mtime: float):
+        """记录新写入（或重新下载）的缓存文件"""
+        with self._lock:
+            previous = self._entries.get(filename)
+            if previous is not None:
+                self.total_size -= previous.size
+            entry = CacheEntry(filename, size, mtime, mtime)
+            self._entries[filename] = entry
+            self.total_size += size
+            self._dirty.discard(filename)
+            self._push(entry)
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO image_cache_entries (filename, size, mtime, last_access, hits) '
+                    'VALUES (?, ?, ?, ?, 0)',
+                    (filename, size, mtime, mtime)
+                )
+
+    def touch(self, filename: str, at: Optional[float] = None) -> bool:
+        """记录一次访问（缓存命中或页面加载图片），文件不在索引中时返回False"""
+        at = at or time.time()
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is None:
+                return False
+            entry.last_access = at
+            entry.hits += 1
+            self._dirty.add(filename)
+            self._push(entry)
+            return True
+
+    def flush(self) -> int:
+        """把内存中的访问记录批量写回数据库，返回写回的记录数"""
+        with self._lock:
+            rows = [(self._entries[filename].last_access, self._entries[filename].hits, filename)
+                    for filename in self._dirty if filename in self._entries]
+            self._dirty.clear()
+            if rows:
+                with self._conn:
+                    self._conn.executemany(
+                        'UPDATE image_cache_entries SET last_access = ?, hits = ? WHERE filename = ?', rows
+                    )
+            return len(rows)
+
+    def remove(self, filename: str) -> Optional[CacheEntry]:
+        with self._lock:
+            return self._remove_locked(filename)
+
+    def _remove_locked(self, filename: str) -> Optional[CacheEntry]:
+        entry = self._entries.pop(filename, None)
+        if entry is None:
+            return None
+        self.total_size -= entry.size
+        self._dirty.discard(filename)
+        with self._conn:
+            self._conn.execute('DELETE FROM image_cache_entries WHERE filename = ?', (filename,))
+        # 删除的记录在堆中惰性失效，失效项超过一半时重建
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._rebuild_heap()
+        return entry
+
+    def pop_victim(self) -> Optional[CacheEntry]:
+        """按淘汰策略移除并返回优先级最低的记录，索引为空时返回None"""
+        with self._lock:
+            while self._heap:
+                priority, filename = heapq.heappop(self._heap)
+                entry = self._entries.get(filename)
+                # 跳过已删除或优先级已更新的失效堆项
+                if entry is not None and entry.priority == priority:
+                    self.policy.on_evict(entry)
+                    return self._remove_locked(filename)
+            return None
+
+    def expired(self, before: float) -> List[CacheEntry]:
+        """最后访问时间早于 before 的记录"""
+        with self._lock:
+            return [entry for entry in self._entries.values() if entry.last_access < before]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
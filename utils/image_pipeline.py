@@ -0,0 +1,133 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+from loguru import logger
+from database.models import PostData
+from utils.image_cache import IMAGE_URL_PATTERN, image_cache
+from config import config as app_config
+import threading
+
+class _ImageTask:
+    """单个帖子的图片处理任务"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.processed_content: Optional[str] = None
+        self.done = threading.Event()
+
+class ImagePipeline:
+    """帖子入库后的图片处理阶段
+
+    帖子先以原始图片链接入库并触发通知，图片在独立线程池中下载缓存后再回写 processed_content，
+    图片下载不再阻塞入库和推送。需要本地图片的通知器（如邮件）可通过 wait 在截止时间内等待处理结果。
+    """
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.max_workers = app_config.IMAGE_PIPELINE_WORKERS
+        self.max_completed = app_config.IMAGE_PIPELINE_MAX_COMPLETED
+
+        self._executor = None
+        self._lock = threading.Lock()
+        # {(platform, user_id, post_id): _ImageTask}，按提交顺序排列，已完成的任务保留最近 max_completed 个
+        self._tasks: OrderedDict = OrderedDict()
+        self._pending = 0
+        self._processed = 0
+        self._failed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='image-pipeline')
+            return self._executor
+
+    def submit(self, platform: str, user_id: str, posts: Iterable[Dict]):
+        """提交已入库帖子的图片处理任务，不含图片的帖子直接跳过"""
+        if not image_cache.enabled:
+            return
+
+        for post in posts:
+            content = post.get('content')
+            if not content or not IMAGE_URL_PATTERN.search(content):
+                continue
+
+            key = (platform, user_id, str(post['post_id']))
+            task = _ImageTask(content)
+            with self._lock:
+                self._tasks[key] = task
+                self._tasks.move_to_end(key)
+                self._pending += 1
+            self._get_executor().submit(self._process, key, task)
+
+    def _process(self, key: Tuple[str, str, str], task: _ImageTask):
+        platform, user_id, post_id = key
+        try:
+            processed_content = image_cache.process_content(task.content)
+            if processed_content != task.content:
+                self._save(platform, user_id, post_id, processed_content)
+                task.processed_content = processed_content
+            with self._lock:
+                self._processed += 1
+        except Exception as e:
+            logger.error(f"处理帖子图片失败: {platform} - {post_id}, 错误: {str(e)}")
+            with self._lock:
+                self._failed += 1
+        finally:
+            task.done.set()
+            with self._lock:
+                self._pending -= 1
+                self._trim()
+
+    def _save(self, platform: str, user_id: str, post_id: str, processed_content: str):
+        session = self.db_manager.get_session()
+        try:
+            session.query(PostData).filter(
+                PostData.platform == platform,
+                PostData.user_id == user_id,
+                PostData.post_id == post_id
+            ).update({'processed_content': processed_content}, synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _trim(self):
+        """只保留最近 max_completed 个已完成任务的结果（调用方持有锁）"""
+        completed = len(self._tasks) - self._pending
+        for key in list(self._tasks):
+            if completed <= self.max_completed:
+                break
+            if self._tasks[key].done.is_set():
+                del self._tasks[key]
+                completed -= 1
+
+    def wait(self, platform: str, user_id: str, post_id: str, timeout: float) -> Optional[str]:
+        """等待帖子图片处理完成，返回处理后的内容
+
+        帖子没有待处理的图片、图片均未缓存成功或超过截止时间时返回None，调用方使用原始内容。
+        """
+        with self._lock:
+            task = self._tasks.get((platform, user_id, str(post_id)))
+        if task is None:
+            return None
+        if not task.done.wait(max(0.0, timeout)):
+            logger.warning(f"等待帖子图片处理超时，使用原始图片链接: {platform} - {post_id}")
+            return None
+        return task.processed_content
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'pending': self._pending,
+                'processed': self._processed,
+                'failed': self._failed
+            }
@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+import heapq
+import itertools
+import threading
+
+class ScheduleQueue:
+    """按下次执行时间排序的最小堆调度队列
+
+    同一配置重新入队时旧条目不会立即从堆中删除，而是在弹出时根据版本号丢弃。
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries: Dict[int, tuple] = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._wakeup = False
+
+    def push(self, config_id: int, due_time: datetime):
+        """加入或重新安排配置的下次执行时间"""
+        with self._condition:
+            entry = (due_time, next(self._counter), config_id)
+            self._entries[config_id] = entry
+            heapq.heappush(self._heap, entry)
+            # 新的最早时间点可能早于调度线程当前的等待时间
+            if self._heap[0] is entry:
+                self._wakeup = True
+                self._condition.notify_all()
+
+    def remove(self, config_id: int):
+        """移除配置（惰性删除）"""
+        with self._condition:
+            self._entries.pop(config_id, None)
+
+    def clear(self):
+        with self._condition:
+            self._heap.clear()
+            self._entries.clear()
+
+    def _discard_stale(self):
+        """丢弃堆顶已失效的条目（需持有锁）"""
+        while self._heap and self._entries.get(self._heap[0][2]) is not self._heap[0]:
+            heapq.heappop(self._heap)
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """弹出所有已到期的配置ID"""
+        due = []
+        with self._condition:
+            self._discard_stale()
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                del self._entries[entry[2]]
+                due.append(entry[2])
+                self._discard_stale()
+        return due
+
+    def next_due_time(self) -> Optional[datetime]:
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def due_time(self, config_id: int) -> Optional[datetime]:
+        with self._condition:
+            entry = self._entries.get(config_id)
+            return entry[0] if entry else None
+
+    def wait(self, max_wait: float = None):
+        """休眠到下一个到期时间，队列有更早的条目或调用wake()时提前返回"""
+        with self._condition:
+            self._discard_stale()
+            timeout = max_wait
+            if self._heap:
+                until_due = (self._heap[0][0] - datetime.now()).total_seconds()
+                timeout = until_due if timeout is None else min(timeout, until_due)
+            if timeout is not None and timeout <= 0:
+                return
+            if not self._wakeup:
+                self._condition.wait(timeout)
+            self._wakeup = False
+
+    def wake(self):
+        """唤醒等待中的调度线程"""
+        with self._condition:
+            self._wakeup = True
+            self._condition.notify_all()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._entries)
@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import AsyncIterator, Dict, Iterable, List
 from loguru import logger
 from sqlalchemy import desc
 from database.connection import DatabaseManager
 from database.models import SpiderConfig, PostData, NotificationConfig
+from database.post_store import find_latest_post_id, save_new_posts
 from spider.xueqiu_spider import XueqiuSpider
 from spider.weibo_spider import WeiboSpider
 from spider.twitter_spider import TwitterSpider
@@ -15,6 +16,21 @@ from notification.wechat_work_notifier import WechatWorkNotifier
 from notification.wechat_mp_notifier import WechatMpNotifier
 from notification.feishu_notifier import FeishuNotifier
 from utils.image_cache import image_cache
+from utils.image_pipeline import ImagePipeline
+from utils.crawl_executor import CrawlExecutor, AsyncCrawlExecutor
+from utils.schedule_queue import ScheduleQueue
+from utils.cron import CronExpression, CronParseError
+from utils.adaptive_schedule import AdaptiveIntervalPolicy
+from utils.seen_posts import SeenPostFilter
+from utils.backfill import BackfillManager
+from spider.session_pool import SessionPool
+from spider.rate_limiter import rate_limiter
+from spider.circuit_breaker import circuit_breakers
+from spider.validator_cache import validator_cache
+from spider.content_fingerprint import content_fingerprints
+from config import config as app_config
+from types import SimpleNamespace
+import asyncio
 import threading
 import time
 import schedule
@@ -24,6 +40,38 @@ class SpiderScheduler:  # 将 Scheduler 改为 SpiderScheduler
         self.db_manager = DatabaseManager()
         self.running = False
         self.thread = None
+        self.executor = None
+        
+        # 调度队列（按下次执行时间排序）及配置快照
+        self.schedule_queue = ScheduleQueue()
+        self._configs = {}
+        self._lock = threading.Lock()
+        # 预编译的Cron表达式缓存 {config_id: (cron_expression, CronExpression或None)}
+        self._cron_cache = {}
+        # 按交易时段和发帖频率调整间隔的自适应策略
+        self.adaptive_policy = AdaptiveIntervalPolicy(self.db_manager)
+        # 待批量写回数据库的执行时间 {config_id: (last_run_time, next_run_time)}
+        self._pending_run_times = {}
+        self.flush_interval = app_config.SCHEDULER_FLUSH_INTERVAL
+        self.resync_interval = app_config.SCHEDULER_RESYNC_INTERVAL
+        self._last_flush = time.monotonic()
+        self._last_resync = time.monotonic()
+        
+        # 已入库帖子ID过滤器，减少入库前的数据库去重查询
+        self.seen_posts = SeenPostFilter(self.db_manager, max_per_user=app_config.SEEN_POSTS_PER_USER)
+        self.ingest_batch_size = app_config.INGEST_BATCH_SIZE
+        # 首页响应与上次完全相同、直接跳过处理的执行次数 {platform: count}
+        self.no_change_runs = {}
+        
+        # 按平台复用的HTTP会话，保留keep-alive连接和cookie
+        self.session_pool = SessionPool(
+            pool_connections=app_config.SESSION_POOL_CONNECTIONS,
+            pool_maxsize=app_config.SESSION_POOL_MAXSIZE,
+            max_idle_sessions=app_config.SESSION_POOL_MAX_IDLE,
+            max_session_age=app_config.SESSION_POOL_MAX_AGE
+        )
+        # asyncio运行时的共享aiohttp会话，在事件循环中懒加载
+        self.async_session_pool = None
         
         # 爬虫映射
         self.spiders = {
@@ -42,6 +90,13 @@ class SpiderScheduler:  # 将 Scheduler 改为 SpiderScheduler
             'wechat_mp': WechatMpNotifier,
             'feishu': FeishuNotifier
         }
+        
+        # 历史回溯任务（独立线程池，不触发通知）
+        self.backfill = BackfillManager(self.db_manager, self.spiders, self.session_pool)
+        
+        # 入库后异步缓存帖子图片，需要本地图片的通知器最多等待 notify_wait 秒
+        self.image_pipeline = ImagePipeline(self.db_manager)
+        self.image_notify_wait = app_config.IMAGE_PIPELINE_NOTIFY_WAIT
     
     def start(self):
         """启动调度器"""
@@ -50,133 +105,452 @@ class SpiderScheduler:  # 将 Scheduler 改为 SpiderScheduler
             return
         
         self.running = True
+        self.executor = self._create_executor()
+        self._load_schedule()
+        with self._lock:
+            accounts = {(config.platform, config.user_id) for config in self._configs.values()}
+        self.seen_posts.warm(accounts)
+        self.backfill.resume_interrupted()
+        image_cache.start_janitor()
         self.thread = threading.Thread(target=self._run_scheduler, daemon=True)
         self.thread.start()
         logger.info("调度器已启动")
     
+    def _create_executor(self):
+        """根据配置创建线程池或asyncio执行器"""
+        if app_config.SPIDER_RUNTIME == 'asyncio':
+            return AsyncCrawlExecutor(
+                self.run_single_spider_async,
+                max_concurrency=app_config.SPIDER_ASYNC_MAX_CONCURRENCY,
+                platform_limits=app_config.SPIDER_PLATFORM_CONCURRENCY,
+                default_platform_limit=app_config.SPIDER_DEFAULT_PLATFORM_CONCURRENCY
+            )
+        
+        return CrawlExecutor(
+            self.run_single_spider,
+            max_workers=app_config.SPIDER_MAX_WORKERS,
+            platform_limits=app_config.SPIDER_PLATFORM_CONCURRENCY,
+            default_platform_limit=app_config.SPIDER_DEFAULT_PLATFORM_CONCURRENCY
+        )
+    
     def stop(self):
         """停止调度器"""
         self.running = False
+        self.schedule_queue.wake()
         if self.thread:
             self.thread.join(timeout=5)
+        self._flush_run_times()
+        self.backfill.shutdown()
+        self.image_pipeline.shutdown()
+        image_cache.shutdown()
+        if self.async_session_pool and isinstance(self.executor, AsyncCrawlExecutor):
+            try:
+                self.executor.run_coroutine(self.async_session_pool.close_all())
+            except Exception as e:
+                logger.error(f"关闭异步会话失败: {str(e)}")
+            self.async_session_pool = None
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        self.session_pool.close_all()
         logger.info("调度器已停止")
     
+    def _snapshot_config(self, config: SpiderConfig) -> SimpleNamespace:
+        """提取调度所需的配置字段，避免在调度线程中持有数据库会话"""
+        return SimpleNamespace(
+            id=config.id,
+            platform=config.platform,
+            user_id=config.user_id,
+            schedule_type=config.schedule_type,
+            schedule_interval=config.schedule_interval,
+            cron_expression=config.cron_expression,
+            last_run_time=config.last_run_time,
+            next_run_time=config.next_run_time
+        )
+    
+    def _load_schedule(self):
+        """从数据库加载所有启用的爬虫配置并重建调度队列"""
+        self._last_resync = time.monotonic()
+        session = self.db_manager.get_session()
+        try:
+            configs = session.query(SpiderConfig).filter(
+                SpiderConfig.is_active == True,
+                SpiderConfig.schedule_enabled == True
+            ).all()
+            snapshots = {config.id: self._snapshot_config(config) for config in configs}
+        except Exception as e:
+            logger.error(f"加载爬虫调度配置失败: {str(e)}")
+            return
+        finally:
+            session.close()
+        
+        self._warm_posting_rates(snapshots.values())
+        current_time = datetime.now()
+        with self._lock:
+            self._configs = snapshots
+            self.schedule_queue.clear()
+            for config in snapshots.values():
+                self._schedule_config(config, current_time)
+        
+        logger.info(f"调度队列已加载 {len(snapshots)} 个爬虫配置")
+    
+    def reload_config(self, config_id: int):
+        """爬虫配置新增或修改后刷新其调度时间并唤醒调度线程"""
+        session = self.db_manager.get_session()
+        try:
+            config = session.query(SpiderConfig).filter(SpiderConfig.id == config_id).first()
+            snapshot = None
+            if config and config.is_active and config.schedule_enabled:
+                snapshot = self._snapshot_config(config)
+        except Exception as e:
+            logger.error(f"刷新爬虫调度配置失败: config_id={config_id}, 错误: {str(e)}")
+            return
+        finally:
+            session.close()
+        
+        self.adaptive_policy.invalidate(config_id)
+        if snapshot:
+            self._warm_posting_rates([snapshot])
+        
+        with self._lock:
+            # 尚未写回数据库的执行时间以内存为准
+            pending = self._pending_run_times.get(config_id)
+            if snapshot and pending:
+                snapshot.last_run_time, snapshot.next_run_time = pending
+            
+            if snapshot:
+                self._configs[config_id] = snapshot
+                self._schedule_config(snapshot, datetime.now())
+            else:
+                removed = self._configs.pop(config_id, None)
+                if removed:
+                    self.seen_posts.discard(removed.platform, removed.user_id)
+                    content_fingerprints.discard(removed.platform, removed.user_id)
+                self._cron_cache.pop(config_id, None)
+                self.schedule_queue.remove(config_id)
+        
+        self.schedule_queue.wake()
+    
+    def _warm_posting_rates(self, configs: Iterable):
+        """在获取调度锁之前计算自适应配置的发帖频率（需查询数据库），持锁计算调度时间时直接命中缓存"""
+        for config in configs:
+            if config.schedule_type == 'adaptive':
+                self.adaptive_policy.get_posting_rates(config)
+    
+    def _schedule_config(self, config, current_time: datetime):
+        """根据上次执行时间计算首次到期时间并入队"""
+        if not config.last_run_time:
+            due_time = current_time
+        else:
+            due_time = self._compute_next_run(config, config.last_run_time)
+        
+        if due_time is None:
+            self.schedule_queue.remove(config.id)
+        else:
+            self.schedule_queue.push(config.id, due_time)
+    
     def _run_scheduler(self):
-        """调度器主循环"""
+        """调度器主循环：休眠到最近的到期时间，到期后提交执行"""
         while self.running:
             try:
-                # 获取所有启用的爬虫配置
-                session = self.db_manager.get_session()
-                configs = session.query(SpiderConfig).filter(
-                    SpiderConfig.is_active == True,
-                    SpiderConfig.schedule_enabled == True
-                ).all()
-                
                 current_time = datetime.now()
                 
-                for config in configs:
-                    # 检查是否需要执行
-                    if self._should_run(config, current_time):
-                        logger.info(f"执行爬虫任务: {config.platform} - {config.user_id}")
-                        self.run_single_spider(config.id)
-                        
-                        # 更新执行时间
+                for config_id in self.schedule_queue.pop_due(current_time):
+                    with self._lock:
+                        config = self._configs.get(config_id)
+                    if not config:
+                        continue
+                    
+                    next_run = self._compute_next_run(config, current_time)
+                    if next_run is not None:
+                        self.schedule_queue.push(config_id, next_run)
+                    
+                    # 平台熔断期间跳过本次执行，冷却结束后由到期的任务探测恢复
+                    if circuit_breakers.is_open(config.platform):
+                        logger.debug(f"平台熔断中，跳过爬虫任务: {config.platform} - {config.user_id}")
+                        continue
+                    
+                    # 提交到执行器，同一配置上一次任务未结束时跳过
+                    if not self.executor.submit(config_id, config.platform):
+                        continue
+                    logger.info(f"提交爬虫任务: {config.platform} - {config.user_id}")
+                    
+                    # 更新执行时间，定期批量写回数据库
+                    with self._lock:
                         config.last_run_time = current_time
-                        config.next_run_time = current_time + timedelta(seconds=config.schedule_interval)
-                        session.commit()
+                        config.next_run_time = next_run
+                        self._pending_run_times[config_id] = (current_time, next_run)
+                
+                if self._pending_run_times and time.monotonic() - self._last_flush >= self.flush_interval:
+                    self._flush_run_times()
                 
-                session.close()
+                # 兜底：定期全量同步，覆盖直接修改数据库的情况
+                if self.resync_interval and time.monotonic() - self._last_resync >= self.resync_interval:
+                    self._flush_run_times()
+                    self._load_schedule()
                 
             except Exception as e:
                 logger.error(f"调度器运行异常: {str(e)}")
             
-            # 等待一段时间再检查
-            time.sleep(10)
+            self.schedule_queue.wait(max_wait=self._max_wait())
+    
+    def _max_wait(self):
+        """调度线程最长休眠时间（None表示一直等到下一个到期时间）"""
+        waits = []
+        if self._pending_run_times:
+            waits.append(self.flush_interval)
+        if self.resync_interval:
+            waits.append(max(0, self.resync_interval - (time.monotonic() - self._last_resync)))
+        return min(waits) if waits else None
+    
+    def _flush_run_times(self):
+        """批量写回上次/下次执行时间"""
+        with self._lock:
+            pending = self._pending_run_times
+            self._pending_run_times = {}
+        self._last_flush = time.monotonic()
+        
+        if not pending:
+            return
+        
+        session = self.db_manager.get_session()
+        try:
+            session.bulk_update_mappings(SpiderConfig, [
+                {'id': config_id, 'last_run_time': last_run, 'next_run_time': next_run}
+                for config_id, (last_run, next_run) in pending.items()
+            ])
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"写回爬虫执行时间失败: {str(e)}")
+        finally:
+            session.close()
+    
+    def _get_cron(self, config):
+        """获取配置对应的预编译Cron表达式，表达式变化时重新编译"""
+        cached = self._cron_cache.get(config.id)
+        if cached and cached[0] == config.cron_expression:
+            return cached[1]
+        
+        try:
+            cron = CronExpression(config.cron_expression)
+        except CronParseError as e:
+            logger.error(f"Cron表达式无效: {config.platform} - {config.user_id}, 错误: {str(e)}")
+            cron = None
+        
+        self._cron_cache[config.id] = (config.cron_expression, cron)
+        return cron
+    
+    def _compute_next_run(self, config, base_time: datetime):
+        """计算基准时间之后的下次执行时间，无法计算时返回None"""
+        if config.schedule_type == 'interval':
+            return base_time + timedelta(seconds=config.schedule_interval)
+        
+        if config.schedule_type == 'cron':
+            cron = self._get_cron(config)
+            return cron.next_fire_time(base_time) if cron else None
+        
+        if config.schedule_type == 'adaptive':
+            return self.adaptive_policy.next_run_time(config, base_time)
+        
+        return None
     
     def _should_run(self, config: SpiderConfig, current_time: datetime) -> bool:
         """判断是否应该执行爬虫"""
         if not config.last_run_time:
             return True
         
-        if config.schedule_type == 'interval':
-            next_run = config.last_run_time + timedelta(seconds=config.schedule_interval)
-            return current_time >= next_run
-        
-        # TODO: 实现cron表达式支持
-        return False
+        next_run = self._compute_next_run(config, config.last_run_time)
+        return next_run is not None and current_time >= next_run
     
-    def run_single_spider(self, config_id: int):
-        """运行单个爬虫"""
+    def _load_crawl_target(self, config_id: int):
+        """读取执行爬虫所需的配置字段及已入库的最新帖子ID（高水位），配置不存在时返回None"""
+        session = self.db_manager.get_session()
         try:
-            session = self.db_manager.get_session()
             config = session.query(SpiderConfig).filter(SpiderConfig.id == config_id).first()
-            
             if not config:
                 logger.error(f"爬虫配置不存在: config_id={config_id}")
-                return
+                return None
             
-            platform = config.platform
-            user_id = config.user_id
-            auth_config = config.auth_config or {}
+            since_id = find_latest_post_id(session, config.platform, config.user_id)
+            
+            return config.platform, config.user_id, config.auth_config or {}, since_id
+        finally:
+            session.close()
+    
+    def run_single_spider(self, config_id: int) -> bool:
+        """运行单个爬虫，返回是否执行成功（由执行器统计失败次数）"""
+        try:
+            target = self._load_crawl_target(config_id)
+            if not target:
+                return False
+            platform, user_id, auth_config, since_id = target
             
             # 获取对应的爬虫类
             spider_class = self.spiders.get(platform)
             if not spider_class:
                 logger.error(f"不支持的平台: {platform}")
-                return
-            
-            # 创建爬虫实例并执行
-            spider = spider_class()
-            if not spider.authenticate(auth_config):
-                logger.error(f"爬虫认证失败: {platform} - {user_id}")
-                return
-            
-            # 获取帖子数据
-            raw_posts = spider.get_user_posts(user_id)
-            if not raw_posts:
-                logger.warning(f"未获取到帖子数据: {platform} - {user_id}")
-                return
+                return False
             
-            # 解析并保存新帖子
-            new_posts = []
-            for raw_post in raw_posts:
-                parsed_post = spider.parse_post(raw_post)
-                if parsed_post and parsed_post.get('post_id'):
-                    # 检查是否已存在
-                    existing = session.query(PostData).filter(
-                        PostData.platform == platform,
-                        PostData.user_id == user_id,
-                        PostData.post_id == parsed_post.get('post_id')
-                    ).first()
-                    
-                    if not existing:
-                        # 处理图片缓存
-                        original_content = parsed_post.get('content', '')
-                        processed_content = image_cache.process_content(original_content)
-                        
-                        post = PostData(
-                            platform=platform,
-                            user_id=user_id,
-                            post_id=parsed_post.get('post_id'),
-                            content=original_content,
-                            processed_content=processed_content,
-                            post_time=parsed_post.get('post_time'),
-                            is_sent=False
-                        )
-                        session.add(post)
-                        new_posts.append(post)
+            # 使用会话池中的会话创建爬虫实例并执行
+            with self.session_pool.lease(platform, auth_config) as http_session:
+                spider = spider_class(session=http_session)
+                if not spider.authenticate(auth_config):
+                    logger.error(f"爬虫认证失败: {platform} - {user_id}")
+                    return False
+                
+                # 只获取比已入库最新帖子更新的数据，边获取边入库
+                posts = spider.iter_user_posts(user_id, since_id=since_id)
+                self._ingest_posts(config_id, platform, user_id, since_id, posts)
+                self._finish_crawl(spider, platform)
+            return True
             
-            session.commit()
-            session.close()
+        except Exception as e:
+            logger.error(f"爬虫任务执行失败: config_id={config_id}, 错误: {str(e)}")
+            return False
+    
+    async def run_single_spider_async(self, config_id: int) -> bool:
+        """在事件循环中运行单个爬虫，网络请求异步执行，数据库读写在线程池中执行"""
+        try:
+            target = await asyncio.to_thread(self._load_crawl_target, config_id)
+            if not target:
+                return False
+            platform, user_id, auth_config, since_id = target
             
-            logger.info(f"爬虫 {platform} - {user_id} 获取到 {len(raw_posts)} 条帖子，新增 {len(new_posts)} 条")
+            spider, http_session = self._create_async_spider(platform, auth_config)
+            if not spider:
+                logger.error(f"不支持的平台: {platform}")
+                return False
             
-            # 如果有新帖子，触发通知
-            if new_posts:
-                self.send_notifications_for_config(config_id)
+            try:
+                if not await spider.authenticate(auth_config):
+                    logger.error(f"爬虫认证失败: {platform} - {user_id}")
+                    return False
+                
+                posts = spider.iter_user_posts(user_id, since_id=since_id)
+                await self._ingest_posts_async(config_id, platform, user_id, since_id, posts)
+                self._finish_crawl(spider, platform)
+                return True
+            finally:
+                await spider.close()
+                if http_session is not None:
+                    self.session_pool.release(platform, http_session, auth_config=auth_config)
             
         except Exception as e:
             logger.error(f"爬虫任务执行失败: config_id={config_id}, 错误: {str(e)}")
+            return False
+    
+    def _finish_crawl(self, spider, platform: str):
+        """爬取结果入库后保存首页响应指纹和页面验证器，内容未变化的执行计为一次无变化执行"""
+        if spider.content_unchanged:
+            with self._lock:
+                self.no_change_runs[platform] = self.no_change_runs.get(platform, 0) + 1
+        spider.confirm_content()
+    
+    def _create_async_spider(self, platform: str, auth_config: Dict = None):
+        """创建异步爬虫实例，没有原生异步实现的平台包装同步爬虫
+
+        返回 (爬虫实例, 借出的requests会话)，原生异步爬虫共享平台相同认证配置的aiohttp会话，无需归还。
+        """
+        from spider.async_base_spider import SyncSpiderAdapter, AsyncSessionPool
+        from spider.async_xueqiu_spider import AsyncXueqiuSpider
+        from spider.async_weibo_spider import AsyncWeiboSpider
+        
+        async_spiders = {
+            'xueqiu': AsyncXueqiuSpider,
+            'weibo': AsyncWeiboSpider
+        }
+        if platform in async_spiders:
+            if self.async_session_pool is None:
+                self.async_session_pool = AsyncSessionPool(
+                    limit=app_config.SPIDER_ASYNC_MAX_CONCURRENCY,
+                    limit_per_host=app_config.SESSION_POOL_MAXSIZE,
+                    keepalive_timeout=app_config.SESSION_POOL_KEEPALIVE_TIMEOUT
+                )
+            return async_spiders[platform](session=self.async_session_pool.get(platform, auth_config)), None
+        
+        spider_class = self.spiders.get(platform)
+        if not spider_class:
+            return None, None
+        http_session = self.session_pool.acquire(platform, auth_config)
+        return SyncSpiderAdapter(spider_class(session=http_session)), http_session
+    
+    def _ingest_posts(self, config_id: int, platform: str, user_id: str, since_id, posts: Iterable[Dict]):
+        """流式消费解析后的帖子并分批入库，确定已入库的帖子在访问数据库前丢弃"""
+        self.seen_posts.ensure_loaded(platform, user_id)
+        
+        batch = []
+        fetched_count = new_count = 0
+        for post in posts:
+            if not post or not post.get('post_id'):
+                continue
+            fetched_count += 1
+            # 确定已入库的帖子直接丢弃，不访问数据库；不在此停止消费，
+            # 置顶或按回复时间排序的帖子可能排在新帖子之前，停止条件由爬虫的 PostWindow 决定
+            if self.seen_posts.is_known(platform, user_id, post['post_id']):
+                continue
+            batch.append(post)
+            if len(batch) >= self.ingest_batch_size:
+                new_count += self._store_posts(platform, user_id, batch)
+                batch = []
+        
+        if batch:
+            new_count += self._store_posts(platform, user_id, batch)
+        self._finish_ingest(config_id, platform, user_id, since_id, fetched_count, new_count)
+    
+    async def _ingest_posts_async(self, config_id: int, platform: str, user_id: str, since_id, posts: AsyncIterator[Dict]):
+        """_ingest_posts 的异步版本，数据库读写在线程池中执行"""
+        await asyncio.to_thread(self.seen_posts.ensure_loaded, platform, user_id)
+        
+        batch = []
+        fetched_count = new_count = 0
+        try:
+            async for post in posts:
+                if not post or not post.get('post_id'):
+                    continue
+                fetched_count += 1
+                if self.seen_posts.is_known(platform, user_id, post['post_id']):
+                    continue
+                batch.append(post)
+                if len(batch) >= self.ingest_batch_size:
+                    new_count += await asyncio.to_thread(self._store_posts, platform, user_id, batch)
+                    batch = []
+        finally:
+            await posts.aclose()
+        
+        if batch:
+            new_count += await asyncio.to_thread(self._store_posts, platform, user_id, batch)
+        await asyncio.to_thread(self._finish_ingest, config_id, platform, user_id, since_id, fetched_count, new_count)
+    
+    def _store_posts(self, platform: str, user_id: str, posts: List[Dict]) -> int:
+        """批量去重并写入一批帖子，返回新增数量"""
+        session = self.db_manager.get_session()
+        try:
+            new_posts = save_new_posts(session, platform, user_id, posts)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        
+        # 提交后这批帖子均已在数据库中，新帖子的图片在后台缓存，不阻塞通知
+        self.seen_posts.add(platform, user_id, [post['post_id'] for post in posts])
+        self.image_pipeline.submit(platform, user_id, new_posts)
+        return len(new_posts)
+    
+    def _finish_ingest(self, config_id: int, platform: str, user_id: str, since_id, fetched_count: int, new_count: int):
+        if not fetched_count:
+            if since_id:
+                logger.info(f"没有新帖子: {platform} - {user_id}")
+            else:
+                logger.warning(f"未获取到帖子数据: {platform} - {user_id}")
+            return
+        
+        logger.info(f"爬虫 {platform} - {user_id} 获取到 {fetched_count} 条帖子，新增 {new_count} 条")
+        
+        # 如果有新帖子，触发通知
+        if new_count:
+            self.send_notifications_for_config(config_id)
     
     def send_notifications_for_config(self, config_id: int):
         """为指定配置发送通知"""
@@ -200,8 +574,13 @@ class SpiderScheduler:  # 将 Scheduler 改为 SpiderScheduler
                 logger.info(f"没有未发送的帖子: {config.platform} - {config.user_id}")
                 return
             
-            # 遍历关联的通知配置
-            for notification_config in config.notification_configs:
+            # 遍历关联的通知配置，需要等待本地图片的通知器放在最后发送
+            notification_configs = sorted(
+                config.notification_configs,
+                key=lambda item: getattr(self.notifiers.get(item.method), 'needs_local_images', False)
+            )
+            image_deadline = time.monotonic() + self.image_notify_wait
+            for notification_config in notification_configs:
                 if not notification_config.is_active:
                     continue
                 
@@ -217,8 +596,13 @@ class SpiderScheduler:  # 将 Scheduler 改为 SpiderScheduler
                     # 发送通知
                     for post in unsent_posts:
                         title = f"[{post.platform}] {config.username or config.user_id} 新消息"
-                        # 使用处理后的内容（包含缓存的图片链接）
+                        # 使用处理后的内容（包含缓存的图片链接），图片尚未缓存完成时使用原始链接
                         content = post.processed_content or post.content
+                        if notifier.needs_local_images:
+                            content = self.image_pipeline.wait(
+                                post.platform, post.user_id, post.post_id,
+                                timeout=image_deadline - time.monotonic()
+                            ) or content
                         
                         success = notifier.send_message(title, content)
                         if success:
@@ -251,11 +635,24 @@ class SpiderScheduler:  # 将 Scheduler 改为 SpiderScheduler
             
             session.close()
             
+            next_due_time = self.schedule_queue.next_due_time()
             return {
                 'running': self.running,
                 'total_configs': total_configs,
                 'active_configs': active_configs,
                 'total_posts': total_posts,
+                'scheduled_configs': len(self.schedule_queue),
+                'next_due_time': next_due_time.isoformat() if next_due_time else None,
+                'trading_calendar': self.adaptive_policy.get_status(),
+                'executor': self.executor.get_status() if self.executor else {},
+                'session_pool': self.session_pool.get_status(),
+                'rate_limiter': rate_limiter.get_status(),
+                'circuit_breakers': circuit_breakers.get_status(),
+                'conditional_requests': validator_cache.get_status(),
+                'seen_posts': self.seen_posts.get_status(),
+                'no_change_runs': dict(self.no_change_runs),
+                'backfill': self.backfill.get_status(),
+                'image_pipeline': self.image_pipeline.get_status(),
                 'image_cache_stats': image_cache.get_cache_stats()
             }
             
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+from loguru import logger
+from sqlalchemy import desc
+from database.models import PostData
+import threading
+
+class SeenPostFilter:
+    """已入库帖子ID的内存过滤器
+
+    按 (platform, user_id) 保存最近 max_per_user 个已入库的帖子ID，
+    爬取结果中确定已入库的帖子在访问数据库前即被丢弃，只有可能是新帖子的才交给数据库去重。
+    集合中只记录确实存在于数据库中的ID，因此不会误丢新帖子。
+    """
+
+    def __init__(self, db_manager, max_per_user: int = 200):
+        self.db_manager = db_manager
+        self.max_per_user = max_per_user
+        # {(platform, user_id): OrderedDict[post_id, None]}，越新的ID越靠后
+        self._seen: Dict[Tuple[str, str], OrderedDict] = {}
+        self._lock = threading.Lock()
+
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def warm(self, keys: Iterable[Tuple[str, str]]):
+        """从数据库加载各账号最近入库的帖子ID"""
+        keys = set(keys)
+        for platform, user_id in keys:
+            self._load(platform, user_id)
+        logger.info(f"已预热 {len(keys)} 个账号的帖子ID过滤器")
+
+    def _load(self, platform: str, user_id: str):
+        session = self.db_manager.get_session()
+        try:
+            rows = session.query(PostData.post_id).filter(
+                PostData.platform == platform,
+                PostData.user_id == user_id
+            ).order_by(desc(PostData.id)).limit(self.max_per_user).all()
+        except Exception as e:
+            logger.error(f"加载已入库帖子ID失败: {platform} - {user_id}, 错误: {str(e)}")
+            return
+        finally:
+            session.close()
+
+        seen = OrderedDict((str(post_id), None) for (post_id,) in reversed(rows))
+        with self._lock:
+            # 加载期间已记录的新ID保留在末尾
+            current = self._seen.get((platform, user_id))
+            if current:
+                seen.update(current)
+            self._seen[(platform, user_id)] = seen
+
+    def ensure_loaded(self, platform: str, user_id: str):
+        """账号首次出现时从数据库加载其最近入库的帖子ID"""
+        with self._lock:
+            loaded = (platform, user_id) in self._seen
+        if not loaded:
+            self._load(platform, user_id)
+
+    def is_known(self, platform: str, user_id: str, post_id: Any) -> bool:
+        """判断帖子是否确定已入库（需先调用 ensure_loaded）"""
+        with self._lock:
+            if str(post_id) in self._seen.get((platform, user_id), {}):
+                self.hit_count += 1
+                return True
+            self.miss_count += 1
+            return False
+
+    def add(self, platform: str, user_id: str, post_ids: Iterable[Any]):
+        """记录已入库（新写入或数据库中已存在）的帖子ID"""
+        with self._lock:
+            seen = self._seen.setdefault((platform, user_id), OrderedDict())
+            for post_id in post_ids:
+                post_id = str(post_id)
+                seen[post_id] = None
+                seen.move_to_end(post_id)
+            while len(seen) > self.max_per_user:
+                seen.popitem(last=False)
+
+    def discard(self, platform: str, user_id: str):
+        with self._lock:
+            self._seen.pop((platform, user_id), None)
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            return {
+                'accounts': len(self._seen),
+                'post_ids': sum(len(seen) for seen in self._seen.values()),
+                'hits': self.hit_count,
+                'misses': self.miss_count
+            }
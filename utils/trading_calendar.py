@@ -0,0 +1,99 @@
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+PRE_MARKET = 'pre_market'
+SESSION = 'session'
+LUNCH_BREAK = 'lunch_break'
+AFTER_HOURS = 'after_hours'
+CLOSED = 'closed'
+HOLIDAY = 'holiday'
+
+PHASES = [PRE_MARKET, SESSION, LUNCH_BREAK, AFTER_HOURS, CLOSED, HOLIDAY]
+
+DEFAULT_SESSIONS = {
+    'pre_market': ['09:00', '09:30'],
+    'morning': ['09:30', '11:30'],
+    'afternoon': ['13:00', '15:00'],
+    'after_hours': ['15:00', '17:00']
+}
+
+def _parse_time(value: str) -> time:
+    hour, minute = str(value).split(':')
+    return time(int(hour), int(minute))
+
+class TradingCalendar:
+    """A股交易日历（本地时间）
+
+    交易日为周一至周五且不在节假日列表中；交易日内按时间划分为
+    盘前、交易时段、午间休市、盘后和收盘五个阶段，非交易日整天为节假日阶段。
+    """
+
+    def __init__(self, holidays: Iterable = None, sessions: Dict[str, List[str]] = None):
+        sessions = {**DEFAULT_SESSIONS, **(sessions or {})}
+        self.holidays = {self._to_date(d) for d in (holidays or [])}
+
+        pre_start, pre_end = map(_parse_time, sessions['pre_market'])
+        am_start, am_end = map(_parse_time, sessions['morning'])
+        pm_start, pm_end = map(_parse_time, sessions['afternoon'])
+        after_start, after_end = map(_parse_time, sessions['after_hours'])
+
+        # 交易日内各阶段的时间边界，未覆盖的时间视为收盘
+        self._segments: List[Tuple[time, time, str]] = sorted([
+            (pre_start, pre_end, PRE_MARKET),
+            (am_start, am_end, SESSION),
+            (am_end, pm_start, LUNCH_BREAK),
+            (pm_start, pm_end, SESSION),
+            (after_start, after_end, AFTER_HOURS)
+        ])
+        self._boundaries = sorted(
+            {time(0, 0)} | {b for start, end, _ in self._segments for b in (start, end)}
+        )
+
+    @staticmethod
+    def _to_date(value) -> date:
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+
+    def is_trading_day(self, day: date) -> bool:
+        """判断是否为交易日"""
+        return day.weekday() < 5 and day not in self.holidays
+
+    def get_phase(self, moment: datetime) -> str:
+        """获取指定时间所处的交易阶段"""
+        if not self.is_trading_day(moment.date()):
+            return HOLIDAY
+
+        current = moment.time()
+        for start, end, phase in self._segments:
+            if start <= current < end:
+                return phase
+        return CLOSED
+
+    def next_phase_change(self, moment: datetime) -> datetime:
+        """获取指定时间之后下一次阶段切换的时间"""
+        current_phase = self.get_phase(moment)
+        day = moment.date()
+
+        for offset in range(0, 370):
+            candidate_day = day + timedelta(days=offset)
+            # 非交易日只在零点可能发生切换
+            boundaries = self._boundaries if self.is_trading_day(candidate_day) else [time(0, 0)]
+            for boundary in boundaries:
+                candidate = datetime.combine(candidate_day, boundary)
+                if candidate > moment and self.get_phase(candidate) != current_phase:
+                    return candidate
+
+        return moment + timedelta(days=1)
+
+    def phase_hours(self, start: datetime, end: datetime) -> Dict[str, float]:
+        """统计时间窗口内每个阶段的总小时数"""
+        totals = {phase: 0.0 for phase in PHASES}
+        cursor = start
+        while cursor < end:
+            boundary = min(self.next_phase_change(cursor), end)
+            totals[self.get_phase(cursor)] += (boundary - cursor).total_seconds() / 3600
+            cursor = boundary
+        return totals
@@ -1,6 +1,7 @@
-from flask import Flask
+from flask import Flask, request
 from utils.logger import setup_logger
 from utils.scheduler import SpiderScheduler
+from utils.image_cache import image_cache
 from database.connection import db_manager
 import atexit
 
@@ -26,6 +27,15 @@ def create_app():
     # 设置密钥
     app.secret_key = 'your-secret-key-here'
     
+    # 页面加载缓存图片时记录访问，供图片缓存的淘汰策略使用
+    @app.after_request
+    def record_image_cache_access(response):
+        if request.endpoint == 'static' and response.status_code in (200, 304):
+            filename = (request.view_args or {}).get('filename', '')
+            if filename.startswith('images/cache/'):
+                image_cache.record_access(filename.rsplit('/', 1)[-1])
+        return response
+    
     # 注册蓝图
     from web.routes.dashboard import dashboard_bp
     from web.routes.spider import spider_bp
@@ -78,4 +88,13 @@ def create_app():
 def get_scheduler():
     """获取调度器实例"""
     global scheduler
-    return scheduler
\ No newline at end of file
+    return scheduler
+
+def notify_config_changed(config_id: int):
+    """通知调度器爬虫配置已新增、修改或删除"""
+    global scheduler
+    if scheduler:
+        try:
+            scheduler.reload_config(config_id)
+        except Exception as e:
+            logger.error(f"刷新调度配置失败: config_id={config_id}, 错误: {str(e)}")
\ No newline at end of file
@@ -1,10 +1,10 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from datetime import datetime
 from database.connection import db_manager
 from database.models import SpiderConfig, NotificationConfig, PostData, SystemLog
 from sqlalchemy import func
 from utils.logger import setup_logger
-from ..app import spider_status
+from ..app import spider_status, notify_config_changed
 import importlib
 from utils.image_cache import image_cache
 from loguru import logger
@@ -23,6 +23,7 @@ def toggle_spider(config_id):
             config.is_active = not config.is_active
             config.updated_at = func.now()
             session.commit()
+            notify_config_changed(config_id)
             
             status = "启用" if config.is_active else "禁用"
             logger.info(f"成功{status}爬虫配置: {config.platform}_{config.user_id}")
@@ -114,6 +115,7 @@ def manual_execute_spider(config_id):
         if result.get('success'):
             config.last_run_time = func.now()
             session.commit()
+            notify_config_changed(config_id)
             logger.info(f"手动执行爬虫配置成功: {config.platform}_{config.user_id}")
         
         session.close()
@@ -130,27 +132,17 @@ def get_scheduler_status():
         from web.app import get_scheduler
         scheduler = get_scheduler()
         
-        if scheduler and scheduler.is_running:
-            jobs = []
-            for job in scheduler.scheduler.get_jobs():
-                jobs.append({
-                    'id': job.id,
-                    'name': job.name,
-                    'next_run_time': job.next_run_time.isoformat() if job.next_run_time else None
-                })
-            
+        if scheduler:
+            status = scheduler.get_status()
             return jsonify({
                 'success': True,
-                'running': True,
-                'jobs_count': len(jobs),
-                'jobs': jobs
+                **status
             })
         else:
             return jsonify({
                 'success': True,
                 'running': False,
-                'jobs_count': 0,
-                'jobs': []
+                'executor': {}
             })
             
     except Exception as e:
@@ -176,6 +168,80 @@ def restart_scheduler():
         logger.error(f"重启调度器失败: {str(e)}")
         return jsonify({'success': False, 'message': f'重启失败: {str(e)}'})
 
+@api_bp.route('/spider/endpoints', methods=['GET'])
+def get_spider_endpoints():
+    """获取各平台候选API端点的得分和冷却状态"""
+    try:
+        from spider.xueqiu_spider import xueqiu_endpoint_selector
+        return jsonify({
+            'success': True,
+            'data': {
+                'xueqiu': xueqiu_endpoint_selector.get_status()
+            }
+        })
+    except Exception as e:
+        logger.error(f"获取端点状态失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': f'获取端点状态失败: {str(e)}'
+        }), 500
+
+@api_bp.route('/spider/backfill', methods=['GET'])
+def list_backfill_jobs():
+    """获取最近的历史回溯任务"""
+    try:
+        from web.app import get_scheduler
+        scheduler = get_scheduler()
+        
+        if not scheduler:
+            return jsonify({'success': False, 'message': '调度器未初始化'})
+        
+        return jsonify({'success': True, 'data': scheduler.backfill.list_jobs()})
+        
+    except Exception as e:
+        logger.error(f"获取回溯任务失败: {str(e)}")
+        return jsonify({'success': False, 'message': f'获取回溯任务失败: {str(e)}'})
+
+@api_bp.route('/spider/backfill/<int:config_id>', methods=['POST'])
+def start_backfill(config_id):
+    """启动或从断点继续历史回溯任务"""
+    try:
+        from web.app import get_scheduler
+        from utils.backfill import BackfillError
+        scheduler = get_scheduler()
+        
+        if not scheduler:
+            return jsonify({'success': False, 'message': '调度器未初始化'})
+        
+        data = request.get_json(silent=True) or {}
+        max_pages = data.get('max_pages')
+        try:
+            job = scheduler.backfill.start(config_id, max_pages=int(max_pages) if max_pages else None)
+        except BackfillError as e:
+            return jsonify({'success': False, 'message': str(e)})
+        
+        return jsonify({'success': True, 'message': '回溯任务已启动', 'data': job})
+        
+    except Exception as e:
+        logger.error(f"启动回溯任务失败: {str(e)}")
+        return jsonify({'success': False, 'message': f'启动回溯任务失败: {str(e)}'})
+
+@api_bp.route('/spider/backfill/<int:config_id>/cancel', methods=['POST'])
+def cancel_backfill(config_id):
+    """取消执行中的历史回溯任务"""
+    try:
+        from web.app import get_scheduler
+        scheduler = get_scheduler()
+        
+        if not scheduler or not scheduler.backfill.cancel(config_id):
+            return jsonify({'success': False, 'message': '该配置没有执行中的回溯任务'})
+        
+        return jsonify({'success': True, 'message': '回溯任务将在当前页完成后停止'})
+        
+    except Exception as e:
+        logger.error(f"取消回溯任务失败: {str(e)}")
+        return jsonify({'success': False, 'message': f'取消回溯任务失败: {str(e)}'})
+
 @api_bp.route('/image-cache/stats', methods=['GET'])
 def get_image_cache_stats():
     """获取图片缓存统计信息"""
@@ -5,6 +5,7 @@ from database.models import SpiderConfig, NotificationConfig, PostData, SystemLo
 from sqlalchemy import func
 from utils.logger import setup_logger
 from ..app import spider_status
+from spider.circuit_breaker import circuit_breakers
 
 logger = setup_logger()
 dashboard_bp = Blueprint('dashboard', __name__)
@@ -41,6 +42,7 @@ def dashboard():
             'posts_today': posts_today,
             'errors_today': errors_today,
             'spider_status': spider_status,
+            'circuit_breakers': circuit_breakers.get_status(),
             'recent_logs': [{
                 'level': log.level,
                 'message': log.message,
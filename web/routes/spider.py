@@ -1,9 +1,12 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from database.connection import db_manager
 from database.models import SpiderConfig, NotificationConfig, PostData
+from database.post_store import save_new_posts
 from utils.config_manager import ConfigManager
 from utils.logger import setup_logger
 from sqlalchemy import func, desc
+from utils.cron import CronExpression, CronParseError
+from ..app import notify_config_changed, get_scheduler
 import importlib
 
 logger = setup_logger()
@@ -36,6 +39,8 @@ def spider_config():
             if config.schedule_enabled:
                 if config.schedule_type == 'cron':
                     schedule_display = f"Cron: {config.cron_expression}"
+                elif config.schedule_type == 'adaptive':
+                    schedule_display = f"自适应: 基准{config.schedule_interval}秒"
                 else:
                     schedule_display = f"间隔: {config.schedule_interval}秒"
             else:
@@ -161,6 +166,7 @@ def delete_spider_config(config_id):
         if config:
             session.delete(config)
             session.commit()
+            notify_config_changed(config_id)
             logger.info(f"成功删除爬虫配置: {config.platform}_{config.user_id}")
             flash('爬虫配置删除成功！', 'success')
         else:
@@ -196,13 +202,15 @@ def add_spider_config():
             cron_expression = request.form.get('cron_expression')
             
             # 处理间隔时间
-            if schedule_type == 'interval':
+            if schedule_type in ('interval', 'adaptive'):
                 if schedule_interval == 'custom' and custom_interval:
                     final_interval = int(custom_interval)
                 else:
                     final_interval = int(schedule_interval) if schedule_interval else 60
             else:
                 final_interval = 300  # cron模式默认值
+                # 校验Cron表达式，格式错误时抛出CronParseError
+                CronExpression(cron_expression)
             
             # 构建认证配置
             auth_config = {}
@@ -233,6 +241,7 @@ def add_spider_config():
             
             session.add(config)
             session.flush()  # 获取ID
+            config_id = config.id
             
             # 关联通知配置
             if notification_config_id:
@@ -244,6 +253,7 @@ def add_spider_config():
             
             session.commit()
             session.close()
+            notify_config_changed(config_id)
             
             logger.info(f"成功添加爬虫配置: {platform}_{user_id}，定时间隔: {final_interval}秒")
             flash('爬虫配置添加成功！', 'success')
@@ -365,15 +375,23 @@ def trigger_spider_crawl(platform, user_id, auth_config):
         if not spider_class:
             return {'success': False, 'message': f'不支持的平台: {platform}'}
         
-        # 创建爬虫实例
-        spider = spider_class()
-        
-        # 认证（如果需要）
-        if auth_config and not spider.authenticate(auth_config):
-            return {'success': False, 'message': f'爬虫认证失败: {platform} - {user_id}'}
-        
-        # 获取原始帖子数据
-        raw_posts = spider.get_user_posts(user_id, limit=5)
+        # 调度器运行时复用其会话池中的会话
+        scheduler = get_scheduler()
+        session_pool = scheduler.session_pool if scheduler else None
+        http_session = session_pool.acquire(platform, auth_config) if session_pool else None
+        try:
+            # 创建爬虫实例
+            spider = spider_class(session=http_session)
+            
+            # 认证（如果需要）
+            if auth_config and not spider.authenticate(auth_config):
+                return {'success': False, 'message': f'爬虫认证失败: {platform} - {user_id}'}
+            
+            # 获取原始帖子数据
+            raw_posts = spider.get_user_posts(user_id, limit=5)
+        finally:
+            if session_pool:
+                session_pool.release(platform, http_session, auth_config=auth_config)
         
         if not raw_posts:
             return {'success': False, 'message': '未获取到任何数据'}
@@ -388,32 +406,16 @@ def trigger_spider_crawl(platform, user_id, auth_config):
         if not posts:
             return {'success': False, 'message': '解析后无有效数据'}
         
-        # 保存到数据库
+        # 批量去重后保存到数据库
         session = db_manager.get_session()
-        saved_count = 0
-        
-        for post_data in posts:
-            # 检查是否已存在
-            existing = session.query(PostData).filter(
-                PostData.platform == platform,
-                PostData.user_id == user_id,
-                PostData.post_id == post_data.get('post_id')
-            ).first()
-            
-            if not existing:
-                post = PostData(
-                    platform=platform,
-                    user_id=user_id,
-                    post_id=post_data.get('post_id'),
-                    content=post_data.get('content'),
-                    post_time=post_data.get('post_time'),
-                    is_sent=False
-                )
-                session.add(post)
-                saved_count += 1
-        
-        session.commit()
-        session.close()
+        try:
+            saved_count = len(save_new_posts(session, platform, user_id, posts))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
         
         logger.info(f"爬虫 {platform} - {user_id} 获取到 {len(raw_posts)} 条原始帖子，解析出 {len(posts)} 条有效帖子，新增 {saved_count} 条")
         return {'success': True, 'message': f'爬取成功，新增{saved_count}条数据'}
@@ -442,13 +444,19 @@ def edit_spider_schedule(config_id):
             cron_expression = request.form.get('cron_expression')
             
             # 处理间隔时间
-            if schedule_type == 'interval':
+            if schedule_type in ('interval', 'adaptive'):
                 if schedule_interval == 'custom' and custom_interval:
                     final_interval = int(custom_interval)
                 else:
                     final_interval = int(schedule_interval) if schedule_interval else 60
             else:
                 final_interval = config.schedule_interval  # 保持原值
+                try:
+                    CronExpression(cron_expression)
+                except CronParseError as e:
+                    session.close()
+                    flash(f'Cron表达式无效: {str(e)}', 'error')
+                    return redirect(url_for('spider.edit_spider_schedule', config_id=config_id))
             
             # 更新配置
             config.schedule_enabled = schedule_enabled
@@ -459,6 +467,7 @@ def edit_spider_schedule(config_id):
             
             session.commit()
             session.close()
+            notify_config_changed(config_id)
             
             flash('定时配置更新成功！', 'success')
             return redirect(url_for('spider.spider_config'))